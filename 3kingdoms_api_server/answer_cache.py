@@ -0,0 +1,139 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from text_utils import normalize_question
+
+
+class AnswerCache:
+    """
+    질문별 답변을 저장하는 영구 캐시
+
+    키는 정규화한 질문 텍스트, 모델 이름, 프롬프트 버전의 해시입니다.
+    자주 쓰는 항목은 메모리(LRU)에 두고, 전체 항목은 SQLite 파일에 저장합니다.
+    """
+
+    def __init__(self, path: str, memory_size: int = 50000):
+        """
+        답변 캐시를 초기화합니다.
+
+        Args:
+            path: SQLite 캐시 파일 경로
+            memory_size: 메모리에 유지할 최대 항목 수
+        """
+        self.path = path
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY,"
+            " question TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " prompt_version TEXT NOT NULL,"
+            " answer TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def make_key(question: str, model: str, prompt_version: str) -> str:
+        """
+        캐시 키를 만듭니다.
+
+        Args:
+            question: 질문 텍스트
+            model: 답변 생성 모델 이름
+            prompt_version: 프롬프트 버전
+
+        Returns:
+            캐시 키 (SHA-256 16진수 문자열)
+        """
+        raw = "\x1f".join([model, prompt_version, normalize_question(question)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, answer: str) -> None:
+        """메모리 캐시에 항목을 넣고, 크기를 넘으면 가장 오래된 항목을 버립니다."""
+        self._memory[key] = answer
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, question: str, model: str, prompt_version: str) -> Optional[str]:
+        """
+        캐시된 답변을 반환합니다.
+
+        Args:
+            question: 질문 텍스트
+            model: 답변 생성 모델 이름
+            prompt_version: 프롬프트 버전
+
+        Returns:
+            캐시된 답변 (없으면 None)
+        """
+        key = self.make_key(question, model, prompt_version)
+        with self._lock:
+            answer = self._memory.get(key)
+            if answer is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return answer
+
+            row = self._conn.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["disk_hits"] += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, question: str, model: str, prompt_version: str, answer: str) -> None:
+        """
+        답변을 캐시에 저장합니다.
+
+        Args:
+            question: 질문 텍스트
+            model: 답변 생성 모델 이름
+            prompt_version: 프롬프트 버전
+            answer: 저장할 답변
+        """
+        key = self.make_key(question, model, prompt_version)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, question, model, prompt_version, answer, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, question, model, prompt_version, answer, time.time()),
+            )
+            self._remember(key, answer)
+            self.stats["writes"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계를 반환합니다.
+
+        Returns:
+            적중/미스 횟수, 적중률, 저장된 항목 수
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["entries"] = entries
+        stats["memory_entries"] = len(self._memory)
+        return stats
+
+    def close(self) -> None:
+        """SQLite 연결을 닫습니다."""
+        with self._lock:
+            self._conn.close()
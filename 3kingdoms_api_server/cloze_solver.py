@@ -0,0 +1,372 @@
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from retrieval import text_to_terms
+from index_files import invalidate_manifest, save_array, write_json
+from text_utils import strip_source_prefix
+
+# 본문/질문에서 제외할 문자 (띄어쓰기, 문장 부호 차이를 무시하고 비교)
+_NON_WORD = re.compile(r"[\W_]+")
+# 빈칸 표시: ㅁ은 한 글자당 하나, _____는 길이를 알 수 없음
+_BLANK = re.compile(r"ㅁ+|_{2,}")
+
+INDEX_FORMAT_VERSION = 1
+# 색인 n-gram 길이 (빈칸 바로 앞/뒤 n글자를 기준점으로 사용)
+ANCHOR_LENGTH = 3
+# 빈칸 앞/뒤 문맥을 비교할 최대 글자 수
+MAX_CONTEXT = 24
+# 길이를 모르는 빈칸(_____)에 들어갈 수 있는 최대 글자 수
+MAX_FILLER_LENGTH = 6
+# 주변 일치율을 계산할 최대 후보 수 (문맥 일치 길이 순)
+MAX_CANDIDATES = 64
+# 이 글자 수만큼 빈칸 앞뒤 문맥이 일치하면 문맥 근거를 충분한 것으로 봄
+FULL_SUPPORT = 8
+# 후보 주변에서 질문의 다른 단어를 찾는 범위 (앞뒤 글자 수)
+NEIGHBORHOOD = 300
+# 두 번째 후보보다 주변 일치율이 이만큼 높으면 충분히 구별되는 것으로 봄
+FULL_MARGIN = 0.1
+
+
+class ClozeAnswer(NamedTuple):
+    """빈칸 풀이 결과"""
+    answer: str
+    confidence: float
+    support: int
+    overlap: float
+    chapter: str
+
+
+def parse_cloze(question: str) -> Optional[Dict]:
+    """
+    질문을 빈칸 앞 문맥, 빈칸 길이, 빈칸 뒤 문맥으로 나눕니다.
+
+    Args:
+        question: 질문 텍스트
+
+    Returns:
+        {'left': 앞 문맥, 'right': 뒤 문맥, 'length': 빈칸 글자 수 (_____이면 None)}
+        빈칸이 없거나 두 개 이상이면 None
+    """
+    text = strip_source_prefix(question)
+    blanks = list(_BLANK.finditer(text))
+    if len(blanks) != 1:
+        return None
+    blank = blanks[0]
+    return {
+        "left": _NON_WORD.sub("", text[:blank.start()]),
+        "right": _NON_WORD.sub("", text[blank.end():]),
+        "length": len(blank.group()) if blank.group()[0] == "ㅁ" else None,
+    }
+
+
+def _codes(text: str) -> np.ndarray:
+    """문자열을 코드 포인트 배열로 변환합니다."""
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+class ClozeSolver:
+    """
+    jinho_3kingdoms 장 본문에서 빈칸(ㅁ, _____)에 들어갈 말을 찾는 풀이기
+
+    띄어쓰기와 문장 부호를 뺀 본문 전체를 코드 포인트 배열로 만들고,
+    모든 위치의 문자 3-gram을 정렬한 위치 색인을 numpy 파일로 저장해 메모리 매핑으로 불러옵니다.
+    빈칸 바로 앞/뒤 3글자가 나오는 위치를 후보로 잡고, 앞뒤 문맥이 얼마나 길게 일치하는지로 채점합니다.
+    """
+
+    def __init__(self, corpus_dir: str, index_dir: str):
+        """
+        풀이기를 초기화합니다. 실제 색인은 load_or_build()로 불러옵니다.
+
+        Args:
+            corpus_dir: 장 텍스트 파일(*.txt) 디렉토리
+            index_dir: 색인 파일을 저장할 디렉토리
+        """
+        self.corpus_dir = corpus_dir
+        self.index_dir = index_dir
+        self.text: Optional[np.ndarray] = None
+        self.stats: Dict[str, int] = {}
+
+    # ---------- 색인 생성 ----------
+
+    def _corpus_files(self) -> Dict[str, str]:
+        """장 이름 → 파일 경로"""
+        paths = glob.glob(os.path.join(self.corpus_dir, "*.txt"))
+        return {os.path.splitext(os.path.basename(p))[0]: p for p in paths}
+
+    def _signatures(self) -> Dict[str, Dict[str, int]]:
+        signatures = {}
+        for name, path in self._corpus_files().items():
+            stat = os.stat(path)
+            signatures[name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        return signatures
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def build(self) -> Dict[str, int]:
+        """
+        색인을 생성해 디스크에 저장합니다.
+
+        장 사이에는 코드 포인트 0을 넣어 문맥이 장 경계를 넘어 일치하지 않도록 합니다.
+
+        Returns:
+            {'files': 장 파일 수, 'chars': 본문 글자 수}
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        files = self._corpus_files()
+        names = sorted(files, key=lambda n: (not n.isdigit(), int(n) if n.isdigit() else 0, n))
+
+        texts, keys, positions, chapter_starts = [], [], [], []
+        offset = 0
+        for name in names:
+            with open(files[name], "r", encoding="utf-8") as f:
+                text = _NON_WORD.sub("", f.read())
+            terms = text_to_terms(text, ANCHOR_LENGTH)
+            texts.append(_codes(text))
+            texts.append(np.zeros(1, dtype=np.uint32))
+            keys.append(terms)
+            positions.append(np.arange(offset, offset + len(terms), dtype=np.int32))
+            chapter_starts.append(offset)
+            offset += len(text) + 1
+
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int32)
+        order = np.argsort(keys, kind="stable")
+
+        arrays = {
+            "text": np.concatenate(texts) if texts else np.zeros(0, dtype=np.uint32),
+            "anchor_keys": keys[order],
+            "anchor_positions": positions[order],
+            "chapter_starts": np.array(chapter_starts, dtype=np.int64),
+        }
+        # 다른 워커가 열어 둔 파일은 덮어쓰지 않고 교체 (manifest는 지웠다가 마지막에 기록)
+        invalidate_manifest(self.index_dir)
+        for key, value in arrays.items():
+            save_array(os.path.join(self.index_dir, f"{key}.npy"), value)
+        write_json(os.path.join(self.index_dir, "chapters.json"), names)
+
+        # manifest는 마지막에 기록 (중간에 실패하면 다음 실행에서 다시 생성)
+        manifest = {"format": INDEX_FORMAT_VERSION, "anchor_length": ANCHOR_LENGTH,
+                    "files": self._signatures(), "built_at": time.time()}
+        write_json(os.path.join(self.index_dir, "manifest.json"), manifest)
+
+        return {"files": len(names), "chars": offset}
+
+    def is_stale(self) -> bool:
+        """장 파일이 색인 생성 이후 추가/변경/삭제되었는지 확인합니다."""
+        manifest = self._load_manifest()
+        if manifest.get("format") != INDEX_FORMAT_VERSION or manifest.get("anchor_length") != ANCHOR_LENGTH:
+            return True
+        return manifest.get("files") != self._signatures()
+
+    # ---------- 색인 불러오기/풀이 ----------
+
+    def load(self) -> None:
+        """디스크의 색인을 메모리 매핑으로 불러옵니다."""
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(self.index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.text = array("text")
+        self.anchor_keys = array("anchor_keys")
+        self.anchor_positions = array("anchor_positions")
+        self.chapter_starts = np.asarray(array("chapter_starts"))
+        with open(os.path.join(self.index_dir, "chapters.json"), "r", encoding="utf-8") as f:
+            self.chapters = json.load(f)
+        self.stats = {"chapters": len(self.chapters), "chars": len(self.text), "anchors": len(self.anchor_keys)}
+
+    def load_or_build(self) -> Dict[str, int]:
+        """
+        색인이 최신이면 불러오고, 아니면 다시 생성한 뒤 불러옵니다.
+
+        Returns:
+            생성 결과 (생성하지 않았으면 빈 딕셔너리)
+        """
+        result = {}
+        if self.is_stale():
+            result = self.build()
+        self.load()
+        return result
+
+    def _anchor(self, text: str) -> np.ndarray:
+        """3글자 문자열이 본문에 나오는 시작 위치 배열"""
+        key = text_to_terms(text, ANCHOR_LENGTH)
+        if len(key) != 1:
+            return np.zeros(0, dtype=np.int64)
+        start, end = np.searchsorted(self.anchor_keys, [key[0], key[0] + 1])
+        return np.asarray(self.anchor_positions[start:end], dtype=np.int64)
+
+    def _match_length(self, starts: np.ndarray, pattern: np.ndarray, step: int) -> np.ndarray:
+        """
+        각 위치에서 본문이 pattern과 몇 글자 연속으로 일치하는지 계산합니다.
+
+        Args:
+            starts: 비교를 시작할 본문 위치 배열
+            pattern: 비교할 코드 포인트 배열
+            step: 1이면 starts부터 앞으로, -1이면 starts - 1부터 뒤로 비교
+
+        Returns:
+            일치한 글자 수 배열
+        """
+        lengths = np.zeros(len(starts), dtype=np.int64)
+        alive = np.ones(len(starts), dtype=bool)
+        for i, code in enumerate(pattern[:MAX_CONTEXT]):
+            index = starts + i if step > 0 else starts - 1 - i
+            inside = (index >= 0) & (index < len(self.text))
+            matched = alive & inside
+            matched[matched] = self.text[index[matched]] == code
+            lengths += matched
+            alive = matched
+            if not alive.any():
+                break
+        return lengths
+
+    def _candidates(self, left: str, right: str, length: Optional[int]) -> np.ndarray:
+        """빈칸 앞/뒤 기준점에서 (시작, 끝) 후보 위치 배열을 만듭니다."""
+        lengths = [length] if length else range(1, MAX_FILLER_LENGTH + 1)
+        right_codes = _codes(right)
+        left_codes = _codes(left)[::-1]
+        pairs = []
+
+        if len(left) >= ANCHOR_LENGTH:
+            starts = self._anchor(left[-ANCHOR_LENGTH:]) + ANCHOR_LENGTH
+            for n in lengths:
+                ends = starts + n
+                # 길이를 모르면 뒤 문맥이 두 글자 이상 맞는 길이만 후보로 사용
+                if length is None:
+                    keep = self._match_length(ends, right_codes, 1) >= min(2, len(right))
+                    if not right:
+                        keep[:] = False
+                    pairs.append(np.stack([starts[keep], ends[keep]], axis=1))
+                else:
+                    pairs.append(np.stack([starts, ends], axis=1))
+
+        if len(right) >= ANCHOR_LENGTH:
+            ends = self._anchor(right[:ANCHOR_LENGTH])
+            for n in lengths:
+                starts = ends - n
+                if length is None:
+                    keep = self._match_length(starts, left_codes, -1) >= min(2, len(left))
+                    if not left:
+                        keep[:] = False
+                    pairs.append(np.stack([starts[keep], ends[keep]], axis=1))
+                else:
+                    pairs.append(np.stack([starts, ends], axis=1))
+
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        pairs = np.unique(np.concatenate(pairs), axis=0)
+        return pairs[(pairs[:, 0] >= 0) & (pairs[:, 1] <= len(self.text))]
+
+    def _overlap(self, question_terms: np.ndarray, start: int, end: int) -> float:
+        """후보 주변 NEIGHBORHOOD 글자 안에 질문의 문자 2-gram이 몇 %나 나오는지 계산합니다."""
+        window = np.asarray(self.text[max(0, start - NEIGHBORHOOD): end + NEIGHBORHOOD], dtype=np.int64)
+        if len(question_terms) == 0 or len(window) < 2:
+            return 0.0
+        window_terms = (window[:-1] << 21) | window[1:]
+        return float(np.isin(question_terms, window_terms).mean())
+
+    def solve(self, question: str) -> Optional[ClozeAnswer]:
+        """
+        빈칸에 들어갈 말을 본문에서 찾습니다.
+
+        후보마다 빈칸 바로 앞뒤 문맥이 일치한 글자 수(support)와 후보 주변에 질문의 나머지 내용이
+        나오는 비율(overlap)을 구하고, 같은 답끼리 묶어 가장 주변 일치율이 높은 후보를 답의 근거로 씁니다.
+        신뢰도는 주변 일치율, 문맥 일치 길이(FULL_SUPPORT 글자면 1), 두 번째 답과의 주변 일치율 차이
+        (FULL_MARGIN 이상이면 1)를 곱한 값입니다.
+
+        Args:
+            question: 질문 텍스트
+
+        Returns:
+            풀이 결과 (빈칸 문제가 아니거나 후보가 없으면 None)
+        """
+        if self.text is None:
+            raise RuntimeError("색인을 먼저 불러와야 합니다 (load_or_build)")
+        cloze = parse_cloze(question)
+        if cloze is None:
+            return None
+        left, right = cloze["left"], cloze["right"]
+
+        pairs = self._candidates(left, right, cloze["length"])
+        if len(pairs) == 0:
+            return None
+        support = (self._match_length(pairs[:, 0], _codes(left)[::-1], -1)
+                   + self._match_length(pairs[:, 1], _codes(right), 1))
+        top = np.argsort(-support, kind="stable")[:MAX_CANDIDATES]
+        pairs, support = pairs[top], support[top]
+        question_terms = np.unique(text_to_terms(f"{left} {right}", 2))
+
+        # 같은 답끼리 묶어 (주변 일치율, 문맥 일치 길이)가 가장 높은 후보를 남김 (장 경계를 넘는 후보 제외)
+        best: Dict[str, tuple] = {}
+        for (start, end), score in zip(pairs.tolist(), support.tolist()):
+            codes = self.text[start:end]
+            if not codes.all():
+                continue
+            answer = codes.astype("<u4").tobytes().decode("utf-32-le")
+            evidence = (self._overlap(question_terms, start, end), score, start)
+            if answer not in best or evidence > best[answer]:
+                best[answer] = evidence
+        if not best:
+            return None
+
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        answer, (overlap, score, position) = ranked[0]
+        runner_up = ranked[1][1][0] if len(ranked) > 1 else 0.0
+        confidence = overlap * min(1.0, score / FULL_SUPPORT) * min(1.0, (overlap - runner_up) / FULL_MARGIN)
+        chapter = self.chapters[int(np.searchsorted(self.chapter_starts, position, side="right")) - 1]
+        return ClozeAnswer(answer, round(confidence, 3), score, round(overlap, 3), chapter)
+
+
+def main() -> None:
+    import settings
+
+    parser = argparse.ArgumentParser(description="장 본문 빈칸 풀이 색인 생성/풀이/평가")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="색인 생성")
+    solve_parser = sub.add_parser("solve", help="빈칸 문제 풀이")
+    solve_parser.add_argument("question")
+    eval_parser = sub.add_parser("evaluate", help="퀴즈 CSV로 신뢰도 기준별 정확도 확인")
+    eval_parser.add_argument("csv_path", help="question, answer 컬럼을 가진 퀴즈 CSV")
+    args = parser.parse_args()
+
+    solver = ClozeSolver(settings.CORPUS_DIR, settings.CLOZE_INDEX_DIR)
+    started = time.perf_counter()
+    result = solver.load_or_build()
+    print(f"색인 준비 완료 ({time.perf_counter() - started:.2f}초): {result}, {solver.stats}")
+
+    if args.command == "solve":
+        started = time.perf_counter()
+        answer = solver.solve(args.question)
+        print(f"풀이 시간: {(time.perf_counter() - started) * 1000:.2f}ms")
+        print(answer if answer is not None else "빈칸 문제가 아니거나 후보가 없습니다.")
+
+    elif args.command == "evaluate":
+        import csv
+
+        with open(args.csv_path, "r", encoding="utf-8") as f:
+            rows = [row for row in csv.DictReader(f) if parse_cloze(row.get("question", ""))]
+        started = time.perf_counter()
+        results = [(solver.solve(row["question"]), _NON_WORD.sub("", row.get("answer", ""))) for row in rows]
+        elapsed = time.perf_counter() - started
+        print(f"빈칸 문제 {len(rows)}개, 문제당 평균 {elapsed / max(len(rows), 1) * 1e6:.0f}µs")
+        for threshold in (0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7):
+            answered = [(r, a) for r, a in results if r is not None and r.confidence >= threshold]
+            correct = sum(1 for r, a in answered if _NON_WORD.sub("", r.answer) == a)
+            precision = correct / len(answered) if answered else 0.0
+            print(f"  신뢰도 >= {threshold:.1f}: 답변 {len(answered)}개 ({len(answered) / max(len(rows), 1):.1%}), "
+                  f"정답률 {precision:.1%}")
+
+
+if __name__ == "__main__":
+    main()
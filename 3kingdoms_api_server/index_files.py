@@ -0,0 +1,55 @@
+import json
+import os
+from typing import Any
+
+import numpy as np
+
+# 색인 파일 쓰기 도우미
+#
+# 다른 워커가 메모리 매핑으로 열어 둔 색인 파일을 제자리에서 덮어쓰면 그 워커가 읽는 내용이 바뀌므로,
+# 항상 임시 파일에 다 쓴 뒤 os.replace로 교체합니다 (열려 있던 매핑은 이전 파일을 계속 가리킴).
+
+
+def _replace(path: str, write) -> None:
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_array(path: str, value: np.ndarray) -> None:
+    """배열을 .npy 파일로 교체 저장합니다."""
+    _replace(path, lambda f: np.save(f, value))
+
+
+def save_arrays(path: str, **arrays: np.ndarray) -> None:
+    """여러 배열을 .npz 파일로 교체 저장합니다."""
+    _replace(path, lambda f: np.savez(f, **arrays))
+
+
+def write_bytes(path: str, data: bytes) -> None:
+    _replace(path, lambda f: f.write(data))
+
+
+def write_json(path: str, data: Any) -> None:
+    """JSON 파일을 교체 저장합니다."""
+    write_bytes(path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+def invalidate_manifest(index_dir: str) -> None:
+    """
+    색인을 다시 쓰기 전에 manifest를 지웁니다.
+
+    manifest는 모든 파일을 쓴 뒤 마지막에 기록하므로, 중간에 실패하면 manifest가 없어 다음 실행에서 다시 생성합니다.
+    """
+    try:
+        os.remove(os.path.join(index_dir, "manifest.json"))
+    except FileNotFoundError:
+        pass
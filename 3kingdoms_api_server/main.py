@@ -1,14 +1,192 @@
 from fastapi import FastAPI, HTTPException, Depends
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List, Dict, Tuple
+from contextlib import asynccontextmanager, contextmanager
+import argparse
+import asyncio
 import os
-from openai import OpenAI
+import re
+import signal
+import sys
+import threading
+import httpx
+from fastapi.responses import JSONResponse
+from openai import AsyncOpenAI
 
+try:
+    import fcntl
+except ImportError:  # Windows: 색인 생성 잠금 없이 실행 (단일 워커만 지원)
+    fcntl = None
 
-app = FastAPI(title="3kingdoms Quiz API")
+import settings
+from answer_cache import AnswerCache
+from retrieval import ChapterIndex
+from cloze_solver import ClozeSolver
+from question_bank import QuestionBank
+import near_duplicates
+from near_duplicates import MinHashLSH
+from micro_batcher import MicroBatcher
 
-# OpenAI 클라이언트 초기화
-client = OpenAI(api_key="")
+# 채점 모듈과 같은 인물 이름 사전을 쓰기 위해 저장소 루트의 모듈을 불러옴 (서버만 따로 배포하면 사용하지 않음)
+sys.path.append(settings.REPO_DIR)
+try:
+    from entity_gazetteer import EntityGazetteer
+except ImportError:
+    EntityGazetteer = None
+try:
+    from token_usage import UsageTracker, usage_from_response
+except ImportError:
+    UsageTracker = None
+
+
+# OpenAI 클라이언트와 동시 실행 제한은 서버 시작 시 생성 (이벤트 루프마다 하나)
+client: Optional[AsyncOpenAI] = None
+upstream_semaphore: Optional[asyncio.Semaphore] = None
+answer_cache: Optional[AnswerCache] = None
+retriever: Optional[ChapterIndex] = None
+cloze_solver: Optional[ClozeSolver] = None
+question_bank: Optional[QuestionBank] = None
+# 문제 은행 질문의 MinHash LSH 색인 (POST /known)
+known_questions: Optional[MinHashLSH] = None
+gazetteer = None
+# 동시에 들어온 모델 호출을 모아 한 번에 보내는 마이크로 배치 큐 (MICRO_BATCH_ENABLED일 때만)
+batcher: Optional[MicroBatcher] = None
+# 모델별 업스트림 토큰 사용량과 비용 (token_usage 모듈이 있을 때만)
+upstream_usage = UsageTracker() if UsageTracker is not None else None
+# 시작 준비가 끝났고 종료 중이 아니면 True (/ready 응답)
+ready = False
+# 빈칸 문제 본문 풀이 결과 (본문 풀이로 답변 / 신뢰도가 낮아 모델 호출)
+cloze_counts = {"solved": 0, "fallback": 0}
+# 캐시 키에 사용하는 프롬프트 버전 (검색 문맥 사용 여부 포함)
+prompt_version = settings.PROMPT_VERSION
+
+@contextmanager
+def index_build_lock():
+    """
+    여러 워커 프로세스가 동시에 시작할 때 색인을 한 프로세스만 생성하도록 잠급니다.
+
+    먼저 잠금을 얻은 워커가 색인을 만들고, 나머지 워커는 기다렸다가 최신 색인을 메모리 매핑으로 불러오기만 합니다.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(settings.CACHE_DIR, exist_ok=True)
+    with open(os.path.join(settings.CACHE_DIR, ".build.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+async def startup() -> None:
+    """
+    연결 풀을 가진 비동기 OpenAI 클라이언트, 답변 캐시, 문제 은행, 장 본문 검색/빈칸 풀이 색인을 준비합니다.
+
+    색인은 디스크에서 메모리 매핑으로 불러오므로, 여러 워커 프로세스가 같은 페이지 캐시를 공유합니다.
+    """
+    global client, upstream_semaphore, answer_cache, retriever, cloze_solver, question_bank, known_questions, gazetteer, \
+        batcher, prompt_version, ready
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=settings.REQUEST_TIMEOUT,
+    )
+    client = AsyncOpenAI(
+        # 스텁 서버처럼 키가 필요 없는 주소면 임의 값 사용
+        api_key=settings.OPENAI_API_KEY or ("local" if settings.OPENAI_BASE_URL else ""),
+        base_url=settings.OPENAI_BASE_URL,
+        http_client=http_client,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+    )
+    upstream_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENCY)
+    if settings.ANSWER_CACHE_ENABLED:
+        answer_cache = AnswerCache(settings.ANSWER_CACHE_PATH, settings.ANSWER_CACHE_MEMORY_SIZE)
+    with index_build_lock():
+        if settings.RETRIEVAL_ENABLED and os.path.isdir(settings.CORPUS_DIR):
+            retriever = ChapterIndex(settings.CORPUS_DIR, settings.RETRIEVAL_INDEX_DIR)
+            result = retriever.load_or_build()
+            print(f"[검색 색인] {retriever.stats} (다시 토큰화한 장: {result['rebuilt']}개)")
+            prompt_version = f"{settings.PROMPT_VERSION}-rag{settings.RETRIEVAL_TOP_K}"
+        if settings.QUESTION_BANK_ENABLED and any(os.path.exists(p) for p in settings.QUESTION_BANK_FILES):
+            question_bank = QuestionBank(settings.QUESTION_BANK_FILES, settings.QUESTION_BANK_INDEX_DIR,
+                                         settings.QUESTION_BANK_THRESHOLD)
+            result = question_bank.load_or_build()
+            print(f"[문제 은행] {question_bank.stats} (다시 생성: {'예' if result else '아니오'})")
+        if settings.NEAR_DUPLICATE_ENABLED and any(os.path.exists(p) for p in settings.QUESTION_BANK_FILES):
+            known_questions, result = near_duplicates.load_or_build(
+                settings.QUESTION_BANK_FILES, settings.NEAR_DUPLICATE_INDEX_DIR, settings.NEAR_DUPLICATE_THRESHOLD)
+            print(f"[비슷한 질문 색인] {known_questions.stats} (다시 생성: {'예' if result else '아니오'})")
+        if settings.CLOZE_ENABLED and os.path.isdir(settings.CORPUS_DIR):
+            cloze_solver = ClozeSolver(settings.CORPUS_DIR, settings.CLOZE_INDEX_DIR)
+            result = cloze_solver.load_or_build()
+            print(f"[빈칸 풀이 색인] {cloze_solver.stats} (다시 생성: {'예' if result else '아니오'})")
+    if settings.GAZETTEER_ENABLED and EntityGazetteer is not None and os.path.exists(settings.GAZETTEER_PATH):
+        gazetteer = EntityGazetteer.load(settings.GAZETTEER_PATH)
+        failures = gazetteer.spot_check()
+        if failures:
+            print(f"[인물 이름 사전] 주요 인물 확인 실패로 사용하지 않음: {failures}")
+            gazetteer = None
+        else:
+            print(f"[인물 이름 사전] {gazetteer.stats}")
+    if settings.MICRO_BATCH_ENABLED:
+        batcher = MicroBatcher(_complete_batch, settings.MICRO_BATCH_WINDOW_MS / 1000, settings.MICRO_BATCH_MAX_SIZE)
+        # 배치 프롬프트로 만든 답변은 단건 프롬프트 답변과 구분해 캐시
+        prompt_version = f"{prompt_version}-mb"
+    ready = True
+    print(f"[준비 완료] 프로세스 {os.getpid()}")
+
+def install_drain_handler() -> None:
+    """
+    종료 신호를 받으면 uvicorn이 연결 대기를 멈추기 전에 /ready부터 내립니다.
+
+    uvicorn은 신호를 받자마자 새 연결을 받지 않으므로, lifespan 종료 단계에서 내리면 /ready가 503을 돌려줄 기회가 없습니다.
+    SIGTERM은 SHUTDOWN_DRAIN_SECONDS 동안 503을 보이며 요청을 계속 처리한 뒤 uvicorn의 원래 처리기로 넘기고,
+    SIGINT(Ctrl+C)나 두 번째 신호는 바로 넘깁니다.
+    uvicorn이 신호 처리기를 설치한 메인 스레드에서만 동작합니다 (TestClient 등에서는 아무것도 하지 않음).
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handle(signum, frame, previous=previous):
+            global ready
+            draining = ready and signum == signal.SIGTERM and settings.SHUTDOWN_DRAIN_SECONDS > 0
+            ready = False
+            if draining:
+                print(f"[종료 준비] /ready 503, {settings.SHUTDOWN_DRAIN_SECONDS:g}초 뒤 종료 시작")
+                timer = threading.Timer(settings.SHUTDOWN_DRAIN_SECONDS, previous, (signum, frame))
+                timer.daemon = True
+                timer.start()
+            else:
+                previous(signum, frame)
+
+        signal.signal(sig, handle)
+
+async def shutdown() -> None:
+    """/ready를 내리고(신호 처리기에서 이미 내렸으면 그대로) 클라이언트와 캐시를 닫습니다."""
+    global ready
+    ready = False
+    if client is not None:
+        await client.close()
+    if answer_cache is not None:
+        answer_cache.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작/종료 시 공용 자원을 준비하고 정리합니다."""
+    await startup()
+    install_drain_handler()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+app = FastAPI(title="3kingdoms Quiz API", lifespan=lifespan)
 
 class QuizQuestion(BaseModel):
     question: str
@@ -18,69 +196,322 @@ class QuizQuestion(BaseModel):
 class QuizAnswer(BaseModel):
     answer: str
 
+class QuizBatch(BaseModel):
+    questions: List[QuizQuestion]
+
+class QuizBatchAnswer(BaseModel):
+    answers: List[QuizAnswer]
+
+class KnownQuestion(BaseModel):
+    question: str
+    answer: str
+    source: str
+    similarity: float
+
+class KnownQuestions(BaseModel):
+    matches: List[KnownQuestion]
+
 @app.post("/answer", response_model=QuizAnswer)
 async def answer_question(question: QuizQuestion):
     """
     API 엔드포인트: 퀴즈 질문을 받아 답변을 반환합니다.
-    
+
     GPT-4o-mini 모델을 사용하여 답변을 생성합니다.
     """
     try:
         print(f"[요청 받음] 질문 ID: {question.question_id}, 난이도: {question.difficulty}")
         print(f"[질문 내용] {question.question}")
-        
-        answer = get_answer(question.question, question.question_id, question.difficulty)
-        
+
+        answer = await get_answer(question.question, question.question_id, question.difficulty)
+
         print(f"[응답 생성] 질문 ID: {question.question_id}, 답변: {answer}")
         return QuizAnswer(answer=answer)
     except Exception as e:
         print(f"[오류 발생] 질문 ID: {question.question_id}, 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
-def get_answer(question: str, question_id: str, difficulty: str) -> str:
+@app.post("/answer/batch", response_model=QuizBatchAnswer)
+async def answer_batch(batch: QuizBatch):
+    """
+    API 엔드포인트: 여러 퀴즈 질문을 한 번에 받아 같은 순서로 답변을 반환합니다.
+
+    문제 은행 검색은 배치 전체를 한 번의 행렬 곱으로 처리하고, 나머지 질문은 동시에 답변을 생성합니다.
+    """
+    if len(batch.questions) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"질문은 한 번에 {settings.MAX_BATCH_SIZE}개까지 보낼 수 있습니다")
+    try:
+        print(f"[배치 요청 받음] 질문 {len(batch.questions)}개")
+        questions = [q.question for q in batch.questions]
+        matches = question_bank.lookup_many(questions) if question_bank is not None else [None] * len(questions)
+
+        async def answer_one(item: QuizQuestion, match) -> str:
+            if match is not None:
+                return match.answer
+            return await get_answer(item.question, item.question_id, item.difficulty, use_bank=False)
+
+        answers = await asyncio.gather(*(answer_one(q, m) for q, m in zip(batch.questions, matches)))
+        print(f"[배치 응답 생성] 질문 {len(answers)}개 (문제 은행 {sum(m is not None for m in matches)}개)")
+        return QuizBatchAnswer(answers=[QuizAnswer(answer=a) for a in answers])
+    except Exception as e:
+        print(f"[오류 발생] 배치 요청, 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
+
+SYSTEM_PROMPT = "당신은 삼국지에 대한 전문가입니다. 삼국지 관련 퀴즈 질문에 정확하고 간결하게 단답형으로 답변해 주세요."
+BATCH_SYSTEM_PROMPT = (
+    SYSTEM_PROMPT
+    + " 번호가 붙은 질문이 여러 개 주어지면, 각 질문의 답을 한 줄에 하나씩 '번호. 답' 형식으로 같은 순서대로 답변해 주세요."
+)
+# (질문, 답) 예시: 단건/배치 프롬프트에서 같은 예시를 사용
+FEW_SHOT_EXAMPLES = [
+    ("( 연의 ) 유비가 서천을 평정하자, 손권은 형주를 돌려받기 위해, _____의 가족을 거짓으로 인질로 잡고는 그를 유비에게 사신으로 보내어 형주를 돌려달라고 했다.",
+     "제갈근"),
+    ("( 연의 ) 손권은 관우를 죽이고 나서 연회를 열어 장수들의 전공을 축하했는데, 이 자리에서 '조조를 적벽에서 이긴 주유나 ㅁ주 지배를 하지 못한 노숙보다 여몽이 더 뛰어나다' 고 여몽에게 말했다.",
+     "형"),
+]
+# 배치 답변의 "번호. 답" 줄 ("1. 답", "[1] 답", "1) 답", "1: 답")
+_BATCH_LINE = re.compile(r"^\s*\[?(\d+)\s*[\].):]\s*(.*?)\s*$")
+
+def _question_content(question: str, passages: Optional[List[str]] = None) -> str:
+    """질문(과 검색한 문단)을 사용자 메시지 본문으로 만듭니다."""
+    content = f"질문: {question}"
+    if passages:
+        context = "\n\n".join(f"[참고 {i + 1}] {p}" for i, p in enumerate(passages))
+        content = f"다음은 삼국지연의 본문 중 질문과 관련된 부분입니다.\n{context}\n\n{content}"
+    return content
+
+def build_messages(question: str, passages: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    """
+    질문에 대한 프롬프트 메시지를 구성합니다.
+
+    고정된 지시문과 예시는 항상 같은 앞부분에 두고, 검색한 문단은 마지막 질문 메시지에만 넣습니다.
+
+    Args:
+        question: 질문 텍스트
+        passages: 질문과 관련된 장 본문 문단 (없으면 질문만 전달)
+
+    Returns:
+        chat completions API에 전달할 메시지 리스트
+    """
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for example_question, example_answer in FEW_SHOT_EXAMPLES:
+        messages.append({"role": "user", "content": f"질문: {example_question}"})
+        messages.append({"role": "assistant", "content": example_answer})
+    messages.append({"role": "user", "content": _question_content(question, passages)})
+    return messages
+
+def build_batch_messages(items: List[Tuple[str, Optional[List[str]]]]) -> List[Dict[str, str]]:
+    """
+    여러 질문을 한 번에 묻는 프롬프트 메시지를 구성합니다.
+
+    지시문과 예시는 한 번만 넣고, 질문마다 번호를 붙여(검색한 문단은 해당 질문 안에) 하나의 사용자 메시지로 보냅니다.
+
+    Args:
+        items: (질문, 관련 문단) 목록
+
+    Returns:
+        chat completions API에 전달할 메시지 리스트
+    """
+    examples = "\n\n".join(f"[{i + 1}] 질문: {q}" for i, (q, _) in enumerate(FEW_SHOT_EXAMPLES))
+    example_answers = "\n".join(f"{i + 1}. {a}" for i, (_, a) in enumerate(FEW_SHOT_EXAMPLES))
+    content = "\n\n".join(f"[{i + 1}] {_question_content(q, p)}" for i, (q, p) in enumerate(items))
+    return [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": examples},
+        {"role": "assistant", "content": example_answers},
+        {"role": "user", "content": content},
+    ]
+
+def parse_batch_answers(text: str, count: int) -> List[Optional[str]]:
+    """
+    배치 답변에서 번호별 답을 꺼냅니다.
+
+    Args:
+        text: 모델이 반환한 "번호. 답" 형식의 텍스트
+        count: 질문 수
+
+    Returns:
+        질문 순서대로의 답 목록 (찾지 못한 번호는 None)
+    """
+    answers: List[Optional[str]] = [None] * count
+    for line in text.splitlines():
+        match = _BATCH_LINE.match(line)
+        if match is None:
+            continue
+        index = int(match.group(1)) - 1
+        if 0 <= index < count and answers[index] is None and match.group(2):
+            answers[index] = match.group(2)
+    return answers
+
+async def _complete(messages: List[Dict[str, str]], max_tokens: int = 300) -> str:
+    """동시 실행 제한 안에서 업스트림 모델을 호출하고 토큰 사용량을 기록합니다."""
+    async with upstream_semaphore:
+        response = await client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.3,  # 정확한 답변을 위해 낮은 temperature 설정
+        )
+    if upstream_usage is not None:
+        usage = usage_from_response(response)
+        upstream_usage.record(settings.OPENAI_MODEL, usage)
+        if settings.LOG_TOKEN_USAGE:
+            print(f"[토큰] 입력 {usage.prompt_tokens} (캐시 {usage.cached_tokens}) / 출력 {usage.completion_tokens}")
+    return response.choices[0].message.content.strip()
+
+async def _complete_batch(items: List[Tuple[str, Optional[List[str]]]]) -> List[str]:
+    """
+    마이크로 배치로 모인 질문들을 업스트림 호출 한 번으로 답합니다.
+
+    질문이 하나면 단건 프롬프트를 그대로 쓰고, 배치 답변에서 번호를 찾지 못한 질문만 단건으로 다시 묻습니다.
+
+    Args:
+        items: (질문, 관련 문단) 목록
+
+    Returns:
+        질문 순서대로의 답변 목록
+    """
+    if len(items) == 1:
+        return [await _complete(build_messages(*items[0]))]
+    text = await _complete(build_batch_messages(items), max_tokens=settings.MICRO_BATCH_TOKENS_PER_ANSWER * len(items))
+    answers = parse_batch_answers(text, len(items))
+    missing = [i for i, answer in enumerate(answers) if answer is None]
+    if missing:
+        print(f"[마이크로 배치] 질문 {len(items)}개 중 {len(missing)}개 답을 찾지 못해 따로 호출")
+        retried = await asyncio.gather(*(_complete(build_messages(*items[i])) for i in missing))
+        for i, answer in zip(missing, retried):
+            answers[i] = answer
+    return answers
+
+async def get_answer(question: str, question_id: str, difficulty: str, use_bank: bool = True) -> str:
     """
     질문에 대한 답변을 생성하는 함수
-    
+
     GPT-4o-mini 모델을 사용하여 삼국지 퀴즈 질문에 대한 답변을 생성합니다.
-    
+    문제 은행(HF train/show 분할)에 같은 문제가 있거나, 같은 문장의 다른 곳을 빈칸으로 만든 문제가 있으면
+    저장된 정답에서 답을 찾아 바로 반환합니다.
+    빈칸(ㅁ, _____) 문제는 먼저 장 본문에서 빈칸에 들어갈 말을 찾고, 신뢰도가 CLOZE_MIN_CONFIDENCE 이상이면
+    모델을 호출하지 않고 그 답을 반환합니다.
+    장 본문 색인이 있으면 관련 문단을 찾아 문맥으로 함께 전달합니다.
+    마이크로 배치가 켜져 있으면 MICRO_BATCH_WINDOW_MS 안에 들어온 다른 질문과 묶어 한 번에 모델을 호출합니다.
+    모델 답변이 인물 이름뿐이면 인물 이름 사전으로 한글 표기로 통일합니다.
+    같은 질문(정규화 기준)·모델·프롬프트 버전의 답변이 캐시에 있으면 모델을 호출하지 않습니다.
+    업스트림 호출은 이벤트 루프를 막지 않으며, 대기 시간을 포함해 REQUEST_TIMEOUT 안에 끝나야 합니다.
+
     Args:
         question: 질문 텍스트
         question_id: 질문 고유 ID
         difficulty: 질문 난이도
-        
+        use_bank: 문제 은행 검색 여부 (배치 경로에서 이미 검색했으면 False)
+
     Returns:
         str: 질문에 대한 답변
     """
+    if use_bank and question_bank is not None:
+        match = question_bank.lookup(question)
+        if match is not None:
+            print(f"[문제 은행] 질문 ID: {question_id}, 답변: {match.answer} (유사도 {match.similarity})")
+            return match.answer
+
+    if answer_cache is not None:
+        cached = answer_cache.get(question, settings.OPENAI_MODEL, prompt_version)
+        if cached is not None:
+            return cached
+
+    # 빈칸 문제는 장 본문에서 먼저 풀이 (수 ms, 네트워크 호출 없음)
+    if cloze_solver is not None:
+        solved = cloze_solver.solve(question)
+        if solved is not None:
+            if solved.confidence >= settings.CLOZE_MIN_CONFIDENCE:
+                cloze_counts["solved"] += 1
+                print(f"[빈칸 풀이] 질문 ID: {question_id}, 답변: {solved.answer} "
+                      f"(신뢰도 {solved.confidence}, {solved.chapter}장)")
+                return solved.answer
+            cloze_counts["fallback"] += 1
+
+    # 장 본문에서 관련 문단 검색 (수 ms)
+    passages = None
+    if retriever is not None:
+        passages = [text for _, _, text in retriever.search(question, settings.RETRIEVAL_TOP_K)]
+
     try:
-        # OpenAI API 호출
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # GPT-4o-mini 모델 사용
-            messages=[
-                {"role": "system", "content": "당신은 삼국지에 대한 전문가입니다. 삼국지 관련 퀴즈 질문에 정확하고 간결하게 단답형으로 답변해 주세요."},
-                {"role": "user", "content": f"질문: ( 연의 ) 유비가 서천을 평정하자, 손권은 형주를 돌려받기 위해, _____의 가족을 거짓으로 인질로 잡고는 그를 유비에게 사신으로 보내어 형주를 돌려달라고 했다."},
-                {"role": "assistant", "content": f"제갈근"},
-                {"role": "user", "content": f"질문: ( 연의 ) 손권은 관우를 죽이고 나서 연회를 열어 장수들의 전공을 축하했는데, 이 자리에서 '조조를 적벽에서 이긴 주유나 ㅁ주 지배를 하지 못한 노숙보다 여몽이 더 뛰어나다' 고 여몽에게 말했다."},
-                {"role": "assistant", "content": f"형"},
-                {"role": "user", "content": f"질문: {question}"}
-            ],
-            max_tokens=300,
-            temperature=0.3,  # 정확한 답변을 위해 낮은 temperature 설정
-        )
-        
-        # API 응답에서 답변 추출
-        answer = response.choices[0].message.content.strip()
-        return answer
-    
+        # OpenAI API 호출 (배치 대기 시간과 동시 실행 제한 대기 시간 포함 타임아웃)
+        if batcher is not None:
+            request = batcher.submit((question, passages))
+        else:
+            request = _complete(build_messages(question, passages))
+        answer = await asyncio.wait_for(request, timeout=settings.REQUEST_TIMEOUT)
+
+    except asyncio.TimeoutError:
+        print(f"OpenAI API 호출 타임아웃: {settings.REQUEST_TIMEOUT}초 초과 (질문 ID: {question_id})")
+        return f"죄송합니다. 답변 생성 시간이 초과되었습니다. (오류 코드: {question_id})"
     except Exception as e:
         # 오류 발생 시 로그 기록 후 기본 메시지 반환
         print(f"OpenAI API 호출 오류: {str(e)}")
         return f"죄송합니다. 답변을 생성하는 중 오류가 발생했습니다. (오류 코드: {question_id})"
 
+    # 이름만으로 된 답변은 한글 표기로 통일 ("諸葛亮" → "제갈량", "제갈량(諸葛亮)" → "제갈량")
+    if gazetteer is not None:
+        answer = gazetteer.to_hangul(answer) or answer
+
+    # 정상 답변만 캐시에 저장
+    if answer_cache is not None:
+        answer_cache.set(question, settings.OPENAI_MODEL, prompt_version, answer)
+    return answer
+
+@app.post("/known", response_model=KnownQuestions)
+async def known_question(question: QuizQuestion, limit: int = 5):
+    """문제 은행에서 질문과 문자 shingle Jaccard 유사도가 기준 이상인 질문과 정답을 찾습니다 (모델 호출 없음)."""
+    if known_questions is None:
+        raise HTTPException(status_code=404, detail="비슷한 질문 색인이 없습니다 (QUIZ_NEAR_DUPLICATES, 문제 은행 파일 확인)")
+    matches = known_questions.query(question.question, limit=limit)
+    return KnownQuestions(matches=[
+        KnownQuestion(question=m.question, answer=m.meta.get("answer", ""), source=m.meta.get("source", ""),
+                      similarity=m.similarity)
+        for m in matches
+    ])
+
 @app.get("/")
 async def root():
     """루트 엔드포인트: API 상태 확인용"""
-    return {"status": "online", "message": "3kingdoms Quiz API 서버가 실행 중입니다"}
+    status = {"status": "online", "message": "3kingdoms Quiz API 서버가 실행 중입니다", "pid": os.getpid()}
+    if answer_cache is not None:
+        status["cache"] = answer_cache.get_stats()
+    if retriever is not None:
+        status["retrieval"] = retriever.stats
+    if question_bank is not None:
+        status["question_bank"] = question_bank.stats
+    if known_questions is not None:
+        status["known_questions"] = known_questions.stats
+    if gazetteer is not None:
+        status["gazetteer"] = gazetteer.stats
+    if cloze_solver is not None:
+        status["cloze"] = {**cloze_solver.stats, **cloze_counts}
+    if batcher is not None:
+        status["micro_batch"] = batcher.stats
+    if upstream_usage is not None:
+        status["usage"] = upstream_usage.summary()
+    return status
+
+@app.get("/ready")
+async def readiness():
+    """준비 상태 확인용: 색인과 캐시를 모두 불러왔으면 200, 시작 중이거나 종료 중이면 503"""
+    status = {"ready": ready, "pid": os.getpid()}
+    return status if ready else JSONResponse(status_code=503, content=status)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+
+    parser = argparse.ArgumentParser(description="3kingdoms Quiz API 서버 실행")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("-w", "--workers", type=int, default=settings.WORKERS,
+                        help="워커 프로세스 수 (0이면 CPU 코어 수)")
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    if workers == 1:
+        uvicorn.run(app, host=args.host, port=args.port, timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT)
+    else:
+        # 여러 워커는 앱을 import 문자열로 넘겨야 각 프로세스가 따로 불러옴
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=workers, app_dir=settings.BASE_DIR,
+                    timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT)
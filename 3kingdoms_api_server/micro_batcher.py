@@ -0,0 +1,112 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class MicroBatcher:
+    """
+    짧은 시간 안에 들어온 요청을 모아 한 번에 처리하는 마이크로 배치 큐
+
+    첫 요청이 들어오면 window초 뒤에 모인 요청을 한 번에 처리하고, 그 전에 max_size개가 모이면 바로 처리합니다.
+    처리 함수는 요청 목록을 받아 같은 순서의 결과 목록을 반환해야 하며, 각 요청은 자기 결과를 받을 때까지 기다립니다.
+    요청별 대기 시간(큐에서 기다린 시간)과 처리 시간을 모아 stats로 보여 줍니다.
+    """
+
+    def __init__(self, process: Callable[[List[Any]], Awaitable[Sequence[Any]]],
+                 window: float = 0.02, max_size: int = 8):
+        """
+        마이크로 배치 큐를 초기화합니다.
+
+        Args:
+            process: 요청 목록을 받아 같은 순서의 결과 목록을 반환하는 비동기 함수
+            window: 첫 요청 이후 다른 요청을 기다리는 최대 시간(초)
+            max_size: 배치 하나의 최대 요청 수
+        """
+        self.process = process
+        self.window = window
+        self.max_size = max(1, max_size)
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self._counts = {"requests": 0, "batches": 0, "errors": 0, "largest_batch": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._process_total = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        요청을 큐에 넣고 배치 처리 결과를 기다립니다.
+
+        기다리던 쪽이 취소(타임아웃)되어도 이미 보낸 배치는 끝까지 처리되며, 그 결과만 버려집니다.
+
+        Args:
+            item: 처리 함수에 넘길 요청
+
+        Returns:
+            이 요청에 해당하는 처리 결과 (처리 함수가 예외를 던지면 같은 예외 발생)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """모인 요청을 하나의 배치 작업으로 떼어 내 실행합니다."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        if not batch:
+            return
+        # 요청 쪽 취소가 배치 전체로 번지지 않도록 별도 작업으로 실행 (참조를 잡아 두어 중간에 회수되지 않게 함)
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        """배치를 처리하고 결과를 각 요청에 나눠 줍니다."""
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            wait = started - enqueued
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        self._counts["requests"] += len(batch)
+        self._counts["batches"] += 1
+        self._counts["largest_batch"] = max(self._counts["largest_batch"], len(batch))
+
+        try:
+            results = await self.process([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"배치 결과 수가 다릅니다: 요청 {len(batch)}개, 결과 {len(results)}개")
+        except Exception as e:
+            self._counts["errors"] += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._process_total += time.perf_counter() - started
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """배치 수, 평균 배치 크기, 요청별 평균/최대 대기 시간과 배치 평균 처리 시간(ms)을 반환합니다."""
+        requests, batches = self._counts["requests"], self._counts["batches"]
+        return {
+            **self._counts,
+            "window_ms": round(self.window * 1000, 1),
+            "max_size": self.max_size,
+            "mean_batch_size": round(requests / batches, 2) if batches else 0.0,
+            "mean_wait_ms": round(self._wait_total / requests * 1000, 1) if requests else 0.0,
+            "max_wait_ms": round(self._wait_max * 1000, 1),
+            "mean_batch_ms": round(self._process_total / batches * 1000, 1) if batches else 0.0,
+        }
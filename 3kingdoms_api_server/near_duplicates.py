@@ -0,0 +1,492 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from retrieval import text_to_terms
+from index_files import invalidate_manifest, save_array, write_json
+from text_utils import normalize_question, strip_source_prefix
+
+INDEX_FORMAT_VERSION = 1
+# 질문을 나눌 문자 shingle 길이 (공백/문장 부호 제외)
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+SEED = 1
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class NearDuplicate(NamedTuple):
+    """비슷한 질문 검색 결과"""
+    item: int            # 색인 안의 번호
+    similarity: float    # Jaccard 유사도 (exact가 아니면 MinHash 추정치)
+    question: str
+    meta: Dict[str, str]  # 출처(source), 정답(answer) 등 추가 정보
+
+
+def question_shingles(question: str) -> np.ndarray:
+    """
+    질문을 문자 shingle 키 집합으로 변환합니다.
+
+    출처 표시("( 연의 )")는 같은 문제를 다른 분할에서 다르게 붙이는 경우가 있어 제외합니다.
+
+    Returns:
+        중복 없는 shingle 키 배열 (int64)
+    """
+    return np.unique(text_to_terms(strip_source_prefix(normalize_question(question)), SHINGLE_SIZE))
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """두 shingle 집합의 Jaccard 유사도"""
+    if len(a) == 0 and len(b) == 0:
+        return 1.0
+    common = len(np.intersect1d(a, b, assume_unique=True))
+    return common / (len(a) + len(b) - common)
+
+
+def _mix64(keys: np.ndarray) -> np.ndarray:
+    """splitmix64 마무리 단계로 shingle 키를 고르게 섞습니다 (비슷한 코드 포인트끼리 해시가 몰리지 않게)."""
+    x = keys.astype(np.uint64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Jaccard 기준값에서 놓치는 쌍과 잘못 잡는 후보 쌍의 기대 비율 합이 가장 작은 (밴드 수, 밴드당 행 수)를 고릅니다.
+
+    두 질문이 한 밴드 이상에서 같은 버킷에 들어갈 확률은 1 - (1 - s^r)^b 입니다.
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (num_perm, 1), float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        probability = 1.0 - (1.0 - grid ** rows) ** bands
+        # 균등 격자이므로 평균이 [0, 1] 구간 적분값
+        false_positive = np.where(grid < threshold, probability, 0.0).mean()
+        false_negative = np.where(grid >= threshold, 1.0 - probability, 0.0).mean()
+        if false_positive + false_negative < best_error:
+            best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+
+class MinHashLSH:
+    """
+    질문 텍스트의 MinHash 서명과 LSH 버킷으로 비슷한 질문을 찾는 색인
+
+    서명은 질문의 문자 shingle 집합에 num_perm개의 해시 함수를 적용한 최솟값이며,
+    같은 위치의 값이 같을 확률이 두 질문의 Jaccard 유사도와 같습니다.
+    서명을 밴드로 나눠 한 밴드라도 같은 질문만 후보로 비교하므로 모든 쌍을 비교하지 않습니다.
+    질문은 add()로 언제든 추가할 수 있고, 추가한 질문은 바로 검색됩니다.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = NUM_PERM, seed: int = SEED):
+        """
+        색인을 초기화합니다.
+
+        Args:
+            threshold: 비슷한 질문으로 볼 최소 Jaccard 유사도
+            num_perm: MinHash 해시 함수 수
+            seed: 해시 함수 계수 시드 (저장한 색인과 같아야 함)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        # 곱셈-시프트 해시 h(x) = ((a * x + b) mod 2^64) >> 32, a는 홀수
+        self._a = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._pending: List[np.ndarray] = []
+        self.questions: List[str] = []
+        self.meta: List[Dict[str, str]] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+
+    # ---------- 서명 ----------
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        """shingle 집합 하나의 MinHash 서명 (shingle이 없으면 모두 최댓값)"""
+        return self.signature_many([shingles])[0]
+
+    def signature_many(self, shingle_sets: Sequence[np.ndarray], chunk_shingles: int = 1 << 15) -> np.ndarray:
+        """
+        여러 shingle 집합의 서명을 한꺼번에 계산합니다.
+
+        shingle을 이어 붙여 (해시 함수 수 × shingle 수) 해시 행렬을 만들고 질문 경계마다 최솟값을 구하며,
+        메모리를 넘지 않도록 chunk_shingles개 정도씩 나눠 처리합니다.
+
+        Returns:
+            (질문 수, num_perm) uint32 서명 행렬
+        """
+        result = np.full((len(shingle_sets), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        start = 0
+        while start < len(shingle_sets):
+            end, total = start, 0
+            while end < len(shingle_sets) and (total == 0 or total + len(shingle_sets[end]) <= chunk_shingles):
+                total += len(shingle_sets[end])
+                end += 1
+            chunk = [s for s in shingle_sets[start:end]]
+            lengths = np.array([len(s) for s in chunk])
+            nonempty = np.flatnonzero(lengths)
+            if len(nonempty):
+                keys = _mix64(np.concatenate([chunk[i] for i in nonempty]))
+                hashes = ((self._a[:, None] * keys[None, :] + self._b[:, None]) >> np.uint64(32)).astype(np.uint32)
+                offsets = np.concatenate([[0], np.cumsum(lengths[nonempty])[:-1]])
+                result[start + nonempty] = np.minimum.reduceat(hashes, offsets, axis=1).T
+            start = end
+        return result
+
+    # ---------- 색인 ----------
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _insert(self, item: int, signature: np.ndarray) -> None:
+        for band, key in self._band_keys(signature):
+            self._buckets[band][key].append(item)
+
+    def add_many(self, questions: Sequence[str], meta: Optional[Sequence[Dict[str, str]]] = None) -> List[int]:
+        """
+        질문들을 색인에 추가합니다.
+
+        Args:
+            questions: 질문 텍스트 목록
+            meta: 질문별 추가 정보 (출처, 정답 등)
+
+        Returns:
+            추가한 질문의 색인 번호 목록
+        """
+        signatures = self.signature_many([question_shingles(q) for q in questions])
+        first = len(self.questions)
+        for offset, signature in enumerate(signatures):
+            self._insert(first + offset, signature)
+        self._pending.append(signatures)
+        self.questions.extend(questions)
+        self.meta.extend(meta if meta is not None else [{} for _ in questions])
+        return list(range(first, len(self.questions)))
+
+    def add(self, question: str, **meta: str) -> int:
+        """질문 하나를 추가하고 색인 번호를 반환합니다."""
+        return self.add_many([question], [meta])[0]
+
+    def _all_signatures(self) -> np.ndarray:
+        if self._pending:
+            self.signatures = np.concatenate([self.signatures, *self._pending])
+            self._pending = []
+        return self.signatures
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    # ---------- 검색 ----------
+
+    def _candidates(self, signature: np.ndarray) -> Set[int]:
+        candidates: Set[int] = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        return candidates
+
+    def query(self, question: str, threshold: Optional[float] = None, exact: bool = True,
+              limit: int = 10) -> List[NearDuplicate]:
+        """
+        질문과 비슷한 색인 안의 질문을 유사도 순으로 찾습니다.
+
+        Args:
+            question: 질문 텍스트
+            threshold: 최소 유사도 (None이면 색인의 threshold)
+            exact: True면 후보의 실제 Jaccard 유사도로 거르고 정렬 (False면 MinHash 추정치)
+            limit: 최대 결과 수
+
+        Returns:
+            비슷한 질문 목록
+        """
+        threshold = self.threshold if threshold is None else threshold
+        shingles = question_shingles(question)
+        signature = self.signature(shingles)
+        candidates = sorted(self._candidates(signature))
+        if not candidates:
+            return []
+        signatures = self._all_signatures()
+        estimates = (signatures[candidates] == signature).mean(axis=1)
+        results = []
+        for item, estimate in zip(candidates, estimates):
+            similarity = jaccard(shingles, question_shingles(self.questions[item])) if exact else float(estimate)
+            if similarity >= threshold:
+                results.append(NearDuplicate(item, round(similarity, 4), self.questions[item], self.meta[item]))
+        results.sort(key=lambda r: -r.similarity)
+        return results[:limit]
+
+    def duplicate_pairs(self, threshold: Optional[float] = None, exact: bool = True) -> List[Tuple[int, int, float]]:
+        """
+        색인 안에서 비슷한 질문 쌍을 모두 찾습니다.
+
+        같은 버킷에 들어간 쌍만 비교하므로 비교 횟수는 전체 쌍 수가 아니라 후보 쌍 수에 비례합니다.
+
+        Returns:
+            (앞 번호, 뒤 번호, 유사도) 리스트 (유사도 내림차순)
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signatures = self._all_signatures()
+        candidate_pairs: Set[Tuple[int, int]] = set()
+        for buckets in self._buckets:
+            for items in buckets.values():
+                if len(items) < 2:
+                    continue
+                for i, left in enumerate(items):
+                    for right in items[i + 1:]:
+                        candidate_pairs.add((left, right))
+        if not candidate_pairs:
+            return []
+
+        pairs = np.array(sorted(candidate_pairs), dtype=np.int64)
+        estimates = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        shingle_cache: Dict[int, np.ndarray] = {}
+
+        def shingles_of(item: int) -> np.ndarray:
+            if item not in shingle_cache:
+                shingle_cache[item] = question_shingles(self.questions[item])
+            return shingle_cache[item]
+
+        results = []
+        # 추정치가 기준보다 한참 낮은 후보는 실제 유사도를 계산하지 않음 (추정 오차 약 1/sqrt(num_perm))
+        margin = 3.0 / np.sqrt(self.num_perm) if exact else 0.0
+        for (left, right), estimate in zip(pairs.tolist(), estimates):
+            if estimate < threshold - margin:
+                continue
+            similarity = jaccard(shingles_of(left), shingles_of(right)) if exact else float(estimate)
+            if similarity >= threshold:
+                results.append((left, right, round(similarity, 4)))
+        results.sort(key=lambda r: -r[2])
+        return results
+
+    # ---------- 저장/불러오기 ----------
+
+    def save(self, index_dir: str, sources: Optional[Dict] = None) -> None:
+        """서명과 질문 정보를 디렉토리에 저장합니다 (sources는 원본 파일 서명 등 함께 남길 정보)."""
+        os.makedirs(index_dir, exist_ok=True)
+        # 다른 워커가 열어 둔 파일은 덮어쓰지 않고 교체 (manifest는 지웠다가 마지막에 기록)
+        invalidate_manifest(index_dir)
+        save_array(os.path.join(index_dir, "signatures.npy"), self._all_signatures())
+        write_json(os.path.join(index_dir, "items.json"), {"questions": self.questions, "meta": self.meta})
+        # manifest는 마지막에 기록 (중간에 실패하면 다음 실행에서 다시 생성)
+        manifest = {"format": INDEX_FORMAT_VERSION, "shingle_size": SHINGLE_SIZE, "num_perm": self.num_perm,
+                    "seed": self.seed, "threshold": self.threshold, "sources": sources or {}, "built_at": time.time()}
+        write_json(os.path.join(index_dir, "manifest.json"), manifest)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "MinHashLSH":
+        """저장한 색인을 불러와 버킷을 다시 채웁니다."""
+        with open(os.path.join(index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        index = cls(manifest["threshold"], manifest["num_perm"], manifest["seed"])
+        with open(os.path.join(index_dir, "items.json"), "r", encoding="utf-8") as f:
+            items = json.load(f)
+        index.questions, index.meta = items["questions"], items["meta"]
+        index.signatures = np.load(os.path.join(index_dir, "signatures.npy"))
+        for item, signature in enumerate(index.signatures):
+            index._insert(item, signature)
+        return index
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {"questions": len(self.questions), "num_perm": self.num_perm, "bands": self.bands,
+                "rows": self.rows, "threshold": self.threshold}
+
+
+def unique_paths(paths: Sequence[str]) -> List[str]:
+    """
+    같은 파일을 가리키는 경로를 하나만 남깁니다 (처음 나온 경로 유지).
+
+    data/quiz_data.csv는 test.csv의 심볼릭 링크라, 둘 다 읽으면 같은 질문이 두 번 색인되고 자기 자신과 짝이 됩니다.
+    """
+    seen, unique = set(), []
+    for path in paths:
+        real_path = os.path.realpath(path)
+        if real_path not in seen:
+            seen.add(real_path)
+            unique.append(path)
+    return unique
+
+
+def _file_signatures(paths: Sequence[str]) -> Dict[str, Dict[str, int]]:
+    signatures = {}
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signatures[os.path.realpath(path)] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    return signatures
+
+
+def read_questions(path: str, source: Optional[str] = None) -> Tuple[List[str], List[Dict[str, str]]]:
+    """question(/answer) 컬럼을 가진 CSV에서 질문과 추가 정보(출처, 행 번호, 정답)를 읽습니다."""
+    source = source or os.path.splitext(os.path.basename(path))[0]
+    questions, meta = [], []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row_number, row in enumerate(csv.DictReader(f)):
+            question = row.get("question") or ""
+            if not question.strip():
+                continue
+            questions.append(question)
+            meta.append({"source": source, "row": str(row_number), "answer": (row.get("answer") or "").strip()})
+    return questions, meta
+
+
+def load_or_build(csv_paths: Sequence[str], index_dir: str, threshold: float = 0.8,
+                  num_perm: int = NUM_PERM) -> Tuple[MinHashLSH, bool]:
+    """
+    CSV 파일들의 질문 색인을 불러오고, 원본이 바뀌었거나 설정이 다르면 다시 만듭니다.
+    같은 파일을 가리키는 경로(심볼릭 링크)는 한 번만 읽습니다.
+
+    Returns:
+        (색인, 다시 만들었는지 여부)
+    """
+    csv_paths = unique_paths(csv_paths)
+    sources = _file_signatures(csv_paths)
+    try:
+        with open(os.path.join(index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if (manifest.get("format") == INDEX_FORMAT_VERSION and manifest.get("shingle_size") == SHINGLE_SIZE
+                and manifest.get("num_perm") == num_perm and manifest.get("threshold") == threshold
+                and manifest.get("sources") == sources):
+            return MinHashLSH.load(index_dir), False
+    except (OSError, json.JSONDecodeError, KeyError):
+        pass
+
+    index = MinHashLSH(threshold, num_perm)
+    for path in csv_paths:
+        if os.path.exists(path):
+            index.add_many(*read_questions(path))
+    index.save(index_dir, sources)
+    return index, True
+
+
+# ---------- 분할 간 중복/유출 보고 ----------
+
+def leakage_report(index: MinHashLSH, pairs: List[Tuple[int, int, float]],
+                   train_sources: Sequence[str], eval_sources: Sequence[str], examples: int = 20) -> Dict:
+    """
+    비슷한 질문 쌍을 출처 조합별로 세고, 평가용 분할 질문 중 학습용 분할에 비슷한 질문이 있는 것을 모읍니다.
+
+    Args:
+        index: 질문 색인
+        pairs: duplicate_pairs() 결과
+        train_sources: 학습에 쓰는 출처 (예: train, show)
+        eval_sources: 평가에 쓰는 출처 (예: test, quiz_data)
+        examples: 출처 조합별로 남길 예시 수
+
+    Returns:
+        {"pair_counts": {"a~b": 개수}, "exact_counts": {"a~b": shingle 집합이 같은 쌍 수}, "leaked": {평가 출처: {"questions", "leaked", "rate"}}, "examples": {...}}
+    """
+    counts: Dict[str, int] = defaultdict(int)
+    exact_counts: Dict[str, int] = defaultdict(int)
+    samples: Dict[str, List[Dict]] = defaultdict(list)
+    leaked: Dict[str, Set[int]] = defaultdict(set)
+    for left, right, similarity in pairs:
+        sources = sorted([index.meta[left]["source"], index.meta[right]["source"]])
+        combo = "~".join(sources)
+        counts[combo] += 1
+        if similarity >= 1.0:
+            exact_counts[combo] += 1
+        if len(samples[combo]) < examples:
+            samples[combo].append({"similarity": similarity,
+                                   "a": {**index.meta[left], "question": index.questions[left]},
+                                   "b": {**index.meta[right], "question": index.questions[right]}})
+        for item, other in ((left, right), (right, left)):
+            if index.meta[item]["source"] in eval_sources and index.meta[other]["source"] in train_sources:
+                leaked[index.meta[item]["source"]].add(item)
+
+    totals: Dict[str, int] = defaultdict(int)
+    for meta in index.meta:
+        totals[meta["source"]] += 1
+    return {
+        "pair_counts": dict(sorted(counts.items())),
+        "exact_counts": {combo: exact_counts[combo] for combo in sorted(counts)},
+        "leaked": {source: {"questions": totals[source], "leaked": len(leaked[source]),
+                            "rate": round(len(leaked[source]) / totals[source], 4) if totals[source] else 0.0}
+                   for source in eval_sources},
+        "examples": dict(samples),
+    }
+
+
+def main() -> None:
+    import settings
+
+    split_dir = os.path.join(settings.REPO_DIR, "3qa_quiz_huggingface_manager")
+    default_files = [os.path.join(split_dir, f"{split}.csv") for split in ("train", "validation", "test", "show")]
+    default_files.append(os.path.join(settings.REPO_DIR, "data", "quiz_data.csv"))
+
+    parser = argparse.ArgumentParser(description="MinHash LSH로 분할 간 비슷한 질문과 학습/평가 유출을 찾습니다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_parser = sub.add_parser("report", help="분할 간 비슷한 질문 쌍과 유출 보고")
+    report_parser.add_argument("files", nargs="*", default=default_files,
+                               help="question 컬럼을 가진 CSV (출처 이름은 파일 이름)")
+    report_parser.add_argument("--train", nargs="+", default=["train", "show"], help="학습용 출처")
+    report_parser.add_argument("--eval", nargs="+", default=["validation", "test", "quiz_data"], help="평가용 출처")
+    report_parser.add_argument("-o", "--output", help="예시를 포함한 보고서 JSON 저장 경로")
+    query_parser = sub.add_parser("query", help="질문과 비슷한 질문 검색 (질문 은행 색인 사용)")
+    query_parser.add_argument("question")
+    query_parser.add_argument("-n", "--limit", type=int, default=10)
+    for p in (report_parser, query_parser):
+        p.add_argument("-t", "--threshold", type=float, default=settings.NEAR_DUPLICATE_THRESHOLD,
+                       help="최소 Jaccard 유사도")
+    args = parser.parse_args()
+
+    if args.command == "query":
+        started = time.perf_counter()
+        index, rebuilt = load_or_build(settings.QUESTION_BANK_FILES, settings.NEAR_DUPLICATE_INDEX_DIR,
+                                       settings.NEAR_DUPLICATE_THRESHOLD)
+        print(f"색인 준비 ({time.perf_counter() - started:.2f}초, 다시 생성: {'예' if rebuilt else '아니오'}): "
+              f"{index.stats}")
+        started = time.perf_counter()
+        results = index.query(args.question, threshold=args.threshold, limit=args.limit)
+        print(f"검색 시간: {(time.perf_counter() - started) * 1000:.2f}ms")
+        for result in results:
+            print(f"  {result.similarity:.3f} [{result.meta.get('source')}] {result.question} -> {result.meta.get('answer')}")
+        return
+
+    files = unique_paths(args.files)
+    for path in args.files:
+        if path not in files:
+            print(f"같은 파일이라 건너뜀: {path} -> {os.path.realpath(path)}")
+    # 건너뛴 파일의 출처는 색인에 질문이 없으므로 유출 비율에서 제외
+    indexed_sources = {os.path.splitext(os.path.basename(path))[0] for path in files}
+    eval_sources = [source for source in args.eval if source in indexed_sources]
+
+    started = time.perf_counter()
+    index = MinHashLSH(args.threshold)
+    for path in files:
+        index.add_many(*read_questions(path))
+    indexed = time.perf_counter()
+    pairs = index.duplicate_pairs()
+    found = time.perf_counter()
+    report = leakage_report(index, pairs, args.train, eval_sources)
+    report["timing"] = {"index_seconds": round(indexed - started, 3), "pairs_seconds": round(found - indexed, 3)}
+    report["index"] = index.stats
+
+    print(f"질문 {len(index)}개 색인 {indexed - started:.2f}초, 비슷한 쌍 {len(pairs)}개 찾기 {found - indexed:.2f}초 "
+          f"(Jaccard >= {args.threshold}, 밴드 {index.bands} x {index.rows})")
+    print("출처 조합별 비슷한 질문 쌍 (그중 같은 질문):")
+    for combo, count in report["pair_counts"].items():
+        print(f"  {combo}: {count} ({report['exact_counts'][combo]})")
+    print(f"평가 질문 중 학습용({', '.join(args.train)})에 비슷한 질문이 있는 비율:")
+    for source, row in report["leaked"].items():
+        print(f"  {source}: {row['leaked']}/{row['questions']} ({row['rate']:.1%})")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"보고서 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
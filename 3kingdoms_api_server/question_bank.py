@@ -0,0 +1,430 @@
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from cloze_solver import parse_cloze
+from retrieval import text_to_terms
+from index_files import invalidate_manifest, save_array, write_json
+from text_utils import normalize_question
+
+# _____ 빈칸을 ㅁ 빈칸과 구별해 n-gram에 남기기 위한 표시 문자 (현대 한국어 본문에 나오지 않는 옛 자모)
+_BLANK_MARK = "ㅿ"
+_UNDERSCORE_BLANK = re.compile(r"_{2,}")
+_NON_WORD = re.compile(r"[\W_]+")
+
+INDEX_FORMAT_VERSION = 1
+# 사용할 문자 n-gram 길이 (2-gram과 3-gram 키는 값 범위가 달라 섞여도 겹치지 않음)
+NGRAMS = (2, 3)
+# 질문마다 정답 옮기기를 시도할 최대 후보 수 (유사도 순)
+MAX_CANDIDATES = 5
+# 빈칸 앞/뒤 문맥을 맞춰볼 최대/최소 글자 수
+MAX_ANCHOR = 12
+MIN_ANCHOR = 2
+# 길이를 모르는 빈칸(_____)에 들어갈 수 있는 최대 글자 수
+MAX_FILLER_LENGTH = 12
+# _____ 빈칸의 숫자 정답은 아라비아 숫자로 표기됨 ("황제 ___분" → "2")
+_NATIVE_NUMERALS = {"한": "1", "두": "2", "세": "3", "네": "4", "다섯": "5",
+                    "여섯": "6", "일곱": "7", "여덟": "8", "아홉": "9", "열": "10"}
+
+
+class BankMatch(NamedTuple):
+    """문제 은행 검색 결과"""
+    answer: str
+    similarity: float
+    question: str
+    exact: bool
+
+
+def fill_blank(question: str, answer: str) -> Optional[tuple]:
+    """
+    빈칸 문제의 빈칸에 정답을 넣어 원래 문장을 복원합니다 (띄어쓰기, 문장 부호 제외).
+
+    Args:
+        question: 빈칸이 하나인 질문 텍스트
+        answer: 정답
+
+    Returns:
+        (복원한 문장, 정답 시작 위치, 정답 끝 위치) (빈칸 문제가 아니면 None)
+    """
+    cloze = parse_cloze(question)
+    if cloze is None:
+        return None
+    answer = _NON_WORD.sub("", answer)
+    start = len(cloze["left"])
+    return cloze["left"] + answer + cloze["right"], start, start + len(answer)
+
+
+def transfer_answer(cloze: Dict, filled: tuple) -> Optional[str]:
+    """
+    빈칸 문제의 앞/뒤 문맥을 복원한 문장에 맞춰, 빈칸 자리에 있는 말을 꺼냅니다.
+
+    같은 문장에서 다른 곳을 빈칸으로 만든 문제끼리 정답을 옮기는 데 사용합니다.
+    꺼낸 말이 복원한 문장의 정답 자리와 겹치면, 빈칸 위치는 같고 다른 부분이 바뀐
+    문제(예: 인물만 다른 같은 형식의 문제)이므로 옮기지 않습니다.
+
+    Args:
+        cloze: parse_cloze() 결과
+        filled: fill_blank() 결과
+
+    Returns:
+        빈칸 자리의 말 (문맥이 맞지 않으면 None)
+    """
+    sentence, answer_start, answer_end = filled
+    span = _locate(cloze, sentence)
+    if span is None:
+        return None
+    start, end = span
+    if start < answer_end and answer_start < end:
+        return None
+    answer = sentence[start:end]
+    if cloze["length"] is None:
+        answer = _NATIVE_NUMERALS.get(answer, answer)
+    return answer
+
+
+def _locate(cloze: Dict, sentence: str) -> Optional[tuple]:
+    """복원한 문장에서 빈칸 자리의 (시작, 끝) 위치를 찾습니다."""
+    left, right, length = cloze["left"], cloze["right"], cloze["length"]
+
+    # 빈칸 바로 앞 문맥 중 문장에 한 번만 나오는 가장 긴 부분으로 시작 위치를 정함
+    start = 0 if not left else None
+    for k in range(min(len(left), MAX_ANCHOR), MIN_ANCHOR - 1, -1):
+        position = sentence.find(left[-k:])
+        if position >= 0 and sentence.find(left[-k:], position + 1) < 0:
+            start = position + k
+            break
+    if start is None:
+        return None
+
+    if length is not None:
+        end = start + length
+        if not right:
+            return (start, end) if end == len(sentence) else None
+        anchor = right[:min(len(right), MAX_ANCHOR)]
+        matched = 0
+        while matched < len(anchor) and end + matched < len(sentence) and sentence[end + matched] == anchor[matched]:
+            matched += 1
+        return (start, end) if matched >= min(MIN_ANCHOR, len(right)) and end > start else None
+
+    if not right:
+        return (start, len(sentence)) if 0 < len(sentence) - start <= MAX_FILLER_LENGTH else None
+    for k in range(min(len(right), MAX_ANCHOR), MIN_ANCHOR - 1, -1):
+        end = sentence.find(right[:k], start + 1, start + MAX_FILLER_LENGTH + k)
+        if end >= 0:
+            return start, end
+    return None
+
+
+def question_terms(question: str) -> np.ndarray:
+    """
+    질문을 문자 n-gram 키 배열로 변환합니다.
+
+    출처 표시와 빈칸 위치도 문제의 일부이므로 그대로 n-gram에 포함합니다.
+
+    Args:
+        question: 질문 텍스트
+
+    Returns:
+        n-gram 키 배열 (int64, 등장 순서, 중복 포함)
+    """
+    text = _UNDERSCORE_BLANK.sub(_BLANK_MARK, normalize_question(question))
+    return np.concatenate([text_to_terms(text, n) for n in NGRAMS])
+
+
+class QuestionBank:
+    """
+    질문/정답 쌍(HF train, show 분할)에 대한 최근접 질문 색인
+
+    문자 n-gram TF-IDF 행렬을 열(n-gram) 단위로 압축(CSC)한 numpy 배열로 저장하고,
+    질문 벡터와의 코사인 유사도를 희소 행렬-벡터 곱 한 번으로 계산합니다.
+    색인은 원본 CSV가 바뀌었을 때만 다시 만들고, 평소에는 메모리 매핑으로 불러옵니다.
+    """
+
+    def __init__(self, csv_paths: Sequence[str], index_dir: str, threshold: float = 0.6):
+        """
+        문제 은행을 초기화합니다. 실제 색인은 load_or_build()로 불러옵니다.
+
+        Args:
+            csv_paths: 'question', 'answer' 컬럼을 가진 CSV 경로 목록
+            index_dir: 색인 파일을 저장할 디렉토리
+            threshold: 저장된 답을 사용할 최소 코사인 유사도
+        """
+        self.csv_paths = [os.path.abspath(p) for p in csv_paths]
+        self.index_dir = index_dir
+        self.threshold = threshold
+        self.terms: Optional[np.ndarray] = None
+        self.stats: Dict[str, int] = {}
+
+    # ---------- 색인 생성 ----------
+
+    def _signatures(self) -> Dict[str, Dict[str, int]]:
+        signatures = {}
+        for path in self.csv_paths:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signatures[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        return signatures
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _read_pairs(self) -> List[Dict[str, str]]:
+        """CSV들에서 질문/정답 쌍을 읽고, 정규화한 질문이 같은 쌍은 처음 것만 남깁니다."""
+        pairs, seen = [], set()
+        for path in self.csv_paths:
+            if not os.path.exists(path):
+                print(f"[문제 은행] 파일이 없어 건너뜁니다: {path}")
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    question, answer = row.get("question", ""), (row.get("answer") or "").strip()
+                    key = normalize_question(question)
+                    if not key or not answer or key in seen:
+                        continue
+                    seen.add(key)
+                    pairs.append({"question": question, "answer": answer})
+        return pairs
+
+    def build(self) -> Dict[str, int]:
+        """
+        TF-IDF 행렬을 만들어 디스크에 저장합니다.
+
+        가중치는 (1 + log tf) × idf이고, 각 질문 벡터는 길이 1로 정규화합니다.
+
+        Returns:
+            {'questions': 질문 수, 'terms': n-gram 수, 'nonzeros': 0이 아닌 항목 수}
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        pairs = self._read_pairs()
+
+        rows, keys, tfs = [], [], []
+        for i, pair in enumerate(pairs):
+            unique, tf = np.unique(question_terms(pair["question"]), return_counts=True)
+            rows.append(np.full(len(unique), i, dtype=np.int32))
+            keys.append(unique)
+            tfs.append(tf)
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        tfs = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.int64)
+
+        # n-gram 순으로 정렬해 열 단위 압축 (CSC)
+        order = np.argsort(keys, kind="stable")
+        keys, rows, tfs = keys[order], rows[order], tfs[order]
+        terms, starts, df = np.unique(keys, return_index=True, return_counts=True)
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+
+        num_questions = len(pairs)
+        idf = (np.log((num_questions + 1) / (df + 1)) + 1.0).astype(np.float32)
+        values = (1.0 + np.log(tfs)).astype(np.float32) * np.repeat(idf, df)
+        norms = np.sqrt(np.bincount(rows, weights=values.astype(np.float64) ** 2, minlength=num_questions))
+        values /= np.maximum(norms[rows], 1e-12).astype(np.float32)
+
+        arrays = {"terms": terms, "offsets": offsets, "rows": rows, "values": values, "idf": idf}
+        # 다른 워커가 열어 둔 파일은 덮어쓰지 않고 교체 (manifest는 지웠다가 마지막에 기록)
+        invalidate_manifest(self.index_dir)
+        for key, value in arrays.items():
+            save_array(os.path.join(self.index_dir, f"{key}.npy"), value)
+        write_json(os.path.join(self.index_dir, "pairs.json"), pairs)
+
+        # manifest는 마지막에 기록 (중간에 실패하면 다음 실행에서 다시 생성)
+        manifest = {"format": INDEX_FORMAT_VERSION, "ngrams": list(NGRAMS),
+                    "files": self._signatures(), "built_at": time.time()}
+        write_json(os.path.join(self.index_dir, "manifest.json"), manifest)
+
+        return {"questions": num_questions, "terms": len(terms), "nonzeros": len(rows)}
+
+    def is_stale(self) -> bool:
+        """원본 CSV가 색인 생성 이후 추가/변경/삭제되었는지 확인합니다."""
+        manifest = self._load_manifest()
+        if manifest.get("format") != INDEX_FORMAT_VERSION or manifest.get("ngrams") != list(NGRAMS):
+            return True
+        return manifest.get("files") != self._signatures()
+
+    # ---------- 색인 불러오기/검색 ----------
+
+    def load(self) -> None:
+        """디스크의 색인을 메모리 매핑으로 불러옵니다."""
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(self.index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.terms = array("terms")
+        self.offsets = array("offsets")
+        self.rows = array("rows")
+        self.values = array("values")
+        self.idf = array("idf")
+        with open(os.path.join(self.index_dir, "pairs.json"), "r", encoding="utf-8") as f:
+            self.pairs = json.load(f)
+        self.num_questions = len(self.pairs)
+        # 색인에 없는 n-gram은 가장 희귀한 n-gram으로 보고 질문 벡터 길이에만 반영
+        self.unseen_idf = float(np.log(self.num_questions + 1) + 1.0)
+        self.stats = {"questions": self.num_questions, "terms": len(self.terms), "nonzeros": len(self.rows)}
+
+    def load_or_build(self) -> Dict[str, int]:
+        """
+        색인이 최신이면 불러오고, 아니면 다시 생성한 뒤 불러옵니다.
+
+        Returns:
+            생성 결과 (생성하지 않았으면 빈 딕셔너리)
+        """
+        result = {}
+        if self.is_stale():
+            result = self.build()
+        self.load()
+        return result
+
+    def similarities(self, questions: Sequence[str]) -> np.ndarray:
+        """
+        질문들과 저장된 모든 질문 사이의 코사인 유사도를 계산합니다.
+
+        질문 벡터들의 0이 아닌 항목에 해당하는 열만 모아 한 번의 희소 행렬 곱으로 계산합니다.
+
+        Args:
+            questions: 질문 텍스트 목록
+
+        Returns:
+            (질문 수, 저장된 질문 수) 유사도 행렬
+        """
+        if self.terms is None:
+            raise RuntimeError("색인을 먼저 불러와야 합니다 (load_or_build)")
+
+        query_ids, columns, weights = [], [], []
+        for i, question in enumerate(questions):
+            unique, tf = np.unique(question_terms(question), return_counts=True)
+            positions = np.searchsorted(self.terms, unique)
+            known = positions < len(self.terms)
+            known[known] = self.terms[positions[known]] == unique[known]
+            weight = 1.0 + np.log(tf)
+            idf = np.where(known, self.idf[np.minimum(positions, len(self.terms) - 1)], self.unseen_idf)
+            weight = weight * idf
+            norm = np.sqrt(np.sum(weight ** 2))
+            if norm == 0:
+                continue
+            query_ids.append(np.full(known.sum(), i, dtype=np.int64))
+            columns.append(positions[known])
+            weights.append((weight[known] / norm).astype(np.float32))
+
+        scores = np.zeros((len(questions), self.num_questions), dtype=np.float32)
+        if not columns:
+            return scores
+        query_ids, columns, weights = np.concatenate(query_ids), np.concatenate(columns), np.concatenate(weights)
+
+        # 필요한 열들의 (행, 값)을 한꺼번에 모아 (질문, 저장된 질문) 칸에 누적
+        starts, ends = self.offsets[columns], self.offsets[columns + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return scores
+        entry_owner = np.repeat(np.arange(len(columns)), lengths)
+        entry_index = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+        cells = query_ids[entry_owner] * self.num_questions + self.rows[entry_index]
+        flat = np.bincount(cells, weights=self.values[entry_index] * weights[entry_owner],
+                           minlength=len(questions) * self.num_questions)
+        return flat.reshape(len(questions), self.num_questions).astype(np.float32)
+
+    def lookup_many(self, questions: Sequence[str]) -> List[Optional[BankMatch]]:
+        """
+        질문마다 비슷한 저장된 질문을 찾아 정답을 반환합니다.
+
+        유사도가 threshold 이상인 후보를 유사도 순으로 확인하며,
+        정규화한 질문이 같으면 저장된 정답을 그대로 쓰고, 둘 다 빈칸 문제이면
+        후보의 빈칸에 정답을 넣어 복원한 문장에서 들어온 질문의 빈칸 자리에 있는 말을 꺼냅니다.
+
+        Args:
+            questions: 질문 텍스트 목록
+
+        Returns:
+            질문별 검색 결과 (해당하는 후보가 없으면 None)
+        """
+        if not questions or self.num_questions == 0:
+            return [None] * len(questions)
+        scores = self.similarities(questions)
+        top_k = min(MAX_CANDIDATES, self.num_questions)
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+
+        matches = []
+        for i, question in enumerate(questions):
+            order = candidates[i][np.argsort(-scores[i, candidates[i]])]
+            key, cloze, match = normalize_question(question), parse_cloze(question), None
+            for row in order:
+                similarity = float(scores[i, row])
+                if similarity < self.threshold:
+                    break
+                pair = self.pairs[int(row)]
+                if normalize_question(pair["question"]) == key:
+                    match = BankMatch(pair["answer"], round(similarity, 4), pair["question"], True)
+                    break
+                filled = fill_blank(pair["question"], pair["answer"]) if cloze is not None else None
+                answer = transfer_answer(cloze, filled) if filled else None
+                if answer:
+                    match = BankMatch(answer, round(similarity, 4), pair["question"], False)
+                    break
+            matches.append(match)
+        return matches
+
+    def lookup(self, question: str) -> Optional[BankMatch]:
+        """
+        질문 하나를 검색합니다.
+
+        Args:
+            question: 질문 텍스트
+
+        Returns:
+            검색 결과 (기준 미만이면 None)
+        """
+        return self.lookup_many([question])[0]
+
+
+def main() -> None:
+    import settings
+
+    parser = argparse.ArgumentParser(description="문제 은행 색인 생성/검색/평가")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="색인 생성")
+    search_parser = sub.add_parser("search", help="질문과 가장 비슷한 저장된 질문 검색")
+    search_parser.add_argument("question")
+    eval_parser = sub.add_parser("evaluate", help="퀴즈 CSV로 유사도 기준별 정확도 확인")
+    eval_parser.add_argument("csv_path", help="question, answer 컬럼을 가진 퀴즈 CSV")
+    eval_parser.add_argument("-b", "--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    bank = QuestionBank(settings.QUESTION_BANK_FILES, settings.QUESTION_BANK_INDEX_DIR, threshold=0.0)
+    started = time.perf_counter()
+    result = bank.load_or_build()
+    print(f"색인 준비 완료 ({time.perf_counter() - started:.2f}초): {result}, {bank.stats}")
+
+    if args.command == "search":
+        started = time.perf_counter()
+        match = bank.lookup(args.question)
+        print(f"검색 시간: {(time.perf_counter() - started) * 1000:.2f}ms")
+        print(match)
+
+    elif args.command == "evaluate":
+        with open(args.csv_path, "r", encoding="utf-8") as f:
+            rows = [row for row in csv.DictReader(f) if row.get("question")]
+        started = time.perf_counter()
+        matches = []
+        for i in range(0, len(rows), args.batch_size):
+            matches.extend(bank.lookup_many([row["question"] for row in rows[i:i + args.batch_size]]))
+        elapsed = time.perf_counter() - started
+        print(f"질문 {len(rows)}개, 질문당 평균 {elapsed / max(len(rows), 1) * 1e6:.0f}µs (배치 {args.batch_size})")
+        for threshold in (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9):
+            answered = [(m, row) for m, row in zip(matches, rows) if m is not None and m.similarity >= threshold]
+            correct = sum(1 for m, row in answered
+                          if _NON_WORD.sub("", m.answer) == _NON_WORD.sub("", row.get("answer", "")))
+            precision = correct / len(answered) if answered else 0.0
+            print(f"  유사도 >= {threshold:.2f}: 답변 {len(answered)}개 ({len(answered) / max(len(rows), 1):.1%}), "
+                  f"정답 일치 {precision:.1%}")
+
+
+if __name__ == "__main__":
+    main()
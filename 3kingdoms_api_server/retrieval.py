@@ -0,0 +1,358 @@
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from index_files import invalidate_manifest, save_array, save_arrays, write_bytes, write_json
+from text_utils import strip_source_prefix
+
+# 검색어/본문에서 제외할 문자 (한글, 한자, 영문, 숫자만 사용)
+_NON_WORD = re.compile(r"[\W_]+")
+# 빈칸 표시 (ㅁ, _____)
+_BLANK = re.compile(r"ㅁ+|_{2,}")
+
+INDEX_FORMAT_VERSION = 1
+
+
+def text_to_terms(text: str, ngram: int = 2) -> np.ndarray:
+    """
+    텍스트를 문자 n-gram 키 배열로 변환합니다.
+
+    n-gram은 각 문자의 코드 포인트(21비트)를 이어 붙인 정수로 표현하므로 별도의 어휘 사전이 필요 없습니다.
+
+    Args:
+        text: 변환할 텍스트
+        ngram: n-gram 길이 (최대 3)
+
+    Returns:
+        n-gram 키 배열 (int64, 등장 순서)
+    """
+    chars = _NON_WORD.sub("", text)
+    if len(chars) < ngram:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.frombuffer(chars.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    keys = codes[: len(codes) - ngram + 1].copy()
+    for i in range(1, ngram):
+        keys = (keys << 21) | codes[i: len(codes) - ngram + 1 + i]
+    return keys
+
+
+def split_passages(text: str, min_chars: int = 200, max_chars: int = 600) -> List[str]:
+    """
+    장 본문을 검색 단위 문단으로 나눕니다. 짧은 문단은 이어 붙이고 긴 문단은 잘라냅니다.
+
+    Args:
+        text: 장 본문
+        min_chars: 문단을 이어 붙이는 최소 길이
+        max_chars: 문단 최대 길이
+
+    Returns:
+        문단 리스트
+    """
+    passages = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        current = f"{current}\n{paragraph}" if current else paragraph
+        if len(current) < min_chars:
+            continue
+        while len(current) > max_chars:
+            passages.append(current[:max_chars])
+            current = current[max_chars:]
+        passages.append(current)
+        current = ""
+    if current:
+        passages.append(current)
+    return passages
+
+
+class ChapterIndex:
+    """
+    jinho_3kingdoms 장 본문에 대한 BM25 역색인
+
+    문자 n-gram 단위로 색인하며, 색인은 numpy 파일로 저장해 메모리 매핑으로 불러옵니다.
+    장 파일이 바뀌면 바뀐 파일만 다시 토큰화하고 전체 색인을 합쳐서 다시 만듭니다.
+    """
+
+    def __init__(self, corpus_dir: str, index_dir: str, ngram: int = 2,
+                 k1: float = 1.2, b: float = 0.75):
+        """
+        색인을 초기화합니다. 실제 색인은 load_or_build()로 불러옵니다.
+
+        Args:
+            corpus_dir: 장 텍스트 파일(*.txt) 디렉토리
+            index_dir: 색인 파일을 저장할 디렉토리
+            ngram: 문자 n-gram 길이
+            k1: BM25 k1 파라미터
+            b: BM25 b 파라미터
+        """
+        self.corpus_dir = corpus_dir
+        self.index_dir = index_dir
+        self.ngram = ngram
+        self.k1 = k1
+        self.b = b
+        self.terms: Optional[np.ndarray] = None
+        self.stats: Dict[str, float] = {}
+
+    # ---------- 색인 생성 ----------
+
+    def _corpus_files(self) -> Dict[str, str]:
+        """장 이름 → 파일 경로"""
+        paths = glob.glob(os.path.join(self.corpus_dir, "*.txt"))
+        return {os.path.splitext(os.path.basename(p))[0]: p for p in paths}
+
+    def _file_signature(self, path: str) -> Dict[str, int]:
+        stat = os.stat(path)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _tokenize_file(self, name: str, path: str) -> Dict[str, np.ndarray]:
+        """장 파일 하나를 문단별 (n-gram 키, 빈도) 배열로 변환해 파일별 캐시에 저장합니다."""
+        with open(path, "r", encoding="utf-8") as f:
+            passages = split_passages(f.read())
+
+        keys, tfs, counts = [], [], []
+        for passage in passages:
+            unique, tf = np.unique(text_to_terms(passage, self.ngram), return_counts=True)
+            keys.append(unique)
+            tfs.append(tf.astype(np.float32))
+            counts.append(len(unique))
+
+        data = {
+            "keys": np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64),
+            "tfs": np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.float32),
+            "counts": np.array(counts, dtype=np.int64),
+            "lengths": np.array([len(_NON_WORD.sub("", p)) for p in passages], dtype=np.float32),
+            "passages": np.array(passages, dtype=str),
+        }
+        save_arrays(os.path.join(self.index_dir, "files", f"{name}.npz"), **data)
+        return data
+
+    def _load_file_cache(self, name: str) -> Optional[Dict[str, np.ndarray]]:
+        try:
+            with np.load(os.path.join(self.index_dir, "files", f"{name}.npz")) as data:
+                return {key: data[key] for key in data.files}
+        except (OSError, ValueError):
+            return None
+
+    def build(self) -> Dict[str, int]:
+        """
+        색인을 (증분) 생성해 디스크에 저장합니다.
+
+        Returns:
+            {'files': 전체 파일 수, 'rebuilt': 다시 토큰화한 파일 수, 'passages': 문단 수}
+        """
+        os.makedirs(os.path.join(self.index_dir, "files"), exist_ok=True)
+        old_manifest = self._load_manifest()
+        old_files = old_manifest.get("files", {}) if old_manifest.get("ngram") == self.ngram \
+            and old_manifest.get("format") == INDEX_FORMAT_VERSION else {}
+
+        files = self._corpus_files()
+        # 장 번호 순서로 정렬 (숫자가 아닌 이름은 뒤로)
+        names = sorted(files, key=lambda n: (not n.isdigit(), int(n) if n.isdigit() else 0, n))
+
+        per_file, signatures, rebuilt = [], {}, 0
+        for name in names:
+            signature = self._file_signature(files[name])
+            data = self._load_file_cache(name) if old_files.get(name) == signature else None
+            if data is None:
+                data = self._tokenize_file(name, files[name])
+                rebuilt += 1
+            per_file.append((name, data))
+            signatures[name] = signature
+
+        # 전체 문단 번호를 매기고 (문단, n-gram, 빈도) 목록을 n-gram 순으로 정렬해 CSR 형태로 저장
+        doc_ids, keys, tfs, lengths, chapters, passages = [], [], [], [], [], []
+        next_doc = 0
+        for name, data in per_file:
+            n_docs = len(data["counts"])
+            doc_ids.append(np.repeat(np.arange(next_doc, next_doc + n_docs, dtype=np.int32), data["counts"]))
+            keys.append(data["keys"])
+            tfs.append(data["tfs"])
+            lengths.append(data["lengths"])
+            chapters.extend([name] * n_docs)
+            passages.extend(data["passages"].tolist())
+            next_doc += n_docs
+
+        doc_ids = np.concatenate(doc_ids) if doc_ids else np.zeros(0, dtype=np.int32)
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        tfs = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.float32)
+        order = np.argsort(keys, kind="stable")
+        keys, doc_ids, tfs = keys[order], doc_ids[order], tfs[order]
+        terms, starts = np.unique(keys, return_index=True)
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+
+        # 문단 본문은 UTF-8로 이어 붙이고 바이트 오프셋을 따로 저장
+        encoded = [p.encode("utf-8") for p in passages]
+        text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum([len(e) for e in encoded])
+        # 다른 워커가 열어 둔 파일은 덮어쓰지 않고 교체 (manifest는 지웠다가 마지막에 기록)
+        invalidate_manifest(self.index_dir)
+        write_bytes(os.path.join(self.index_dir, "passages.bin"), b"".join(encoded))
+
+        arrays = {
+            "terms": terms,
+            "offsets": offsets,
+            "postings_doc": doc_ids,
+            "postings_tf": tfs,
+            "doc_lengths": np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.float32),
+            "text_offsets": text_offsets,
+        }
+        for key, value in arrays.items():
+            save_array(os.path.join(self.index_dir, f"{key}.npy"), value)
+        write_json(os.path.join(self.index_dir, "chapters.json"), chapters)
+
+        # 삭제된 장의 파일별 캐시 정리
+        for name in set(old_files) - set(signatures):
+            try:
+                os.remove(os.path.join(self.index_dir, "files", f"{name}.npz"))
+            except OSError:
+                pass
+
+        # manifest는 마지막에 기록 (중간에 실패하면 다음 실행에서 다시 생성)
+        manifest = {"format": INDEX_FORMAT_VERSION, "ngram": self.ngram, "files": signatures,
+                    "passages": len(passages), "built_at": time.time()}
+        write_json(os.path.join(self.index_dir, "manifest.json"), manifest)
+
+        return {"files": len(names), "rebuilt": rebuilt, "passages": len(passages)}
+
+    def is_stale(self) -> bool:
+        """장 파일이 색인 생성 이후 추가/변경/삭제되었는지 확인합니다."""
+        manifest = self._load_manifest()
+        if manifest.get("format") != INDEX_FORMAT_VERSION or manifest.get("ngram") != self.ngram:
+            return True
+        files = self._corpus_files()
+        return manifest.get("files") != {name: self._file_signature(p) for name, p in files.items()}
+
+    # ---------- 색인 불러오기/검색 ----------
+
+    def load(self) -> None:
+        """디스크의 색인을 메모리 매핑으로 불러옵니다."""
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(self.index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.terms = array("terms")
+        self.offsets = array("offsets")
+        self.postings_doc = array("postings_doc")
+        self.postings_tf = array("postings_tf")
+        self.doc_lengths = array("doc_lengths")
+        self.text_offsets = array("text_offsets")
+        with open(os.path.join(self.index_dir, "chapters.json"), "r", encoding="utf-8") as f:
+            self.chapters = json.load(f)
+
+        passages_path = os.path.join(self.index_dir, "passages.bin")
+        if os.path.getsize(passages_path) > 0:
+            with open(passages_path, "rb") as f:
+                self._passages = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._passages = b""
+
+        self.num_docs = len(self.doc_lengths)
+        self.avg_length = float(np.mean(self.doc_lengths)) if self.num_docs else 0.0
+        self.stats = {"passages": self.num_docs, "terms": len(self.terms), "postings": len(self.postings_doc)}
+
+    def load_or_build(self) -> Dict[str, int]:
+        """
+        색인이 최신이면 불러오고, 아니면 증분 생성한 뒤 불러옵니다.
+
+        Returns:
+            생성 결과 (생성하지 않았으면 rebuilt가 0)
+        """
+        result = {"rebuilt": 0}
+        if self.is_stale():
+            result = self.build()
+        self.load()
+        return result
+
+    def passage(self, doc_id: int) -> str:
+        """
+        문단 본문을 반환합니다.
+
+        Args:
+            doc_id: 문단 번호
+
+        Returns:
+            문단 텍스트
+        """
+        start, end = int(self.text_offsets[doc_id]), int(self.text_offsets[doc_id + 1])
+        return self._passages[start:end].decode("utf-8")
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, str, str]]:
+        """
+        질문과 관련된 문단을 BM25 점수 순으로 반환합니다.
+
+        Args:
+            query: 질문 텍스트
+            top_k: 반환할 문단 수
+
+        Returns:
+            (점수, 장 이름, 문단 텍스트) 튜플 리스트
+        """
+        if self.terms is None:
+            raise RuntimeError("색인을 먼저 불러와야 합니다 (load_or_build)")
+        if self.num_docs == 0:
+            return []
+
+        query = _BLANK.sub(" ", strip_source_prefix(query))
+        query_terms = np.unique(text_to_terms(query, self.ngram))
+        positions = np.searchsorted(self.terms, query_terms)
+        valid = positions < len(self.terms)
+        positions, query_terms = positions[valid], query_terms[valid]
+        positions = positions[self.terms[positions] == query_terms]
+
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for position in positions:
+            start, end = self.offsets[position], self.offsets[position + 1]
+            docs = self.postings_doc[start:end]
+            tf = self.postings_tf[start:end]
+            df = end - start
+            idf = np.log(1.0 + (self.num_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[docs] / self.avg_length)
+            scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        top_k = min(top_k, self.num_docs)
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[d]), self.chapters[d], self.passage(int(d))) for d in best if scores[d] > 0]
+
+
+def main() -> None:
+    import settings
+
+    parser = argparse.ArgumentParser(description="장 본문 검색 색인 생성/검색")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="색인 (증분) 생성")
+    search_parser = sub.add_parser("search", help="질문으로 문단 검색")
+    search_parser.add_argument("query")
+    search_parser.add_argument("-k", "--top-k", type=int, default=settings.RETRIEVAL_TOP_K)
+    args = parser.parse_args()
+
+    index = ChapterIndex(settings.CORPUS_DIR, settings.RETRIEVAL_INDEX_DIR)
+    started = time.perf_counter()
+    result = index.load_or_build()
+    print(f"색인 준비 완료 ({time.perf_counter() - started:.2f}초): {result}, {index.stats}")
+
+    if args.command == "search":
+        started = time.perf_counter()
+        hits = index.search(args.query, args.top_k)
+        print(f"검색 시간: {(time.perf_counter() - started) * 1000:.2f}ms")
+        for score, chapter, text in hits:
+            print(f"\n[{chapter}장, 점수 {score:.2f}]\n{text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+
+# 서버 설정 (환경 변수로 변경 가능)
+
+# OpenAI API 설정
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_MODEL = os.getenv("QUIZ_OPENAI_MODEL", "gpt-4o-mini")
+# OpenAI 호환 API 주소 (비우면 OpenAI 기본 주소, 오프라인 테스트는 저장소 루트의 llm_stub_server.py 주소)
+OPENAI_BASE_URL = os.getenv("QUIZ_OPENAI_BASE_URL") or None
+
+# 동시에 처리할 최대 업스트림(LLM) 요청 수
+MAX_CONCURRENCY = int(os.getenv("QUIZ_MAX_CONCURRENCY", "32"))
+
+# 요청 하나당 최대 처리 시간(초). 리더보드의 30초 제한보다 짧게 설정
+REQUEST_TIMEOUT = float(os.getenv("QUIZ_REQUEST_TIMEOUT", "25"))
+
+# 업스트림 HTTP 연결 풀 크기
+MAX_CONNECTIONS = int(os.getenv("QUIZ_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("QUIZ_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# OpenAI 클라이언트 자체 재시도 횟수
+OPENAI_MAX_RETRIES = int(os.getenv("QUIZ_OPENAI_MAX_RETRIES", "2"))
+
+# 모델 호출마다 토큰 사용량(입력/캐시된 입력/출력)을 출력 (누적 사용량과 비용은 GET /의 usage 항목)
+LOG_TOKEN_USAGE = os.getenv("QUIZ_LOG_TOKEN_USAGE", "0") != "0"
+
+# 프롬프트 버전 (프롬프트를 바꾸면 올려서 이전 캐시 답변을 사용하지 않도록 함)
+PROMPT_VERSION = os.getenv("QUIZ_PROMPT_VERSION", "v1")
+
+# 서버 실행 (python main.py)
+HOST = os.getenv("QUIZ_HOST", "0.0.0.0")
+PORT = int(os.getenv("QUIZ_PORT", "8000"))
+# 워커 프로세스 수 (0이면 CPU 코어 수). 업스트림 동시 실행 제한/캐시 메모리는 워커마다 따로 적용
+WORKERS = int(os.getenv("QUIZ_WORKERS", "1"))
+# 종료 신호를 받은 뒤 처리 중인 요청을 기다리는 최대 시간(초)
+GRACEFUL_SHUTDOWN_TIMEOUT = float(os.getenv("QUIZ_GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+# SIGTERM을 받은 뒤 /ready를 503으로 내린 채 요청을 계속 받는 시간(초). 로드 밸런서가 워커를 빼는 동안 기다린 뒤 종료 시작
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("QUIZ_SHUTDOWN_DRAIN_SECONDS", "5"))
+
+# 답변 캐시
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 저장소 루트 (채점 모듈과 함께 쓰는 인물 이름 사전 모듈/데이터 위치)
+REPO_DIR = os.path.dirname(BASE_DIR)
+# 캐시/색인 기본 디렉토리 (워커 프로세스들이 공유)
+CACHE_DIR = os.getenv("QUIZ_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+ANSWER_CACHE_ENABLED = os.getenv("QUIZ_ANSWER_CACHE", "1") != "0"
+ANSWER_CACHE_PATH = os.getenv("QUIZ_ANSWER_CACHE_PATH", os.path.join(CACHE_DIR, "answers.sqlite3"))
+ANSWER_CACHE_MEMORY_SIZE = int(os.getenv("QUIZ_ANSWER_CACHE_MEMORY_SIZE", "50000"))
+
+# 장 본문 검색 (jinho_3kingdoms)
+CORPUS_DIR = os.getenv("QUIZ_CORPUS_DIR", os.path.join(BASE_DIR, "jinho_3kingdoms"))
+RETRIEVAL_ENABLED = os.getenv("QUIZ_RETRIEVAL", "1") != "0"
+RETRIEVAL_INDEX_DIR = os.getenv("QUIZ_RETRIEVAL_INDEX_DIR", os.path.join(CACHE_DIR, "retrieval"))
+RETRIEVAL_TOP_K = int(os.getenv("QUIZ_RETRIEVAL_TOP_K", "3"))
+
+# 빈칸(ㅁ, _____) 문제 본문 풀이
+CLOZE_ENABLED = os.getenv("QUIZ_CLOZE", "1") != "0"
+CLOZE_INDEX_DIR = os.getenv("QUIZ_CLOZE_INDEX_DIR", os.path.join(CACHE_DIR, "cloze"))
+# 이 신뢰도 이상이면 모델을 호출하지 않고 본문 풀이 답을 사용
+CLOZE_MIN_CONFIDENCE = float(os.getenv("QUIZ_CLOZE_MIN_CONFIDENCE", "0.6"))
+
+# 문제 은행 (HF train/show 분할의 질문/정답 쌍)
+QUESTION_BANK_ENABLED = os.getenv("QUIZ_QUESTION_BANK", "1") != "0"
+QUESTION_BANK_FILES = [
+    path for path in os.getenv(
+        "QUIZ_QUESTION_BANK_FILES",
+        os.pathsep.join(os.path.join(REPO_DIR, "3qa_quiz_huggingface_manager", f"{split}.csv")
+                        for split in ("train", "show")),
+    ).split(os.pathsep) if path
+]
+QUESTION_BANK_INDEX_DIR = os.getenv("QUIZ_QUESTION_BANK_INDEX_DIR", os.path.join(CACHE_DIR, "question_bank"))
+# 이 코사인 유사도 이상이면 모델을 호출하지 않고 저장된 정답을 사용
+QUESTION_BANK_THRESHOLD = float(os.getenv("QUIZ_QUESTION_BANK_THRESHOLD", "0.6"))
+
+# 문제 은행의 비슷한 질문 찾기 (MinHash LSH, POST /known)
+NEAR_DUPLICATE_ENABLED = os.getenv("QUIZ_NEAR_DUPLICATES", "1") != "0"
+NEAR_DUPLICATE_INDEX_DIR = os.getenv("QUIZ_NEAR_DUPLICATE_INDEX_DIR", os.path.join(CACHE_DIR, "near_duplicates"))
+# 비슷한 질문으로 볼 최소 Jaccard 유사도 (질문 문자 3-gram 집합 기준)
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("QUIZ_NEAR_DUPLICATE_THRESHOLD", "0.7"))
+
+# /answer/batch 요청 하나에 담을 수 있는 최대 질문 수
+MAX_BATCH_SIZE = int(os.getenv("QUIZ_MAX_BATCH_SIZE", "256"))
+
+# 업스트림 마이크로 배치: 짧은 시간 안에 들어온 질문을 모아 한 번의 모델 호출로 답변
+MICRO_BATCH_ENABLED = os.getenv("QUIZ_MICRO_BATCH", "0") != "0"
+# 첫 질문 이후 다른 질문을 기다리는 최대 시간(ms)과 배치 하나의 최대 질문 수
+MICRO_BATCH_WINDOW_MS = float(os.getenv("QUIZ_MICRO_BATCH_WINDOW_MS", "20"))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("QUIZ_MICRO_BATCH_MAX_SIZE", "8"))
+# 배치 호출의 max_tokens = 질문 수 × 이 값
+MICRO_BATCH_TOKENS_PER_ANSWER = int(os.getenv("QUIZ_MICRO_BATCH_TOKENS_PER_ANSWER", "60"))
+
+# 인물 이름 사전 (한자/한글 이름 표기 통일, 저장소 루트의 entity_gazetteer.py로 생성)
+GAZETTEER_ENABLED = os.getenv("QUIZ_GAZETTEER", "1") != "0"
+GAZETTEER_PATH = os.getenv("QUIZ_GAZETTEER_PATH", os.path.join(REPO_DIR, "data", "entity_gazetteer.json"))
@@ -0,0 +1,40 @@
+import re
+import unicodedata
+
+# "( 연의 )", "( 연의, 사서 공통 )" 같은 출처 표시
+_SOURCE_PREFIX = re.compile(r"^\s*\(\s*[^)]*\)\s*")
+# 빈칸 표시 (_____ 길이는 문제마다 다름)
+_BLANK = re.compile(r"_{2,}")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """
+    캐시 키와 검색에 사용할 수 있도록 질문 텍스트를 정규화합니다.
+
+    유니코드 NFKC 정규화, 공백 정리, 빈칸 표시 통일, 소문자 변환을 수행합니다.
+    출처 표시("( 연의 )")는 문제 의미에 영향을 주므로 그대로 둡니다.
+
+    Args:
+        text: 질문 텍스트
+
+    Returns:
+        정규화된 질문 텍스트
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _BLANK.sub("_____", text)
+    text = _SPACES.sub(" ", text).strip()
+    return text.lower()
+
+
+def strip_source_prefix(text: str) -> str:
+    """
+    질문 앞의 출처 표시("( 연의 )" 등)를 제거합니다.
+
+    Args:
+        text: 질문 텍스트
+
+    Returns:
+        출처 표시가 제거된 질문 텍스트
+    """
+    return _SOURCE_PREFIX.sub("", text or "", count=1)
@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import csv
+import time
+
+import main
+
+
+async def warmup(csv_path: str, concurrency: int) -> None:
+    """
+    퀴즈 CSV의 모든 질문에 대한 답변을 미리 생성해 캐시에 저장합니다.
+
+    문제 은행이나 빈칸 풀이로 답하는 질문은 캐시에 저장하지 않으므로 따로 집계합니다.
+
+    Args:
+        csv_path: 'question' 컬럼을 가진 퀴즈 CSV 경로
+        concurrency: 동시에 생성할 답변 수
+    """
+    with open(csv_path, "r", encoding="utf-8") as f:
+        questions = list(dict.fromkeys(row["question"] for row in csv.DictReader(f) if row.get("question")))
+
+    await main.startup()
+    if main.answer_cache is None:
+        print("답변 캐시가 비활성화되어 있습니다 (QUIZ_ANSWER_CACHE=0).")
+        await main.shutdown()
+        return
+
+    before = main.answer_cache.get_stats()
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+    failed = 0
+
+    async def answer_one(index: int, question: str) -> None:
+        nonlocal done, failed
+        question_id = f"warmup-{index}"
+        async with semaphore:
+            answer = await main.get_answer(question, question_id, "")
+        # get_answer는 실패해도 예외 대신 "(오류 코드: 질문 ID)"로 끝나는 안내 문구를 반환
+        if answer.endswith(f"(오류 코드: {question_id})"):
+            failed += 1
+        done += 1
+        if done % 100 == 0 or done == len(questions):
+            print(f"  {done}/{len(questions)} 완료")
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(answer_one(i, q) for i, q in enumerate(questions)))
+        after = main.answer_cache.get_stats()
+    finally:
+        await main.shutdown()
+
+    elapsed = time.perf_counter() - started
+    cached = after["memory_hits"] + after["disk_hits"] - before["memory_hits"] - before["disk_hits"]
+    written = after["writes"] - before["writes"]
+    print(f"질문 {len(questions)}개 처리 완료 ({elapsed:.1f}초)")
+    print(f"  - 이미 캐시됨: {cached}개")
+    print(f"  - 새로 생성: {written}개")
+    # 문제 은행/빈칸 풀이 답변은 캐시를 거치지 않음 (매번 모델 호출 없이 바로 답변)
+    print(f"  - 문제 은행/빈칸 풀이로 답변: {len(questions) - cached - written - failed}개")
+    print(f"  - 실패: {failed}개")
+    print(f"  - 캐시 항목 수: {after['entries']}개")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="퀴즈 CSV의 질문 답변을 미리 생성해 캐시에 저장합니다.")
+    parser.add_argument("csv_path", help="퀴즈 CSV 경로 (question 컬럼 필요)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="동시에 생성할 답변 수")
+    args = parser.parse_args()
+    asyncio.run(warmup(args.csv_path, args.concurrency))
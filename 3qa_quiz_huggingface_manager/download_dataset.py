@@ -1,48 +1,160 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import argparse
+import hashlib
 import os
 import sys
-import pandas as pd
-from datasets import load_dataset
+import time
+
+# 매니페스트 모듈(dataset_manifest.py)이 저장소 루트에 있음
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataset_manifest  # noqa: E402
+
+DATASET_NAME = "jonhpark/3kingdoms_qa_ft"
+FORMATS = ("csv", "parquet")
+
+
+def split_fingerprint(dataset) -> str:
+    """
+    분할의 원본 지문을 반환합니다.
+
+    datasets가 캐시 파일마다 붙이는 지문을 쓰고, 없으면 캐시 파일 이름/크기/수정 시각으로 만듭니다.
+    원본이 바뀌지 않았으면 같은 값이 나오므로 다시 변환할지 정하는 데 씁니다.
+    """
+    fingerprint = getattr(dataset, "_fingerprint", None)
+    if fingerprint:
+        return str(fingerprint)
+    digest = hashlib.sha256()
+    for cache_file in dataset.cache_files:
+        stat = os.stat(cache_file["filename"])
+        digest.update(f"{cache_file['filename']}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_up_to_date(manifest: dict, output_dir: str, split: str, fingerprint: str, formats) -> bool:
+    """매니페스트의 지문이 같고 출력 파일이 모두 기록된 크기로 남아 있으면 True"""
+    entry = manifest.get("splits", {}).get(split)
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False
+    for fmt in formats:
+        name = f"{split}.{fmt}"
+        recorded = manifest["files"].get(name)
+        path = os.path.join(output_dir, name)
+        if recorded is None or not os.path.exists(path) or os.path.getsize(path) != recorded.get("bytes"):
+            return False
+    return True
+
+
+def convert_split(dataset, split: str, output_dir: str, formats, chunk_size: int) -> dict:
+    """
+    분할 하나를 청크 단위로 읽어 CSV/Parquet 파일로 씁니다.
+
+    데이터는 datasets 캐시의 Arrow 파일에서 chunk_size행씩만 메모리에 올리고,
+    임시 파일에 다 쓴 뒤 교체하므로 중간에 실패해도 이전 파일이 남습니다.
+
+    Returns:
+        출력 파일 이름 -> 매니페스트 항목
+    """
+    import pyarrow.parquet as pq
+
+    paths = {fmt: os.path.join(output_dir, f"{split}.{fmt}") for fmt in formats}
+    tmp_paths = {fmt: f"{path}.tmp" for fmt, path in paths.items()}
+    csv_file = open(tmp_paths["csv"], "wb") if "csv" in formats else None
+    csv_digest = hashlib.sha256()
+    parquet_writer = None
+    rows = 0
+    columns = list(dataset.column_names)
+
+    try:
+        for table in dataset.with_format("arrow").iter(batch_size=chunk_size):
+            if csv_file is not None:
+                # 기존 출력과 같은 형식이 되도록 pandas로 CSV를 만들고, 쓰는 동안 해시도 계산
+                data = table.to_pandas().to_csv(index=False, header=(rows == 0), encoding="utf-8").encode("utf-8")
+                csv_file.write(data)
+                csv_digest.update(data)
+            if "parquet" in formats:
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(tmp_paths["parquet"], table.schema, compression="zstd")
+                parquet_writer.write_table(table)
+            rows += table.num_rows
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    entries = {}
+    for fmt in formats:
+        if not os.path.exists(tmp_paths[fmt]):
+            continue  # 빈 분할은 Parquet 파일을 만들지 않음
+        os.replace(tmp_paths[fmt], paths[fmt])
+        sha256 = csv_digest.hexdigest() if fmt == "csv" else None
+        entries[os.path.basename(paths[fmt])] = dataset_manifest.file_entry(
+            paths[fmt], rows, columns, sha256=sha256, split=split, format=fmt)
+    return entries
+
 
 def main():
-    # Create the output directory if it doesn't exist
-    output_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Hugging Face 퀴즈 데이터셋을 분할별 CSV/Parquet 파일로 변환합니다.")
+    parser.add_argument("--dataset", default=DATASET_NAME, help="Hugging Face 데이터셋 이름")
+    parser.add_argument("-o", "--output-dir", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="출력 디렉토리 (기본: 이 스크립트가 있는 디렉토리)")
+    parser.add_argument("--format", dest="formats", action="append", choices=FORMATS,
+                        help="출력 형식 (반복 지정, 기본: csv와 parquet)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="한 번에 변환할 행 수")
+    parser.add_argument("--offline", action="store_true",
+                        help="네트워크 없이 로컬 Hugging Face 캐시만 사용")
+    parser.add_argument("--force", action="store_true", help="원본이 바뀌지 않았어도 다시 변환")
+    args = parser.parse_args()
+    formats = tuple(args.formats or FORMATS)
+
+    if args.offline:
+        # datasets를 import하기 전에 설정해야 적용됨
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["HF_DATASETS_OFFLINE"] = "1"
+    from datasets import load_dataset
+
+    output_dir = os.path.abspath(args.output_dir)
     os.makedirs(output_dir, exist_ok=True)
-    
-    print(f"Script is running from: {os.path.abspath(__file__)}")
     print(f"Output directory: {output_dir}")
-    print("Loading dataset from Hugging Face: jonhpark/3kingdoms_qa_ft")
-    
+    print(f"Loading dataset from Hugging Face: {args.dataset}" + (" (offline)" if args.offline else ""))
+
     try:
-        # Load the dataset from Hugging Face
-        dataset = load_dataset("jonhpark/3kingdoms_qa_ft")
-        
-        # Get all available splits
-        splits = dataset.keys()
-        print(f"Available splits: {splits}")
-        
-        # Convert each split to a CSV file
-        for split in splits:
+        # 분할 데이터는 캐시의 Arrow 파일을 메모리 매핑하므로 여기서 전체를 메모리에 올리지 않음
+        dataset = load_dataset(args.dataset)
+        print(f"Available splits: {list(dataset.keys())}")
+
+        manifest = dataset_manifest.load_manifest(output_dir)
+        manifest["dataset"] = args.dataset
+        manifest.setdefault("splits", {})
+
+        for split, split_dataset in dataset.items():
+            fingerprint = split_fingerprint(split_dataset)
+            if not args.force and is_up_to_date(manifest, output_dir, split, fingerprint, formats):
+                print(f"Skipping {split} split (unchanged, fingerprint {fingerprint[:12]})")
+                continue
+
             print(f"Processing {split} split...")
-            
-            # Convert the dataset split to a pandas DataFrame
-            df = pd.DataFrame(dataset[split])
-            
-            # Define the output file path
-            output_file = os.path.join(output_dir, f"{split}.csv")
-            
-            # Save as CSV
-            df.to_csv(output_file, index=False, encoding='utf-8')
-            print(f"Saved {split} split to {output_file}")
-            
-            # Display dataset info
-            print(f"  - Number of examples: {len(df)}")
-            print(f"  - Columns: {', '.join(df.columns)}")
-            
-        print("\nAll splits have been successfully converted to CSV files!")
-    
+            started = time.perf_counter()
+            entries = convert_split(split_dataset, split, output_dir, formats, args.chunk_size)
+            manifest["files"].update(entries)
+            manifest["splits"][split] = {
+                "fingerprint": fingerprint,
+                "rows": split_dataset.num_rows,
+                "columns": list(split_dataset.column_names),
+                "files": sorted(entries),
+            }
+            # 분할마다 저장해 중간에 멈춰도 끝난 분할은 다음 실행에서 건너뜀
+            dataset_manifest.save_manifest(output_dir, manifest)
+
+            print(f"  - Number of examples: {split_dataset.num_rows}")
+            print(f"  - Columns: {', '.join(split_dataset.column_names)}")
+            print(f"  - Files: {', '.join(sorted(entries))} ({time.perf_counter() - started:.1f}s)")
+
+        print(f"\nAll splits are up to date. Manifest: {dataset_manifest.manifest_path(output_dir)}")
+
     except Exception as e:
         print(f"Error: {type(e).__name__}: {e}")
         import traceback
@@ -50,4 +162,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,205 @@
+import math
+import random
+import logging
+from statistics import NormalDist
+from typing import Dict, Any, List, Optional, Tuple
+
+# 난이도 표시 순서 (퀴즈 데이터의 level 컬럼 값)
+LEVEL_ORDER = ["easy", "medium", "hard", "very hard", "super hard"]
+
+class AdaptiveEvaluator:
+    """난이도(level)별 층화 추출로 문제를 고르고, 신뢰구간이 충분히 좁아지면 조기 종료를 판단하는 클래스"""
+
+    def __init__(self, levels: List[str], ci_width_threshold: float = 0.10,
+                 min_per_level: int = 5, min_questions: int = 30,
+                 max_questions: Optional[int] = None, confidence: float = 0.95,
+                 random_state: Optional[int] = None):
+        """
+        적응형 평가기를 초기화합니다.
+
+        Args:
+            levels: 문제 인덱스 순서대로 나열된 난이도 리스트
+            ci_width_threshold: 조기 종료 기준이 되는 전체 정확도 신뢰구간 폭 (0.0 ~ 1.0)
+            min_per_level: 난이도별로 최소한 출제할 문제 수
+            min_questions: 조기 종료 전 최소한 출제할 전체 문제 수
+            max_questions: 최대 출제 문제 수 (None이면 전체 문제)
+            confidence: 신뢰수준
+            random_state: 난이도별 출제 순서를 정하는 난수 시드
+        """
+        self.logger = logging.getLogger(__name__)
+        self.ci_width_threshold = ci_width_threshold
+        self.min_per_level = min_per_level
+        self.min_questions = min_questions
+        self.max_questions = max_questions if max_questions is not None else len(levels)
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+        # 난이도별 문제 인덱스 (층) 구성
+        strata: Dict[str, List[int]] = {}
+        for index, level in enumerate(levels):
+            strata.setdefault(str(level), []).append(index)
+
+        # 알려진 난이도 순서를 우선하고, 나머지는 등장 순서대로 배치
+        self.levels = [lv for lv in LEVEL_ORDER if lv in strata]
+        self.levels += [lv for lv in strata if lv not in self.levels]
+
+        # 층마다 출제 순서를 섞어 둠 (시드가 같으면 재현 가능)
+        rng = random.Random(random_state)
+        self.pending = {level: rng.sample(strata[level], len(strata[level])) for level in self.levels}
+
+        total = len(levels)
+        self.population = {level: len(strata[level]) for level in self.levels}
+        self.weights = {level: self.population[level] / total for level in self.levels} if total else {}
+
+        # 층별 채점 결과
+        self.asked = {level: 0 for level in self.levels}
+        self.correct = {level: 0 for level in self.levels}
+        self.llm_sum = {level: 0.0 for level in self.levels}
+        self.level_of = {index: str(level) for index, level in enumerate(levels)}
+
+    @property
+    def total_asked(self) -> int:
+        """지금까지 출제한 문제 수"""
+        return sum(self.asked.values())
+
+    def _required(self, level: str) -> int:
+        """해당 층에서 최소한 출제해야 하는 문제 수"""
+        return min(self.min_per_level, self.population[level])
+
+    def _smoothed_rate(self, level: str) -> float:
+        """분산 추정용으로 보정한 층별 정답률 (표본이 적을 때 분산이 0이 되는 것을 방지)"""
+        return (self.correct[level] + 1) / (self.asked[level] + 2)
+
+    def _variance_reduction(self, level: str) -> float:
+        """해당 층에서 한 문제를 더 출제했을 때 전체 추정 분산의 감소량"""
+        n = self.asked[level]
+        p = self._smoothed_rate(level)
+        w = self.weights[level]
+        if n == 0:
+            return math.inf
+        return w * w * p * (1 - p) * (1 / n - 1 / (n + 1))
+
+    def next_question(self) -> Optional[int]:
+        """
+        다음에 출제할 문제 인덱스를 반환합니다.
+
+        최소 출제 수를 채우지 못한 층을 먼저 채운 뒤, 전체 분산을 가장 많이 줄이는 층에서 문제를 고릅니다.
+
+        Returns:
+            문제 인덱스 (더 출제할 문제가 없으면 None)
+        """
+        candidates = [level for level in self.levels if self.pending[level]]
+        if not candidates or self.total_asked >= self.max_questions:
+            return None
+
+        # 최소 출제 수를 채우지 못한 층 우선
+        unfilled = [level for level in candidates if self.asked[level] < self._required(level)]
+        if unfilled:
+            level = min(unfilled, key=lambda lv: self.asked[lv])
+        else:
+            level = max(candidates, key=self._variance_reduction)
+
+        return self.pending[level].pop()
+
+    def record(self, index: int, is_correct: bool, llm_score: Optional[float] = None) -> None:
+        """
+        출제한 문제의 채점 결과를 기록합니다.
+
+        Args:
+            index: 문제 인덱스
+            is_correct: Exact Match 정답 여부
+            llm_score: LLM as judge 점수 (0.0 ~ 1.0)
+        """
+        level = self.level_of[index]
+        self.asked[level] += 1
+        if is_correct:
+            self.correct[level] += 1
+        if llm_score is not None:
+            self.llm_sum[level] += llm_score
+
+    def _stratified(self, values: Dict[str, float]) -> float:
+        """층별 값을 모집단 비율로 가중 평균합니다. 출제하지 않은 층은 제외하고 가중치를 재조정합니다."""
+        answered = [level for level in self.levels if self.asked[level] > 0]
+        weight_sum = sum(self.weights[level] for level in answered)
+        if weight_sum == 0:
+            return 0.0
+        return sum(self.weights[level] * values[level] / self.asked[level] for level in answered) / weight_sum
+
+    def estimate(self) -> Tuple[float, float, float]:
+        """
+        층화 추정한 전체 정확도와 신뢰구간을 반환합니다.
+
+        Returns:
+            (정확도, 신뢰구간 하한, 신뢰구간 상한) 튜플 (0.0 ~ 1.0)
+        """
+        if self.total_asked == 0:
+            return 0.0, 0.0, 1.0
+
+        rate = self._stratified(self.correct)
+
+        variance = 0.0
+        for level in self.levels:
+            n = self.asked[level]
+            N = self.population[level]
+            w = self.weights[level]
+            if n == 0:
+                # 아직 출제하지 않은 층은 최대 분산으로 간주
+                variance += w * w * 0.25
+                continue
+            # 유한 모집단 보정: 층의 모든 문제를 출제하면 분산은 0
+            fpc = (N - n) / (N - 1) if N > 1 else 0.0
+            p = self._smoothed_rate(level)
+            variance += w * w * p * (1 - p) / n * fpc
+
+        half_width = self.z * math.sqrt(variance)
+        return rate, max(0.0, rate - half_width), min(1.0, rate + half_width)
+
+    def llm_estimate(self) -> float:
+        """층화 추정한 LLM as judge 평균 점수를 반환합니다."""
+        return self._stratified(self.llm_sum)
+
+    def level_estimates(self) -> Dict[str, Dict[str, Any]]:
+        """
+        층별 정답률과 Wilson 신뢰구간을 반환합니다.
+
+        Returns:
+            난이도별 {asked, correct, rate, ci_lower, ci_upper} 딕셔너리
+        """
+        results = {}
+        for level in self.levels:
+            n = self.asked[level]
+            c = self.correct[level]
+            if n == 0:
+                results[level] = {"asked": 0, "correct": 0, "rate": None, "ci_lower": 0.0, "ci_upper": 1.0}
+                continue
+            p = c / n
+            denom = 1 + self.z ** 2 / n
+            center = (p + self.z ** 2 / (2 * n)) / denom
+            margin = self.z * math.sqrt(p * (1 - p) / n + self.z ** 2 / (4 * n * n)) / denom
+            results[level] = {
+                "asked": n,
+                "correct": c,
+                "rate": p,
+                "ci_lower": max(0.0, center - margin),
+                "ci_upper": min(1.0, center + margin),
+            }
+        return results
+
+    def should_stop(self) -> bool:
+        """
+        평가를 종료해도 되는지 판단합니다.
+
+        Returns:
+            더 출제할 문제가 없거나, 최소 출제 조건을 채운 상태에서 신뢰구간 폭이 기준 이하이면 True
+        """
+        if self.total_asked >= self.max_questions:
+            return True
+        if not any(self.pending[level] for level in self.levels):
+            return True
+
+        if self.total_asked < self.min_questions:
+            return False
+        if any(self.asked[level] < self._required(level) for level in self.levels):
+            return False
+
+        _, lower, upper = self.estimate()
+        return (upper - lower) <= self.ci_width_threshold
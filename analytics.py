@@ -0,0 +1,268 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+ANALYTICS_FORMAT_VERSION = 1
+# 문제별 응답 시간 분포 구간 상한(초), 마지막 칸은 그 이상
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+def question_key(question: str) -> str:
+    """문제 텍스트의 집계 키 (문제 파일이 달라도 같은 문제면 같은 키)"""
+    return hashlib.sha1(question.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def submission_key(name: str, api_endpoint: str) -> str:
+    """제출 집계 키 (리더보드와 같이 이름과 엔드포인트로 구분)"""
+    return f"{name}\n{api_endpoint}"
+
+
+def _bucket_quantile(counts: List[int], q: float) -> Optional[float]:
+    """구간별 개수로 q 분위수가 속한 구간의 상한을 구합니다 (마지막 칸이면 마지막 상한)."""
+    total = sum(counts)
+    if total == 0:
+        return None
+    cumulative = 0
+    for upper, count in zip(LATENCY_BUCKETS + (LATENCY_BUCKETS[-1],), counts):
+        cumulative += count
+        if cumulative >= q * total:
+            return upper
+    return LATENCY_BUCKETS[-1]
+
+
+class QuizAnalytics:
+    """
+    채점 응답이 기록될 때마다 문제별/제출별 집계를 갱신하는 클래스
+
+    - 문제별: 응답 수, Exact Match 정답 수, LLM 점수 합, 응답 시간 합/최대/구간별 개수
+    - 제출별: 난이도별 응답 수, 정답 수, LLM 점수 합
+
+    집계 크기는 문제 수와 제출 수에만 비례하므로, 분석 화면은 상호작용 로그 길이와 상관없이 바로 그려집니다.
+    파일에는 flush_interval초에 한 번(그리고 flush() 호출 시) 임시 파일에 쓴 뒤 교체하는 방식으로 저장하며,
+    집계는 이 프로세스가 기록한 응답 기준입니다 (여러 프로세스가 같은 파일에 기록하지 않음).
+    """
+
+    def __init__(self, path: str = os.path.join("logs", "analytics.json"), flush_interval: float = 2.0):
+        """
+        Args:
+            path: 집계 파일 경로 (있으면 이어서 집계)
+            flush_interval: 파일에 저장하는 최소 간격(초, 0이면 응답마다 저장)
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self.data = self._load()
+        atexit.register(self.flush)
+
+    def _empty(self) -> Dict[str, Any]:
+        return {"version": ANALYTICS_FORMAT_VERSION, "responses": 0, "questions": {}, "submissions": {}}
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == ANALYTICS_FORMAT_VERSION:
+                return data
+        except (OSError, json.JSONDecodeError):
+            pass
+        return self._empty()
+
+    def record(self, name: str, api_endpoint: str, question: str, level: Optional[str],
+               is_correct: bool, llm_score: float, response_time: float) -> None:
+        """
+        채점한 응답 하나를 집계에 더합니다.
+
+        Args:
+            name: 사용자 이름
+            api_endpoint: API 엔드포인트
+            question: 문제 텍스트
+            level: 문제 난이도 (없으면 "unknown")
+            is_correct: Exact Match 정답 여부
+            llm_score: LLM 채점 점수
+            response_time: 응답 시간(초)
+        """
+        level = level or "unknown"
+        bucket = next((i for i, upper in enumerate(LATENCY_BUCKETS) if response_time <= upper), len(LATENCY_BUCKETS))
+        with self._lock:
+            data = self.data
+            data["responses"] += 1
+            entry = data["questions"].get(question_key(question))
+            if entry is None:
+                entry = data["questions"][question_key(question)] = {
+                    "question": question, "level": level, "n": 0, "correct": 0, "llm": 0.0,
+                    "time": 0.0, "time_max": 0.0, "time_buckets": [0] * (len(LATENCY_BUCKETS) + 1)}
+            entry["n"] += 1
+            entry["correct"] += int(bool(is_correct))
+            entry["llm"] += float(llm_score)
+            entry["time"] += float(response_time)
+            entry["time_max"] = max(entry["time_max"], float(response_time))
+            entry["time_buckets"][bucket] += 1
+
+            submission = data["submissions"].setdefault(
+                submission_key(name, api_endpoint), {"name": name, "api_endpoint": api_endpoint, "levels": {}})
+            counts = submission["levels"].setdefault(level, [0, 0, 0.0])
+            counts[0] += 1
+            counts[1] += int(bool(is_correct))
+            counts[2] += float(llm_score)
+            submission["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._dirty = True
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """바뀐 집계가 있으면 파일에 저장합니다."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.data["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            text = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+            self._dirty = False
+            self._last_flush = time.monotonic()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        """집계를 비웁니다 (rebuild 전에 사용)."""
+        with self._lock:
+            self.data = self._empty()
+            self._dirty = True
+
+    # ---------- 조회 ----------
+
+    @property
+    def responses(self) -> int:
+        return self.data["responses"]
+
+    def question_table(self, min_responses: int = 1) -> pd.DataFrame:
+        """
+        문제별 집계 표 (정확도 오름차순)
+
+        Returns:
+            question, level, responses, accuracy, llm_score, mean_time, p95_time, max_time 컬럼의 데이터프레임
+            (p95_time은 응답 시간 구간 상한으로 추정하며 최대 응답 시간을 넘지 않음)
+        """
+        with self._lock:
+            entries = [dict(entry, time_buckets=list(entry["time_buckets"]))
+                       for entry in self.data["questions"].values() if entry["n"] >= min_responses]
+        rows = [{
+            "question": entry["question"],
+            "level": entry["level"],
+            "responses": entry["n"],
+            "accuracy": entry["correct"] / entry["n"],
+            "llm_score": entry["llm"] / entry["n"],
+            "mean_time": entry["time"] / entry["n"],
+            "p95_time": min(_bucket_quantile(entry["time_buckets"], 0.95), entry["time_max"]),
+            "max_time": entry["time_max"],
+        } for entry in entries]
+        columns = ["question", "level", "responses", "accuracy", "llm_score", "mean_time", "p95_time", "max_time"]
+        table = pd.DataFrame(rows, columns=columns)
+        return table.sort_values(["accuracy", "responses"], ascending=[True, False], ignore_index=True)
+
+    def level_table(self) -> pd.DataFrame:
+        """
+        제출별 난이도별 정확도 표 (전체 정확도 내림차순)
+
+        Returns:
+            name, api_endpoint, responses, accuracy와 난이도별 정확도 컬럼의 데이터프레임
+        """
+        with self._lock:
+            submissions = [(s["name"], s["api_endpoint"], {level: list(c) for level, c in s["levels"].items()})
+                           for s in self.data["submissions"].values()]
+        rows = []
+        for name, api_endpoint, levels in submissions:
+            responses = sum(c[0] for c in levels.values())
+            row = {"name": name, "api_endpoint": api_endpoint, "responses": responses,
+                   "accuracy": sum(c[1] for c in levels.values()) / responses if responses else 0.0}
+            row.update({level: c[1] / c[0] for level, c in levels.items() if c[0]})
+            rows.append(row)
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        return table.sort_values("accuracy", ascending=False, ignore_index=True)
+
+    def level_separation(self, top_k: int = 3) -> pd.DataFrame:
+        """
+        정확도 상위 top_k개 제출과 나머지 제출의 난이도별 평균 정확도 차이
+
+        차이가 큰 난이도가 리더보드 상위권을 가르는 구간입니다.
+
+        Returns:
+            level, top, rest, gap 컬럼의 데이터프레임 (gap 내림차순)
+        """
+        table = self.level_table()
+        levels = [c for c in table.columns if c not in ("name", "api_endpoint", "responses", "accuracy")]
+        if len(table) <= top_k or not levels:
+            return pd.DataFrame(columns=["level", "top", "rest", "gap"])
+        top, rest = table.iloc[:top_k], table.iloc[top_k:]
+        rows = [{"level": level, "top": top[level].mean(), "rest": rest[level].mean()} for level in levels]
+        result = pd.DataFrame(rows)
+        result["gap"] = result["top"] - result["rest"]
+        return result.sort_values("gap", ascending=False, ignore_index=True)
+
+    # ---------- 다시 만들기 ----------
+
+    def rebuild(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        상호작용 로그 항목으로 집계를 처음부터 다시 만듭니다 (level이 없는 예전 항목은 "unknown").
+
+        Returns:
+            집계한 응답 수
+        """
+        self.reset()
+        count = 0
+        for entry in entries:
+            if entry.get("type") != "question_response":
+                continue
+            self.record(entry.get("name", ""), entry.get("api_endpoint", ""), entry.get("question", ""),
+                        entry.get("level"), entry.get("is_correct", False), entry.get("llm_score", 0.0),
+                        entry.get("response_time", 0.0))
+            count += 1
+        self.flush()
+        return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="문제별/제출별 채점 집계를 관리합니다.")
+    parser.add_argument("--path", default=os.path.join("logs", "analytics.json"), help="집계 파일 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = sub.add_parser("rebuild", help="상호작용 로그로 집계를 다시 만들기")
+    rebuild_parser.add_argument("--log", default=os.path.join("logs", "interactions.json"), help="상호작용 로그 경로")
+    summary_parser = sub.add_parser("summary", help="가장 어려운 문제와 난이도별 차이 출력")
+    summary_parser.add_argument("-n", "--top", type=int, default=10, help="출력할 문제 수")
+    summary_parser.add_argument("-k", "--top-k", type=int, default=3, help="상위권으로 볼 제출 수")
+    args = parser.parse_args()
+
+    analytics = QuizAnalytics(args.path, flush_interval=float("inf"))
+    if args.command == "rebuild":
+        started = time.perf_counter()
+        with open(args.log, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        count = analytics.rebuild(entries)
+        print(f"응답 {count}개로 집계를 다시 만들었습니다 ({time.perf_counter() - started:.2f}초): {args.path}")
+        return
+
+    print(f"응답 {analytics.responses}개")
+    with pd.option_context("display.max_colwidth", 60, "display.width", 200):
+        print(analytics.question_table().head(args.top).to_string(index=False))
+        print()
+        print(analytics.level_separation(args.top_k).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
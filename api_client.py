@@ -1,26 +1,244 @@
-import requests
+import heapq
+import itertools
+import json
+import os
+import socket
+import threading
 import time
-from typing import Dict, Any, Tuple, Optional
+import zlib
+from typing import Dict, Any, Tuple, Optional, TYPE_CHECKING
 import logging
 
+if TYPE_CHECKING:
+    import requests
+
+from metrics import CONTESTANT_REQUESTS
+
+# 참가자 응답 본문 최대 크기(바이트). 답 하나를 담은 JSON이면 충분하며, 넘으면 읽기를 멈추고 실패 처리
+MAX_RESPONSE_BYTES = int(os.getenv("QUIZ_MAX_RESPONSE_BYTES", str(64 * 1024)))
+# 오류 응답 본문을 로그에 남길 최대 바이트
+ERROR_BODY_LOG_BYTES = 512
+# 응답 본문을 한 번에 읽을 크기
+READ_CHUNK_BYTES = 8192
+
+
+class ResponseTooLarge(Exception):
+    """응답 본문이 최대 크기를 넘음"""
+
+
+class _RequestDeadline:
+    """요청 하나가 쓰는 연결과 마감 시각이 지났는지 여부"""
+
+    def __init__(self):
+        self.connection = None
+        self.expired = False
+
+    def expire(self) -> None:
+        """마감 시각이 지나면 연결 소켓을 끊어, 헤더를 조금씩 보내는 응답을 기다리는 스레드도 바로 깨웁니다."""
+        self.expired = True
+        sock = getattr(self.connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class _Watchdog:
+    """마감 시각이 된 요청을 끊는 스레드 하나 (요청마다 타이머 스레드를 만들지 않음)"""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        # 등록 번호 -> 요청 (취소하거나 끊은 요청은 빠짐)
+        self._active: Dict[int, _RequestDeadline] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, deadline: float, request: _RequestDeadline) -> int:
+        """time.monotonic() 기준 deadline에 request.expire()를 호출하도록 등록하고 취소용 번호를 반환합니다."""
+        with self._condition:
+            handle = next(self._counter)
+            self._active[handle] = request
+            heapq.heappush(self._heap, (deadline, handle))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="api-deadline", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return handle
+
+    def cancel(self, handle: int) -> None:
+        with self._condition:
+            self._active.pop(handle, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._heap and self._heap[0][1] not in self._active:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                deadline, handle = self._heap[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                request = self._active.pop(handle)
+            request.expire()
+
+
+_WATCHDOG = _Watchdog()
+# 현재 스레드에서 보내는 요청 (연결 풀이 꺼낸 연결을 기록)
+_current_request = threading.local()
+_deadline_adapter_class = None
+
+
+def _deadline_adapter() -> "requests.adapters.HTTPAdapter":
+    """
+    연결 풀에서 꺼낸 연결을 현재 요청에 기록하는 어댑터를 만듭니다.
+
+    requests의 timeout은 소켓 읽기 한 번마다 적용되므로, 마감 시각에 연결을 끊을 수 있도록 요청이 쓰는 연결을 알아 둡니다.
+    requests import를 미루기 위해 클래스는 처음 호출할 때 정의합니다.
+    """
+    global _deadline_adapter_class
+    if _deadline_adapter_class is None:
+        from requests.adapters import HTTPAdapter
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        class TrackingMixin:
+            def _get_conn(self, timeout=None):
+                conn = super()._get_conn(timeout)
+                request = getattr(_current_request, "value", None)
+                if request is not None:
+                    request.connection = conn
+                return conn
+
+        class TrackingHTTPConnectionPool(TrackingMixin, HTTPConnectionPool):
+            pass
+
+        class TrackingHTTPSConnectionPool(TrackingMixin, HTTPSConnectionPool):
+            pass
+
+        class DeadlineAdapter(HTTPAdapter):
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = {
+                    "http": TrackingHTTPConnectionPool, "https": TrackingHTTPSConnectionPool}
+
+        _deadline_adapter_class = DeadlineAdapter
+    return _deadline_adapter_class()
+
+
 class APIClient:
     """사용자 API 엔드포인트와 통신하는 클래스"""
     
-    def __init__(self, api_endpoint: str, timeout: int = 30):
+    def __init__(self, api_endpoint: str, timeout: int = 30, max_response_bytes: int = MAX_RESPONSE_BYTES):
         """
         API 클라이언트를 초기화합니다.
         
         Args:
             api_endpoint: 사용자가 제출한 API 엔드포인트 URL
-            timeout: API 요청 타임아웃 시간(초)
+            timeout: 요청 하나의 전체 제한 시간(초, 연결부터 응답 본문을 다 읽을 때까지)
+            max_response_bytes: 응답 본문 최대 크기(바이트)
         """
         self.api_endpoint = api_endpoint
         self.timeout = timeout
+        self.max_response_bytes = max_response_bytes
         self.logger = logging.getLogger(__name__)
+        self._session: Optional["requests.Session"] = None
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        엔드포인트 연결을 재사용하는 HTTP 세션
+
+        requests 패키지 import와 세션 생성은 처음 문제를 보낼 때 하므로, 리더보드만 보는 시작 경로에서는 비용이 없습니다.
+        """
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.mount("http://", _deadline_adapter())
+            self._session.mount("https://", _deadline_adapter())
+        return self._session
+
+    def close(self) -> None:
+        """열어 둔 HTTP 연결을 닫습니다."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _read_body(self, response: "requests.Response", deadline: float, limit: int, truncate: bool = False) -> bytes:
+        """
+        응답 본문을 limit 바이트까지 나눠 읽습니다.
+
+        한 번에 도착한 만큼씩 읽고 소켓 대기 시간을 남은 시간으로 줄이므로,
+        바이트를 조금씩 보내 소켓 타임아웃을 피하는 응답도 deadline에 끊깁니다.
+        gzip/deflate 압축은 직접 풀면서 limit을 넘는 만큼은 풀지 않으므로, 작게 압축된 큰 응답도 메모리를 쓰지 못합니다.
+
+        Args:
+            response: stream=True로 받은 응답
+            deadline: time.monotonic() 기준 마감 시각
+            limit: 읽을 최대 바이트
+            truncate: True면 limit에서 읽기를 멈추고 그때까지의 본문을 반환 (False면 ResponseTooLarge)
+
+        Returns:
+            응답 본문 (압축은 푼 상태)
+        """
+        import requests
+
+        length = response.headers.get("Content-Length", "")
+        if not truncate and length.isdigit() and int(length) > limit:
+            raise ResponseTooLarge(f"Content-Length {length} bytes")
+
+        raw = response.raw
+        # urllib3 2.x는 도착한 만큼만 돌려주는 read1 제공 (없으면 청크 크기만큼 기다리는 read)
+        read = getattr(raw, "read1", None) or raw.read
+        sock = getattr(getattr(raw, "connection", None), "sock", None)
+        encoding = response.headers.get("Content-Encoding", "").strip().lower()
+        # gzip/zlib 헤더 자동 판별 (그 밖의 압축은 urllib3가 풂)
+        decoder = zlib.decompressobj(zlib.MAX_WBITS | 32) if encoding in ("gzip", "deflate") else None
+        body = bytearray()
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout("응답 본문 읽기 시간 초과")
+                if sock is not None:
+                    sock.settimeout(remaining)
+                chunk = read(READ_CHUNK_BYTES, decode_content=decoder is None)
+                if not chunk:
+                    return bytes(body)
+                if decoder is not None:
+                    # limit을 1바이트 넘길 만큼만 풀어 초과 여부만 확인
+                    chunk = decoder.decompress(chunk, limit + 1 - len(body))
+                body += chunk
+                if len(body) > limit:
+                    if truncate:
+                        return bytes(body[:limit])
+                    raise ResponseTooLarge(f"{len(body)} bytes 이상")
+        except zlib.error as e:
+            raise requests.exceptions.ContentDecodingError(str(e)) from e
+        except TimeoutError as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except OSError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except Exception as e:
+            # urllib3 예외(ReadTimeoutError, ProtocolError 등)를 requests 예외로 맞춤
+            if type(e).__name__ == "ReadTimeoutError":
+                raise requests.exceptions.Timeout(str(e)) from e
+            if type(e).__module__.startswith("urllib3"):
+                raise requests.exceptions.ConnectionError(str(e)) from e
+            raise
     
     def send_question(self, question_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], float, bool]:
         """
         문제를 API 엔드포인트로 전송하고 응답을 받습니다.
+
+        응답 본문은 나눠 읽으면서 max_response_bytes를 넘으면 바로 연결을 끊고, 연결부터 본문까지 timeout초가 지나면
+        감시 스레드가 연결을 끊으므로, 큰 응답이나 헤더/본문을 아주 느리게 보내는 엔드포인트도
+        채점 스레드를 오래 붙잡거나 메모리를 많이 쓰지 못합니다.
         
         Args:
             question_data: API로 전송할 문제 데이터
@@ -28,36 +246,69 @@ class APIClient:
         Returns:
             (응답 데이터, 응답 시간(초), 성공 여부) 튜플
         """
+        import requests
+
         start_time = time.time()
+        deadline = time.monotonic() + self.timeout
         success = False
         response_data = None
+        outcome = "error"
+        request = _RequestDeadline()
+        _current_request.value = request
+        watch = _WATCHDOG.watch(deadline, request)
         
         try:
-            # API 엔드포인트로 POST 요청 전송
-            response = requests.post(
+            # API 엔드포인트로 POST 요청 전송 (본문은 헤더를 받은 뒤 직접 나눠 읽음)
+            response = self.session.post(
                 self.api_endpoint,
                 json=question_data,
-                timeout=self.timeout
+                timeout=self.timeout,
+                stream=True,
+                # 크기 제한을 지키며 풀 수 있는 압축만 허용
+                headers={"Accept-Encoding": "gzip, deflate"},
             )
             
-            # HTTP 응답 상태 코드 확인
-            if response.status_code == 200:
-                response_data = response.json()
-                success = self.validate_response(response_data)
-            else:
-                self.logger.error(f"API 요청 실패: 상태 코드 {response.status_code}")
-                self.logger.error(f"응답 내용: {response.text}")
+            with response:
+                # HTTP 응답 상태 코드 확인
+                if response.status_code == 200:
+                    body = self._read_body(response, deadline, self.max_response_bytes)
+                    try:
+                        response_data = json.loads(body)
+                    except ValueError as e:
+                        outcome = "invalid"
+                        self.logger.error(f"API 응답이 JSON이 아닙니다: {str(e)}")
+                    else:
+                        success = self.validate_response(response_data)
+                        outcome = "ok" if success else "invalid"
+                else:
+                    outcome = "http_error"
+                    self.logger.error(f"API 요청 실패: 상태 코드 {response.status_code}")
+                    # 오류 응답은 앞부분만 읽고 나머지는 받지 않음
+                    body = self._read_body(response, deadline, ERROR_BODY_LOG_BYTES, truncate=True)
+                    suffix = " ...(잘림)" if len(body) >= ERROR_BODY_LOG_BYTES else ""
+                    self.logger.error(f"응답 내용: {body.decode('utf-8', errors='replace')}{suffix}")
                 
-        except requests.exceptions.Timeout:
-            self.logger.error(f"API 요청 타임아웃: {self.timeout}초 초과")
-        except requests.exceptions.ConnectionError:
-            self.logger.error(f"API 연결 오류: {self.api_endpoint}에 연결할 수 없음")
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"API 요청 오류: {str(e)}")
+        except ResponseTooLarge as e:
+            outcome = "too_large"
+            self.logger.error(f"API 응답이 너무 큽니다 (최대 {self.max_response_bytes} bytes): {str(e)}")
         except Exception as e:
-            self.logger.error(f"예상치 못한 오류: {str(e)}")
+            if request.expired or isinstance(e, requests.exceptions.Timeout):
+                # 감시 스레드가 끊은 연결의 오류도 타임아웃으로 분류
+                outcome = "timeout"
+                self.logger.error(f"API 요청 타임아웃: {self.timeout}초 초과")
+            elif isinstance(e, requests.exceptions.ConnectionError):
+                outcome = "connection_error"
+                self.logger.error(f"API 연결 오류: {self.api_endpoint}에 연결할 수 없음")
+            elif isinstance(e, requests.exceptions.RequestException):
+                self.logger.error(f"API 요청 오류: {str(e)}")
+            else:
+                self.logger.error(f"예상치 못한 오류: {str(e)}")
+        finally:
+            _WATCHDOG.cancel(watch)
+            _current_request.value = None
             
         elapsed_time = time.time() - start_time
+        CONTESTANT_REQUESTS.inc(outcome=outcome)
         return response_data, elapsed_time, success
     
     def validate_response(self, response: Dict[str, Any]) -> bool:
@@ -70,8 +321,8 @@ class APIClient:
         Returns:
             응답이 유효하면 True, 그렇지 않으면 False
         """
-        # 응답에 'answer' 필드가 있고, 문자열인지 확인
-        if 'answer' not in response:
+        # 응답이 객체이고 'answer' 필드가 있으며, 문자열인지 확인
+        if not isinstance(response, dict) or 'answer' not in response:
             self.logger.error("API 응답에 'answer' 필드가 없습니다")
             return False
             
@@ -1,3 +1,6 @@
+# 시작 시간 측정 기준점이 되도록 가장 먼저 import
+import profiling
+
 import streamlit as st
 import pandas as pd
 import os
@@ -5,91 +8,16 @@ import time
 from datetime import datetime
 import threading
 
-# 모듈 임포트
+# 모듈 임포트 (openai, requests는 첫 채점 때 import)
 from quiz_manager import QuizManager
-from api_client import APIClient
 from scoring import Scorer
 from leaderboard_manager import LeaderboardManager
 from logger import QuizLogger
+from quiz_runner import QuizRunner
+import metrics
 import utils
 
-# 퀴즈 처리 함수
-def process_quiz(name, api_endpoint):
-    """
-    사용자 API 엔드포인트로 퀴즈를 전송하고 결과를 처리합니다.
-    """
-    try:
-        # API 클라이언트 초기화
-        api_client = APIClient(api_endpoint)
-        
-        # 총 문제 수 가져오기
-        total_questions = quiz_manager.get_total_questions()
-        
-        # 결과 저장 변수
-        exact_match_results = []
-        llm_judge_results = []
-        response_times = []
-        
-        # 각 문제 처리
-        for i in range(total_questions):
-            # 현재 진행 상황 업데이트
-            leaderboard_manager.update_question_progress(name, api_endpoint, i)
-            
-            # 문제 가져오기
-            question_data = quiz_manager.get_question(i)
-            correct_answer = quiz_manager.get_correct_answer(i)
-            
-            # API로 문제 전송
-            response, response_time, success = api_client.send_question(question_data)
-            
-            if not success:
-                logger.log_error(name, api_endpoint, f"API 호출 실패: 문제 {i}")
-                leaderboard_manager.update_error_status(name, api_endpoint, f"API 호출 실패: 문제 {i}")
-                return
-            
-            # 응답 검증
-            if not api_client.validate_response(response):
-                logger.log_error(name, api_endpoint, f"유효하지 않은 응답: 문제 {i}")
-                leaderboard_manager.update_error_status(name, api_endpoint, f"유효하지 않은 응답: 문제 {i}")
-                return
-            
-            # 사용자 답변 추출
-            user_answer = response.get("answer", "")
-            
-            # Exact Match 채점
-            is_correct = scorer.exact_match_score(user_answer, correct_answer)
-            exact_match_results.append(is_correct)
-            
-            # LLM as Judge 채점
-            llm_score, _ = scorer.llm_judge_score(user_answer, correct_answer, question_data.get("question_text", ""))
-            llm_judge_results.append(llm_score)
-
-            
-            # 응답 시간 기록
-            response_times.append(response_time)
-            
-            # 로그 기록
-            logger.log_question_response(
-                name, api_endpoint, i, 
-                question_data.get("question_text", ""),
-                user_answer, correct_answer,
-                is_correct, llm_score, response_time
-            )
-        
-        # 최종 결과 계산
-        correct_rate = scorer.calculate_total_score(exact_match_results) * 100
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        llm_result = sum(llm_judge_results) / len(llm_judge_results) if llm_judge_results else 0
-        
-        # 리더보드 업데이트
-        leaderboard_manager.update_completion(
-            name, api_endpoint, correct_rate, avg_response_time, str(llm_result)
-        )
-        
-    except Exception as e:
-        error_msg = f"처리 중 오류 발생: {str(e)}"
-        logger.log_error(name, api_endpoint, error_msg)
-        leaderboard_manager.update_error_status(name, api_endpoint, error_msg)
+profiling.STARTUP.mark("imports")
 
 # Set page title and configuration
 st.set_page_config(
@@ -103,23 +31,98 @@ DATA_DIR = "data"
 QUIZ_DATA_PATH = os.path.join(DATA_DIR, "sorted_quiz_data.csv")
 LEADERBOARD_PATH = os.path.join(DATA_DIR, "leaderboard.csv")
 
+# 적응형 평가 설정
+ADAPTIVE_CI_WIDTH = 0.10       # 정확도 신뢰구간 폭이 10%p 이하가 되면 종료
+ADAPTIVE_MIN_PER_LEVEL = 5     # 난이도별 최소 출제 수
+ADAPTIVE_MIN_QUESTIONS = 30    # 최소 출제 수
+
+# Prometheus 형식 지표 포트 (http://<host>:<port>/metrics, 0이면 사용 안 함)
+METRICS_PORT = int(os.getenv("QUIZ_METRICS_PORT", "9108"))
+
+# 시작 직후 문제 은행과 채점 클라이언트를 백그라운드에서 미리 준비할지 여부
+# (끄면 첫 제출 때 준비하므로 리더보드 화면이 가장 빨리 뜸)
+PRELOAD = os.getenv("QUIZ_PRELOAD", "0") == "1"
+
 # 디렉토리 생성
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # 전역 객체 초기화
 @st.cache_resource
 def init_resources():
-    quiz_manager = QuizManager(QUIZ_DATA_PATH)
+    # 문제 은행은 처음 필요할 때 로드 (리더보드 화면에는 필요 없음)
+    quiz_manager = QuizManager(QUIZ_DATA_PATH, lazy=True)
     leaderboard_manager = LeaderboardManager(LEADERBOARD_PATH)
     scorer = Scorer()
     logger = QuizLogger()
-    return quiz_manager, leaderboard_manager, scorer, logger
+    quiz_runner = QuizRunner(
+        quiz_manager, leaderboard_manager, scorer, logger,
+        ci_width_threshold=ADAPTIVE_CI_WIDTH,
+        min_per_level=ADAPTIVE_MIN_PER_LEVEL,
+        min_questions=ADAPTIVE_MIN_QUESTIONS,
+    )
+    if METRICS_PORT:
+        try:
+            metrics.start_http_server(METRICS_PORT)
+        except OSError as e:
+            logger.logger.warning(f"지표 서버를 시작하지 못했습니다 (포트 {METRICS_PORT}): {e}")
+    if PRELOAD:
+        def preload():
+            quiz_manager.get_total_questions()
+            scorer.warm_up()
+        threading.Thread(target=preload, name="quiz-preload", daemon=True).start()
+    return quiz_manager, leaderboard_manager, scorer, logger, quiz_runner
 
-quiz_manager, leaderboard_manager, scorer, logger = init_resources()
+quiz_manager, leaderboard_manager, scorer, logger, quiz_runner = init_resources()
+profiling.STARTUP.mark("init_resources")
 
-# Function to load the leaderboard data
-def load_leaderboard():
-    return pd.read_csv(LEADERBOARD_PATH)
+# 리더보드 읽기 캐시: 파일 버전(수정 시각, 크기)이 같으면 다시 읽지 않음
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_leaderboard(version):
+    return leaderboard_manager.get_leaderboard()
+
+# 필터링/표시 형식 적용 결과도 버전과 옵션별로 캐시
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_leaderboard_view(version, show_completed_only, dedup_metric):
+    leaderboard_df = load_leaderboard(version)
+    if leaderboard_df.empty:
+        return leaderboard_df
+    
+    # 완료된 항목만 표시
+    if show_completed_only:
+        leaderboard_df = LeaderboardManager.filter_completed(leaderboard_df)
+    
+    # 이름 중복 제거 (각 이름별로 선택한 지표가 가장 높은 행만 선택)
+    if dedup_metric is not None and not leaderboard_df.empty:
+        leaderboard_df = LeaderboardManager.best_per_name(leaderboard_df, dedup_metric)
+    
+    # 데이터 형식 지정 (표시용)
+    display_df = leaderboard_df.copy()
+    if "correct_answer_rate" in display_df.columns:
+        display_df["correct_answer_rate"] = display_df["correct_answer_rate"].apply(
+            lambda x: f"{float(x):.2f}%" if pd.notna(x) else "N/A"
+        )
+    if "average_response_time" in display_df.columns:
+        display_df["average_response_time"] = display_df["average_response_time"].apply(
+            lambda x: f"{float(x):.2f}초" if pd.notna(x) else "N/A"
+        )
+    if "ci_lower" in display_df.columns and "ci_upper" in display_df.columns:
+        # 적응형 평가 결과의 신뢰구간 표시 (전체 평가는 구간 없음)
+        has_ci = display_df["ci_lower"].notna() & display_df["ci_upper"].notna()
+        display_df["confidence_interval"] = "-"
+        display_df.loc[has_ci, "confidence_interval"] = (
+            display_df.loc[has_ci, "ci_lower"].astype(float).map("{:.1f}%".format) + " ~ " +
+            display_df.loc[has_ci, "ci_upper"].astype(float).map("{:.1f}%".format)
+        )
+        display_df = display_df.drop(columns=["ci_lower", "ci_upper"])
+    if "judge_cached_ratio" in display_df.columns:
+        display_df["judge_cached_ratio"] = display_df["judge_cached_ratio"].apply(
+            lambda x: f"{float(x):.1%}" if pd.notna(x) else "N/A"
+        )
+    if "judge_cost_usd" in display_df.columns:
+        display_df["judge_cost_usd"] = display_df["judge_cost_usd"].apply(
+            lambda x: f"${float(x):.4f}" if pd.notna(x) else "N/A"
+        )
+    return display_df
 
 # Function to save the leaderboard data
 def save_leaderboard(df):
@@ -130,56 +133,30 @@ st.title("🏆 3kingdoms Quiz Leaderboard")
 st.markdown("삼국지 퀴즈 API 리더보드 - 당신의 API 엔드포인트를 제출하고 성능을 확인하세요!")
 
 # Create tabs for viewing and adding entries
-tab1, tab2, tab3 = st.tabs(["리더보드", "API 제출", "진행 상황 모니터링"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["리더보드", "API 제출", "진행 상황 모니터링", "시스템 지표", "문항 분석"])
+
+# 이번 실행에서 사용할 리더보드 버전 (stat 한 번으로 확인)
+leaderboard_version = leaderboard_manager.get_version()
 
 with tab1:
     st.header("현재 리더보드")
     
-    # Load and display the leaderboard
-    leaderboard_df = leaderboard_manager.get_leaderboard()
-    
     # 필터링 옵션들
     col1, col2 = st.columns([3, 1])
     with col2:
         show_completed_only = st.checkbox("완료된 항목만 표시", value=True)
         deduplicate_names = st.checkbox("이름별 최고 성능만 표시", value=False)
         
+        dedup_metric = None
         if deduplicate_names:
-            dedup_metric = st.radio("중복 제거 기준:", 
+            dedup_choice = st.radio("중복 제거 기준:", 
                                    ["정확도 (correct_answer_rate)", 
                                     "LLM 점수 (llm_judge_result)"])
+            dedup_metric = "correct_answer_rate" if dedup_choice == "정확도 (correct_answer_rate)" else "llm_judge_result"
     
-    # 필터링 적용
-    if not leaderboard_df.empty:
-        # 완료된 항목만 표시
-        if show_completed_only:
-            leaderboard_df = leaderboard_df[leaderboard_df["status"] == "completed"]
-        
-        # 이름 중복 제거
-        if deduplicate_names and not leaderboard_df.empty:
-            # 수치형으로 변환
-            leaderboard_df["correct_answer_rate"] = pd.to_numeric(leaderboard_df["correct_answer_rate"], errors='coerce')
-            leaderboard_df["llm_judge_result"] = pd.to_numeric(leaderboard_df["llm_judge_result"], errors='coerce')
-            
-            if dedup_metric == "정확도 (correct_answer_rate)":
-                # 각 이름별로 정확도가 가장 높은 행만 선택
-                idx = leaderboard_df.groupby('name')['correct_answer_rate'].idxmax()
-                leaderboard_df = leaderboard_df.loc[idx]
-            else:
-                # 각 이름별로 LLM 점수가 가장 높은 행만 선택
-                idx = leaderboard_df.groupby('name')['llm_judge_result'].idxmax()
-                leaderboard_df = leaderboard_df.loc[idx]
-        
-        # 데이터 형식 지정 (표시용)
-        display_df = leaderboard_df.copy()
-        if "correct_answer_rate" in display_df.columns:
-            display_df["correct_answer_rate"] = display_df["correct_answer_rate"].apply(
-                lambda x: f"{float(x):.2f}%" if pd.notna(x) else "N/A"
-            )
-        if "average_response_time" in display_df.columns:
-            display_df["average_response_time"] = display_df["average_response_time"].apply(
-                lambda x: f"{float(x):.2f}초" if pd.notna(x) else "N/A"
-            )
+    # 캐시된 리더보드에 필터링 적용
+    if not load_leaderboard(leaderboard_version).empty:
+        display_df = build_leaderboard_view(leaderboard_version, show_completed_only, dedup_metric)
         
         # 데이터프레임 표시 (Streamlit의 기본 정렬 기능 활용)
         st.dataframe(display_df, use_container_width=True)
@@ -192,6 +169,13 @@ with tab2:
     with st.form("submit_api_form"):
         name = st.text_input("이름")
         api_endpoint = st.text_input("API 엔드포인트 URL")
+        adaptive = st.checkbox(
+            "적응형 평가 (정확도 신뢰구간이 충분히 좁아지면 조기 종료)", value=False
+        )
+        profile = st.checkbox(
+            "프로파일링 (처리 과정의 함수별 시간과 메모리 할당을 logs/profiles에 저장)",
+            value=bool(quiz_runner.profile_mode)
+        )
         
         submitted = st.form_submit_button("제출")
         
@@ -208,10 +192,9 @@ with tab2:
                     st.success(f"{name}님의 API가 제출되었습니다. 퀴즈 처리가 시작됩니다.")
                     
                     # 백그라운드에서 퀴즈 처리 시작
-                    # 함수 정의를 참조하는 대신 전체 경로 사용
                     thread = threading.Thread(
-                        target=process_quiz,  # 전체 경로로 함수 참조
-                        args=(name, api_endpoint)
+                        target=quiz_runner.process_quiz,
+                        args=(name, api_endpoint, adaptive, profile)
                     )
                     thread.daemon = True
                     thread.start()
@@ -223,8 +206,8 @@ with tab2:
 with tab3:
     st.header("퀴즈 진행 상황 모니터링")
     
-    # 진행 중인 항목 필터링
-    leaderboard_df = leaderboard_manager.get_leaderboard()
+    # 진행 중인 항목 필터링 (리더보드 탭과 같은 캐시 사용)
+    leaderboard_df = load_leaderboard(leaderboard_version)
     processing_df = leaderboard_df[leaderboard_df["status"] == "processing"]
     
     if not processing_df.empty:
@@ -264,6 +247,151 @@ with tab3:
         st.subheader("오류 발생 항목")
         st.dataframe(error_df[["name", "api_endpoint", "submission_time"]], use_container_width=True)
 
+with tab4:
+    st.header("시스템 지표")
+    st.caption(f"이 프로세스가 시작된 뒤의 누적 값입니다. Prometheus 형식: http://<host>:{METRICS_PORT}/metrics"
+               if METRICS_PORT else "이 프로세스가 시작된 뒤의 누적 값입니다.")
+
+    def counter_value(counter, **labels):
+        return sum(value for key, value in counter.values().items()
+                   if all(key[counter.labelnames.index(k)] == v for k, v in labels.items()))
+
+    judge_hits = counter_value(metrics.JUDGE_CACHE, result="hit")
+    judge_lookups = judge_hits + counter_value(metrics.JUDGE_CACHE, result="miss")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("채점 중인 제출", int(counter_value(metrics.ACTIVE_SUBMISSIONS)))
+    col2.metric("채점한 문제", int(counter_value(metrics.QUESTIONS)))
+    col3.metric("LLM 채점 캐시 적중률", f"{judge_hits / judge_lookups:.1%}" if judge_lookups else "N/A")
+    col4.metric("리더보드 갱신 실패", int(counter_value(metrics.LEADERBOARD_FAILURES)),
+                help=f"재시도 {int(counter_value(metrics.LEADERBOARD_RETRIES))}회")
+
+    def seconds_table(histogram, label):
+        rows = histogram.summary()
+        if not rows:
+            return None
+        table = pd.DataFrame(rows).rename(columns={label: "구분", "count": "횟수"})
+        for column in ["mean", "p50", "p95", "p99"]:
+            table[column] = table[column].map(lambda x: f"{x * 1000:.1f} ms" if pd.notna(x) else "N/A")
+        return table
+
+    st.subheader("단계별 소요 시간")
+    stage_table = seconds_table(metrics.STAGE_SECONDS, "stage")
+    if stage_table is not None:
+        st.dataframe(stage_table, use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 기록된 지표가 없습니다.")
+
+    st.subheader("락 대기 시간")
+    lock_table = seconds_table(metrics.LOCK_WAIT_SECONDS, "lock")
+    if lock_table is not None:
+        waiters = {key[0]: value for key, value in metrics.LOCK_WAITERS.values().items()}
+        lock_table["대기 중"] = lock_table["구분"].map(lambda lock: int(waiters.get(lock, 0)))
+        st.dataframe(lock_table, use_container_width=True, hide_index=True)
+
+    st.subheader("결과별 개수")
+    count_rows = [
+        {"지표": counter.name, "구분": ",".join(key) or "-", "값": int(value)}
+        for counter in [metrics.SUBMISSIONS, metrics.CONTESTANT_REQUESTS, metrics.JUDGE_REQUESTS]
+        for key, value in sorted(counter.values().items())
+    ]
+    if count_rows:
+        st.dataframe(pd.DataFrame(count_rows), use_container_width=True, hide_index=True)
+
+    st.subheader("LLM 채점 토큰 사용량")
+    usage_summary = scorer.usage.summary()
+    if usage_summary:
+        usage_table = pd.DataFrame.from_dict(usage_summary, orient="index").rename_axis("model").reset_index()
+        usage_table["cached_ratio"] = usage_table["cached_ratio"].map("{:.1%}".format)
+        usage_table["cost_usd"] = usage_table["cost_usd"].map("${:.4f}".format)
+        st.dataframe(usage_table, use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 LLM 채점 호출이 없습니다.")
+
+    with st.expander("Prometheus 텍스트"):
+        st.code(metrics.REGISTRY.render(), language="text")
+
+    st.subheader("시작 시간")
+    startup_rows = profiling.STARTUP.report()
+    if startup_rows:
+        startup_table = pd.DataFrame(startup_rows).rename(columns={"phase": "단계"})
+        startup_table["소요 시간"] = startup_table.pop("seconds").map(lambda x: f"{x * 1000:.0f} ms")
+        st.dataframe(startup_table, use_container_width=True, hide_index=True)
+    st.caption("before_script: 프로세스 시작부터 앱 스크립트 실행까지, render: 첫 화면 그리기. "
+               "import별 시간은 python profiling.py importtime으로 확인하세요.")
+
+    st.subheader("프로파일")
+    profiles = profiling.list_profiles(quiz_runner.profile_dir)
+    if profiles:
+        for entry in profiles:
+            with st.expander(f"{entry['started_at']} {entry['label']} ({entry['mode']}, {entry['elapsed_seconds']:.1f}초)"):
+                st.caption(f"{entry['path']} (flamegraph: flamegraph.pl profile.collapsed > flame.svg)")
+                summary_path = os.path.join(entry["path"], "summary.txt")
+                if os.path.exists(summary_path):
+                    with open(summary_path, "r", encoding="utf-8") as f:
+                        st.code(f.read(), language="text")
+    else:
+        st.info("저장된 프로파일이 없습니다. 제출 시 '프로파일링'을 선택하거나 QUIZ_PROFILE을 설정하세요.")
+
+with tab5:
+    st.header("문항 분석")
+    # 응답을 기록할 때마다 갱신한 집계만 읽으므로 로그 길이와 상관없이 바로 그려짐
+    analytics = logger.analytics
+    question_table = analytics.question_table()
+    level_table = analytics.level_table()
+    if question_table.empty:
+        st.info("아직 채점한 응답이 없습니다. 예전 로그는 python analytics.py rebuild로 집계할 수 있습니다.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("채점한 응답", analytics.responses)
+        col2.metric("문제", len(question_table))
+        col3.metric("제출", len(level_table))
+
+        def percent(table, columns):
+            table = table.copy()
+            for column in columns:
+                table[column] = table[column].map(lambda x: f"{x:.1%}" if pd.notna(x) else "-")
+            return table
+
+        st.subheader("모두 틀린 문제")
+        min_responses = st.number_input("최소 응답 수", min_value=1, value=min(3, len(level_table)) or 1, step=1,
+                                        help="이 수 이상 응답을 받은 문제만 표시합니다.")
+        filtered = question_table[question_table["responses"] >= min_responses]
+        all_wrong = filtered[filtered["accuracy"] == 0]
+        st.caption(f"응답 {min_responses}개 이상인 문제 {len(filtered)}개 중 {len(all_wrong)}개를 모든 응답이 틀렸습니다.")
+        question_columns = {"question": "문제", "level": "난이도", "responses": "응답 수", "accuracy": "정확도",
+                            "llm_score": "LLM 점수", "mean_time": "평균 응답 시간(초)", "p95_time": "p95 응답 시간(초)",
+                            "max_time": "최대 응답 시간(초)"}
+        st.dataframe(percent(all_wrong, ["accuracy"]).rename(columns=question_columns),
+                     use_container_width=True, hide_index=True)
+
+        with st.expander("문제별 정확도 (낮은 순)"):
+            st.dataframe(percent(filtered, ["accuracy"]).rename(columns=question_columns),
+                         use_container_width=True, hide_index=True)
+
+        st.subheader("난이도별 정확도 (제출별)")
+        levels = [c for c in level_table.columns if c not in ("name", "api_endpoint", "responses", "accuracy")]
+        st.dataframe(percent(level_table, ["accuracy"] + levels).rename(
+            columns={"name": "이름", "api_endpoint": "API 엔드포인트", "responses": "응답 수", "accuracy": "전체"}),
+            use_container_width=True, hide_index=True)
+
+        if len(level_table) > 1:
+            top_k = st.slider("상위권 제출 수", min_value=1, max_value=len(level_table) - 1,
+                              value=min(3, len(level_table) - 1))
+            separation = analytics.level_separation(top_k)
+            if not separation.empty:
+                st.caption(f"정확도 상위 {top_k}개 제출과 나머지의 난이도별 평균 정확도 차이 (클수록 상위권을 가르는 난이도)")
+                st.dataframe(percent(separation, ["top", "rest", "gap"]).rename(
+                    columns={"level": "난이도", "top": "상위권", "rest": "나머지", "gap": "차이"}),
+                    use_container_width=True, hide_index=True)
+
+        st.subheader("응답이 느린 문제")
+        slowest = question_table.sort_values("mean_time", ascending=False).head(20)
+        st.dataframe(slowest[["question", "level", "responses", "mean_time", "p95_time", "max_time"]].rename(
+            columns=question_columns), use_container_width=True, hide_index=True)
+        st.caption("p95 응답 시간은 구간(0.1/0.25/0.5/1/2/5/10/30초) 상한으로 표시합니다.")
+
 # Add footer
 st.markdown("---")
-st.markdown("AI Model Leaderboard - Powered by Streamlit and Hugging Face Spaces")
\ No newline at end of file
+st.markdown("AI Model Leaderboard - Powered by Streamlit and Hugging Face Spaces")
+
+profiling.STARTUP.finish()
\ No newline at end of file
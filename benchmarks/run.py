@@ -0,0 +1,371 @@
+"""
+채점 경로 벤치마크
+
+퀴즈 조회, 리더보드 갱신, 상호작용 로그 기록/조회, Exact Match 채점, 로컬 가짜 참가자/채점 서버를 쓰는
+process_quiz 전체 흐름의 처리량과 지연 시간을 재고, 기준 결과(JSON)와 비교해 허용 범위를 넘게 느려지면 실패합니다.
+
+실행 (저장소 루트에서):
+    python benchmarks/run.py                      # 측정 후 benchmarks/baseline.json과 비교
+    python benchmarks/run.py --save-baseline      # 측정 결과를 기준으로 저장
+    python benchmarks/run.py -k leaderboard       # 이름에 leaderboard가 들어간 벤치마크만
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from contestant_simulator import ContestantFleet, make_profiles  # noqa: E402
+from leaderboard_manager import LEADERBOARD_COLUMNS, LeaderboardManager  # noqa: E402
+from llm_stub_server import StubPolicy, create_server  # noqa: E402
+from logger import QuizLogger  # noqa: E402
+from quiz_manager import QuizManager  # noqa: E402
+from quiz_runner import QuizRunner  # noqa: E402
+from scoring import Scorer  # noqa: E402
+
+DEFAULT_QUIZ_PATH = os.path.join(REPO_DIR, "data", "quiz_data.csv")
+DEFAULT_BASELINE_PATH = os.path.join(REPO_DIR, "benchmarks", "baseline.json")
+
+# 비교하는 지표와 좋아지는 방향 (True면 클수록 좋음)
+COMPARED_METRICS = {"throughput": True, "p50_ms": False, "p95_ms": False}
+# 허용 범위 없이 0이어야 하는 지표 (동시 갱신 중 유실된 리더보드 쓰기 등)
+ZERO_METRICS = ["failures"]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _result(latencies: List[float], elapsed: float, ops: Optional[int] = None, **extra) -> Dict[str, Any]:
+    """작업별 소요 시간(초)과 전체 경과 시간으로 처리량(작업/초)과 지연 시간 백분위(ms)를 계산합니다."""
+    ops = len(latencies) if ops is None else ops
+    return {
+        "ops": ops,
+        "seconds": round(elapsed, 4),
+        "throughput": round(ops / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 4),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 4),
+        **extra,
+    }
+
+
+def _measure(operation: Callable[[int], Any], count: int) -> Dict[str, Any]:
+    """operation(i)를 count번 차례로 실행하며 작업별 소요 시간을 잽니다."""
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        op_started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - op_started)
+    return _result(latencies, time.perf_counter() - started)
+
+
+# ---------- 벤치마크 ----------
+
+def bench_quiz_get_question(quiz_path: str, work_dir: str) -> Dict[str, Any]:
+    """문제 은행 전체를 get_question/get_correct_answer로 세 번 훑습니다."""
+    quiz_manager = QuizManager(quiz_path)
+    total = quiz_manager.get_total_questions()
+
+    def operation(i: int) -> None:
+        quiz_manager.get_question(i % total)
+        quiz_manager.get_correct_answer(i % total)
+
+    return {**_measure(operation, total * 3), "questions": total}
+
+
+def _prefilled_leaderboard(work_dir: str, rows: int) -> LeaderboardManager:
+    """완료된 제출 rows개가 들어 있는 리더보드를 만듭니다."""
+    path = os.path.join(work_dir, f"leaderboard_{rows}.csv")
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    pd.DataFrame([{
+        "name": f"bench-{i:05d}", "api_endpoint": f"http://127.0.0.1:9/{i}", "correct_answer_rate": 50.0,
+        "average_response_time": 0.1, "submission_time": now, "completion_time": now,
+        "current_question_index": 0, "status": "completed", "llm_judge_result": "0.5",
+        "questions_evaluated": 30, "ci_lower": None, "ci_upper": None,
+    } for i in range(rows)], columns=LEADERBOARD_COLUMNS).to_csv(path, index=False)
+    return LeaderboardManager(path)
+
+
+def _bench_leaderboard_update(rows: int, count: int) -> Callable[[str, str], Dict[str, Any]]:
+    def bench(quiz_path: str, work_dir: str) -> Dict[str, Any]:
+        manager = _prefilled_leaderboard(work_dir, rows)
+        target = rows // 2
+        name, endpoint = f"bench-{target:05d}", f"http://127.0.0.1:9/{target}"
+        return {**_measure(lambda i: manager.update_question_progress(name, endpoint, i), count), "rows": rows}
+    bench.__doc__ = f"행 {rows}개인 리더보드에서 한 제출의 진행 상황을 {count}번 갱신합니다."
+    return bench
+
+
+def bench_leaderboard_concurrent(quiz_path: str, work_dir: str, writers: int = 8,
+                                 updates: int = 10, rows: int = 1000) -> Dict[str, Any]:
+    """행 1000개인 리더보드에 8개 스레드가 각자 자기 제출을 10번씩 동시에 갱신합니다."""
+    manager = _prefilled_leaderboard(work_dir, rows)
+    latencies: List[float] = []
+    failures = [0]
+    lock = threading.Lock()
+
+    def writer(w: int) -> None:
+        name, endpoint = f"bench-{w:05d}", f"http://127.0.0.1:9/{w}"
+        for i in range(updates):
+            op_started = time.perf_counter()
+            ok = manager.update_question_progress(name, endpoint, i)
+            with lock:
+                latencies.append(time.perf_counter() - op_started)
+                failures[0] += 0 if ok else 1
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return _result(latencies, elapsed, ops=len(latencies) - failures[0],
+                   rows=rows, writers=writers, failures=failures[0])
+
+
+def _prefilled_logger(work_dir: str, entries: int) -> QuizLogger:
+    """상호작용 로그 항목 entries개가 들어 있는 로거를 만듭니다 (제출 100개 x 문제 entries/100개)."""
+    log_dir = os.path.join(work_dir, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    now = datetime.now().isoformat()
+    with open(os.path.join(log_dir, "interactions.json"), "w", encoding="utf-8") as f:
+        json.dump([{
+            "timestamp": now, "name": f"bench-{i % 100:03d}", "api_endpoint": f"http://127.0.0.1:9/{i % 100}",
+            "question_index": i // 100, "question": "유비의 자는 무엇인가?", "user_answer": "현덕",
+            "correct_answer": "현덕", "is_correct": True, "llm_score": 1.0, "response_time": 0.1,
+        } for i in range(entries)], f, ensure_ascii=False, indent=2)
+    quiz_logger = QuizLogger(log_dir)
+    quiz_logger.logger.setLevel(logging.WARNING)
+    return quiz_logger
+
+
+def bench_logger_append_100k(quiz_path: str, work_dir: str, entries: int = 100_000) -> Dict[str, Any]:
+    """항목 10만 개인 상호작용 로그에 문제 응답을 3번 기록합니다."""
+    quiz_logger = _prefilled_logger(work_dir, entries)
+    return {**_measure(lambda i: quiz_logger.log_question_response(
+        "bench-new", "http://127.0.0.1:9/new", i, "유비의 자는 무엇인가?", "현덕", "현덕", True, 1.0, 0.1), 3),
+        "entries": entries}
+
+
+def bench_logger_read_100k(quiz_path: str, work_dir: str, entries: int = 100_000) -> Dict[str, Any]:
+    """항목 10만 개인 상호작용 로그에서 한 제출의 로그를 3번 조회합니다."""
+    quiz_logger = _prefilled_logger(work_dir, entries)
+    return {**_measure(lambda i: quiz_logger.get_user_log(f"bench-{i:03d}", f"http://127.0.0.1:9/{i}"), 3),
+            "entries": entries}
+
+
+def bench_exact_match_batch(quiz_path: str, work_dir: str, batch: int = 10_000) -> Dict[str, Any]:
+    """문제 은행의 정답과 그 변형(공백, 대소문자, 틀린 답) 10,000쌍을 Exact Match로 채점합니다."""
+    answers = pd.read_csv(quiz_path)["answer"].astype(str).tolist()
+    pairs = []
+    for i in range(batch):
+        answer = answers[i % len(answers)]
+        variant = [answer, f" {answer} ", answer.upper(), answers[(i + 1) % len(answers)]][i % 4]
+        pairs.append((variant, answer))
+    scorer = Scorer()
+    _ = scorer.gazetteer  # 인물 이름 사전은 첫 비교 때 읽으므로 측정 전에 준비
+    return {**_measure(lambda i: scorer.exact_match_score(*pairs[i]), batch), "batch": batch}
+
+
+def bench_process_quiz_e2e(quiz_path: str, work_dir: str, contestants: int = 4,
+                           questions: int = 30) -> Dict[str, Any]:
+    """
+    로컬 가짜 참가자 서버와 스텁 채점 서버를 상대로 참가자 4명이 문제 30개를 동시에 풉니다.
+
+    응답/채점 지연은 0이므로 채점기 자체의 처리량(문제/초)과 제출별 소요 시간을 잽니다.
+    채점 캐시는 끄고 모든 문제를 스텁 서버로 채점합니다.
+    """
+    quiz_df = pd.read_csv(quiz_path).head(questions)
+    run_quiz_path = os.path.join(work_dir, "quiz.csv")
+    quiz_df.to_csv(run_quiz_path, index=False)
+
+    fleet = ContestantFleet(make_profiles(contestants, skill_range=(1.0, 1.0), latency_median=0.0),
+                            dict(zip(quiz_df["question"], quiz_df["answer"].astype(str))))
+    fleet.start()
+    judge = create_server(StubPolicy(latency_median=0.0), port=0)
+    threading.Thread(target=judge.serve_forever, daemon=True).start()
+    try:
+        leaderboard_manager = LeaderboardManager(os.path.join(work_dir, "leaderboard.csv"))
+        quiz_logger = QuizLogger(os.path.join(work_dir, "logs"))
+        quiz_logger.logger.setLevel(logging.WARNING)
+        scorer = Scorer(base_url=f"http://127.0.0.1:{judge.server_address[1]}/v1", judge_cache_size=0)
+        scorer.warm_up()  # 첫 채점 때의 openai import와 클라이언트 생성은 측정에서 제외
+        runner = QuizRunner(QuizManager(run_quiz_path), leaderboard_manager, scorer, quiz_logger,
+                            profile_mode="")
+
+        durations: List[float] = [0.0] * contestants
+
+        def work(i: int) -> None:
+            op_started = time.perf_counter()
+            runner.process_quiz(f"bench-{i}", fleet.endpoint(i))
+            durations[i] = time.perf_counter() - op_started
+
+        for i in range(contestants):
+            leaderboard_manager.add_new_submission(f"bench-{i}", fleet.endpoint(i))
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(contestants)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        board = leaderboard_manager.get_leaderboard()
+        completed = int((board["status"] == "completed").sum())
+    finally:
+        judge.shutdown()
+        judge.server_close()
+        fleet.stop()
+    # 처리량은 문제/초, 지연 시간은 제출 하나의 소요 시간
+    return _result(durations, elapsed, ops=completed * len(quiz_df),
+                   contestants=contestants, questions=len(quiz_df), completed=completed)
+
+
+BENCHMARKS: Dict[str, Callable[[str, str], Dict[str, Any]]] = {
+    "quiz_get_question": bench_quiz_get_question,
+    "leaderboard_update_10": _bench_leaderboard_update(10, 50),
+    "leaderboard_update_1000": _bench_leaderboard_update(1_000, 50),
+    "leaderboard_update_10000": _bench_leaderboard_update(10_000, 20),
+    "leaderboard_concurrent": bench_leaderboard_concurrent,
+    "logger_append_100k": bench_logger_append_100k,
+    "logger_read_100k": bench_logger_read_100k,
+    "exact_match_batch": bench_exact_match_batch,
+    "process_quiz_e2e": bench_process_quiz_e2e,
+}
+
+
+# ---------- 실행과 비교 ----------
+
+def run_benchmarks(names: List[str], quiz_path: str) -> Dict[str, Dict[str, Any]]:
+    """벤치마크를 하나씩 새 임시 디렉토리에서 실행합니다."""
+    results = {}
+    for name in names:
+        with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as work_dir:
+            results[name] = BENCHMARKS[name](quiz_path, work_dir)
+        result = results[name]
+        print(f"{name:26s} {result['throughput']:>12,.1f} ops/s  "
+              f"p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms", flush=True)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float, min_ms: float = 0.05) -> List[Tuple[str, str, float, float, float]]:
+    """
+    측정 결과를 기준 결과와 비교합니다.
+
+    Args:
+        results: 벤치마크 이름 -> 측정 결과
+        baseline: 벤치마크 이름 -> 기준 결과
+        tolerance: 허용하는 상대 변화 (0.3이면 처리량 30% 감소, 지연 시간 30% 증가까지 허용)
+        min_ms: 지연 시간은 이 값(ms)보다 적게 늘어난 경우 허용 (타이머 해상도 수준의 흔들림 무시)
+
+    Returns:
+        허용 범위를 넘은 (벤치마크, 지표, 기준 값, 측정 값, 상대 변화) 리스트
+        (ZERO_METRICS는 기준과 상관없이 0보다 크면 포함)
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name) or {}
+        for metric in ZERO_METRICS:
+            before, after = base.get(metric, 0), result.get(metric)
+            if after:
+                regressions.append((name, metric, before, after, (after - before) / before if before else float("inf")))
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if metric.endswith("_ms") and after - before < min_ms:
+                continue
+            if worse > tolerance:
+                regressions.append((name, metric, before, after, change))
+    return regressions
+
+
+def machine_info() -> Dict[str, Any]:
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="채점 경로 벤치마크와 기준 결과 비교")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="이름에 이 문자열이 들어간 벤치마크만 실행 (여러 번 지정 가능)")
+    parser.add_argument("--quiz", default=DEFAULT_QUIZ_PATH, help="문제 은행 CSV 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="기준 결과 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="비교하지 않고 측정 결과를 기준 결과로 저장 (실행한 벤치마크만 교체)")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="허용하는 상대 변화 (기본 0.3: 처리량 30%% 감소, 지연 시간 30%% 증가까지)")
+    parser.add_argument("--min-ms", type=float, default=0.05,
+                        help="지연 시간 증가가 이 값(ms)보다 작으면 허용 (기본 0.05)")
+    parser.add_argument("-o", "--output", help="측정 결과 JSON 저장 경로")
+    parser.add_argument("--list", action="store_true", help="벤치마크 목록 출력")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, bench in BENCHMARKS.items():
+            print(f"{name:26s} {(bench.__doc__ or '').strip().splitlines()[0]}")
+        return
+
+    # 작업마다 찍히는 로그가 측정을 방해하지 않도록 경고 이상만 출력
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    names = [name for name in BENCHMARKS if not args.filter or any(k in name for k in args.filter)]
+    if not names:
+        parser.error(f"일치하는 벤치마크가 없습니다: {args.filter}")
+    results = run_benchmarks(names, args.quiz)
+
+    report = {"created_at": datetime.now().isoformat(timespec="seconds"), "machine": machine_info(),
+              "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                previous = json.load(f).get("results", {})
+            report["results"] = {**previous, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"기준 결과 저장: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"기준 결과가 없습니다: {args.baseline} (--save-baseline으로 만드세요)")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != machine_info():
+        print(f"주의: 기준 결과와 다른 환경에서 측정했습니다 (기준: {baseline.get('machine')})")
+
+    regressions = compare(results, baseline.get("results", {}), args.tolerance, args.min_ms)
+    if not regressions:
+        print(f"기준 대비 허용 범위({args.tolerance:.0%}) 안입니다.")
+        return
+    print(f"기준 대비 허용 범위({args.tolerance:.0%})를 넘은 항목:")
+    for name, metric, before, after, change in regressions:
+        print(f"  {name} {metric}: {before} -> {after} ({change:+.1%})")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import dataset_manifest
+import utils
+
+# 문제 은행에 기록하는 보정 결과 컬럼
+CALIBRATION_COLUMNS = ["calib_responses", "calib_p_correct", "irt_difficulty", "irt_discrimination"]
+
+DEFAULT_LOG_PATH = os.path.join("logs", "interactions.json")
+
+
+def load_responses(log_path: str = DEFAULT_LOG_PATH) -> pd.DataFrame:
+    """
+    상호작용 로그에서 문제별 채점 결과를 읽어옵니다.
+
+    Args:
+        log_path: 상호작용 로그(JSON) 파일 경로
+
+    Returns:
+        submission, question, is_correct 컬럼을 가진 데이터프레임
+    """
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        entries = []
+
+    rows = [
+        (f"{e.get('name')}\t{e.get('api_endpoint')}", e.get("question", ""), bool(e.get("is_correct")))
+        for e in entries
+        if e.get("type") == "question_response" and e.get("question")
+    ]
+    return pd.DataFrame(rows, columns=["submission", "question", "is_correct"])
+
+
+def build_response_matrix(responses: pd.DataFrame) -> Tuple[np.ndarray, List[str], List[str]]:
+    """
+    제출 × 문제 정답 행렬을 만듭니다. 같은 제출이 같은 문제를 여러 번 풀었으면 마지막 결과를 사용합니다.
+
+    Args:
+        responses: load_responses의 결과
+
+    Returns:
+        (정답 행렬 (정답 1.0, 오답 0.0, 미응답 NaN), 제출 목록, 문제 목록) 튜플
+    """
+    deduped = responses.drop_duplicates(["submission", "question"], keep="last")
+    matrix = deduped.pivot(index="submission", columns="question", values="is_correct").astype(float)
+    return matrix.to_numpy(), list(matrix.index), list(matrix.columns)
+
+
+def fit_2pl(matrix: np.ndarray, iterations: int = 100,
+            prior_sd: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    2모수 로지스틱(2PL) 문항반응모형을 결합 최대우도(정규 사전분포 포함)로 적합합니다.
+
+    P(정답) = sigmoid(a_j * (theta_i - b_j)) 이며, 행렬 전체를 한 번에 계산하는
+    대각 뉴턴 방법(피셔 정보량으로 스케일한 경사 상승)을 사용합니다.
+
+    Args:
+        matrix: 제출 × 문제 정답 행렬 (NaN은 미응답)
+        iterations: 반복 횟수
+        prior_sd: 난이도 사전분포 표준편차
+
+    Returns:
+        (제출별 능력 theta, 문제별 난이도 b, 문제별 변별도 a) 튜플
+    """
+    observed = ~np.isnan(matrix)
+    y = np.where(observed, matrix, 0.0)
+    mask = observed.astype(float)
+
+    # 고전 검사 이론 통계량으로 초기화 (보정한 정답률의 로짓)
+    person_p = (y.sum(axis=1) + 0.5) / (mask.sum(axis=1) + 1.0)
+    item_p = (y.sum(axis=0) + 0.5) / (mask.sum(axis=0) + 1.0)
+    theta = np.log(person_p / (1 - person_p))
+    theta = (theta - theta.mean()) / (theta.std() or 1.0)
+    b = -np.log(item_p / (1 - item_p))
+    log_a = np.zeros(matrix.shape[1])
+
+    for _ in range(iterations):
+        a = np.exp(log_a)
+        distance = theta[:, None] - b
+        p = 1.0 / (1.0 + np.exp(-np.clip(a * distance, -30.0, 30.0)))
+        residual = (y - p) * mask
+        weight = p * (1 - p) * mask
+
+        # 로그 우도 기울기 + 사전분포 (theta ~ N(0, 1), b ~ N(0, prior_sd^2), log a ~ N(0, 0.5^2))
+        grad_theta = (residual * a).sum(axis=1) - theta
+        grad_b = -(residual * a).sum(axis=0) - b / prior_sd ** 2
+        grad_log_a = (residual * distance).sum(axis=0) * a - log_a / 0.25
+
+        # 피셔 정보량(대각)으로 나누어 뉴턴 스텝을 만들고, 한 번에 1.0 이상 움직이지 않도록 제한
+        info_theta = (weight * a * a).sum(axis=1) + 1.0
+        info_b = (weight * a * a).sum(axis=0) + 1.0 / prior_sd ** 2
+        info_log_a = (weight * (a * distance) ** 2).sum(axis=0) + 1.0 / 0.25
+
+        theta += np.clip(grad_theta / info_theta, -1.0, 1.0)
+        b += np.clip(grad_b / info_b, -1.0, 1.0)
+        log_a += np.clip(grad_log_a / info_log_a, -1.0, 1.0)
+
+        # 척도 고정: 능력 평균 0, 표준편차 1
+        mean, sd = theta.mean(), theta.std() or 1.0
+        theta = (theta - mean) / sd
+        b = (b - mean) / sd
+        log_a += np.log(sd)
+
+    return theta, b, np.exp(log_a)
+
+
+def item_information(difficulty: np.ndarray, discrimination: np.ndarray, ability: float = 0.0) -> np.ndarray:
+    """
+    주어진 능력 수준에서 2PL 문항 정보량 a^2 * P * (1 - P)를 계산합니다.
+
+    Args:
+        difficulty: 문제별 난이도 b
+        discrimination: 문제별 변별도 a
+        ability: 정보량을 계산할 능력 수준 theta
+
+    Returns:
+        문제별 정보량 (보정되지 않은 문제는 NaN)
+    """
+    p = 1.0 / (1.0 + np.exp(-discrimination * (ability - difficulty)))
+    return discrimination ** 2 * p * (1 - p)
+
+
+def calibrate(responses: pd.DataFrame, min_responses: int = 3) -> pd.DataFrame:
+    """
+    문제별 난이도와 변별도를 추정합니다.
+
+    Args:
+        responses: load_responses의 결과
+        min_responses: 보정 결과를 기록할 최소 응답 수
+
+    Returns:
+        question 컬럼과 CALIBRATION_COLUMNS를 가진 데이터프레임
+    """
+    if responses.empty:
+        return pd.DataFrame(columns=["question"] + CALIBRATION_COLUMNS)
+
+    matrix, _, questions = build_response_matrix(responses)
+    counts = (~np.isnan(matrix)).sum(axis=0)
+    p_correct = np.nanmean(matrix, axis=0)
+    _, difficulty, discrimination = fit_2pl(matrix)
+
+    # 응답 수가 부족한 문제는 IRT 추정치를 비워 둠
+    reliable = counts >= min_responses
+    return pd.DataFrame({
+        "question": questions,
+        "calib_responses": counts,
+        "calib_p_correct": p_correct,
+        "irt_difficulty": np.where(reliable, difficulty, np.nan),
+        "irt_discrimination": np.where(reliable, discrimination, np.nan),
+    })
+
+
+def write_calibration(bank_path: str, calibration: pd.DataFrame) -> bool:
+    """
+    보정 결과를 문제 은행 CSV에 기록합니다. 문제 텍스트가 일치하는 행만 갱신됩니다.
+
+    심볼릭 링크(예: data/quiz_data.csv -> HF test 분할)는 링크를 일반 파일로 바꾸지 않도록 실제 파일에 기록합니다.
+
+    Args:
+        bank_path: 문제 은행 CSV 경로
+        calibration: calibrate의 결과
+
+    Returns:
+        성공 여부
+    """
+    bank_path = os.path.realpath(bank_path)
+    bank = pd.read_csv(bank_path)
+    bank = bank.drop(columns=[c for c in CALIBRATION_COLUMNS if c in bank.columns])
+    merged = bank.merge(calibration, on="question", how="left")
+    matched = int(merged["calib_responses"].notna().sum())
+    logging.info(f"{bank_path}: {matched}/{len(bank)}개 문제 보정 결과 기록")
+    if not utils.safe_csv_update(merged, bank_path):
+        return False
+    # 매니페스트에 기록된 문제 은행이면 바뀐 내용으로 항목을 맞춤
+    dataset_manifest.record_file(bank_path, len(merged), list(merged.columns), create=False)
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """상호작용 로그로 문제 난이도를 보정해 문제 은행에 기록하는 CLI 진입점"""
+    parser = argparse.ArgumentParser(description="과거 제출 기록으로 문제별 난이도/변별도를 추정합니다.")
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH, help="상호작용 로그(JSON) 경로")
+    parser.add_argument("--bank", action="append", help="보정 결과를 기록할 문제 은행 CSV (반복 지정)")
+    parser.add_argument("--min-responses", type=int, default=3, help="IRT 추정치를 기록할 최소 응답 수")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    responses = load_responses(args.log)
+    print(f"응답 {len(responses)}개, 제출 {responses['submission'].nunique()}개, "
+          f"문제 {responses['question'].nunique()}개")
+
+    calibration = calibrate(responses, args.min_responses)
+    ok = True
+    for bank_path in args.bank or [os.path.join("data", "quiz_data.csv")]:
+        ok = write_calibration(bank_path, calibration) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
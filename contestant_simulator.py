@@ -0,0 +1,439 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from quiz_manager import QuizManager
+from scoring import Scorer
+from leaderboard_manager import LeaderboardManager
+from logger import QuizLogger
+from quiz_runner import QuizRunner
+from token_usage import UsageTracker
+
+# 난이도별 기본 정답률 (참가자 실력 배율을 곱해 사용)
+DEFAULT_LEVEL_ACCURACY = {"easy": 0.95, "medium": 0.85, "hard": 0.7, "very hard": 0.55, "super hard": 0.4}
+# 응답하지 않는(타임아웃) 요청이 기다리는 시간(초). 채점 쪽 타임아웃보다 길어야 함
+HANG_SECONDS = 60.0
+# 잘못된 형식의 응답 예시 (answer 필드 없음, 문자열이 아님, JSON 아님)
+MALFORMED_BODIES = [b'{"result": "?"}', b'{"answer": 42}', b"not json"]
+
+_STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class ContestantProfile(NamedTuple):
+    """가짜 참가자 한 명의 행동 설정"""
+    name: str
+    accuracy: Dict[str, float]   # 난이도별 정답률
+    latency_median: float        # 응답 지연 중앙값(초, 로그정규)
+    latency_sigma: float
+    timeout_rate: float          # 응답하지 않는 비율
+    malformed_rate: float        # 잘못된 형식으로 응답하는 비율
+    error_rate: float            # 500 오류 비율
+
+
+def make_profiles(count: int, seed: int = 0, skill_range: Tuple[float, float] = (0.6, 1.1),
+                  latency_median: float = 0.05, latency_sigma: float = 0.5,
+                  timeout_rate: float = 0.0, malformed_rate: float = 0.0, error_rate: float = 0.0,
+                  level_accuracy: Optional[Dict[str, float]] = None) -> List[ContestantProfile]:
+    """
+    참가자 설정 목록을 만듭니다.
+
+    참가자마다 실력 배율(skill_range 안의 값)을 정해 난이도별 기본 정답률에 곱하고,
+    지연 시간 중앙값도 참가자마다 0.5~1.5배로 다르게 합니다.
+
+    Args:
+        count: 참가자 수
+        seed: 난수 시드
+        skill_range: 실력 배율 범위
+        latency_median: 지연 시간 중앙값 기준(초)
+        latency_sigma: 로그정규 지연 시간의 sigma
+        timeout_rate: 응답하지 않는 비율 (요청마다)
+        malformed_rate: 잘못된 형식으로 응답하는 비율 (요청마다)
+        error_rate: 500 오류 비율 (요청마다)
+        level_accuracy: 난이도별 기본 정답률 (없으면 DEFAULT_LEVEL_ACCURACY)
+
+    Returns:
+        참가자 설정 목록
+    """
+    rng = random.Random(seed)
+    base = level_accuracy or DEFAULT_LEVEL_ACCURACY
+    profiles = []
+    for i in range(count):
+        skill = rng.uniform(*skill_range)
+        profiles.append(ContestantProfile(
+            name=f"sim-{i:04d}",
+            accuracy={level: min(1.0, max(0.0, rate * skill)) for level, rate in base.items()},
+            latency_median=latency_median * rng.uniform(0.5, 1.5),
+            latency_sigma=latency_sigma,
+            timeout_rate=timeout_rate,
+            malformed_rate=malformed_rate,
+            error_rate=error_rate,
+        ))
+    return profiles
+
+
+class ContestantFleet:
+    """
+    여러 가짜 참가자 API를 한 프로세스에서 제공하는 asyncio HTTP 서버
+
+    참가자 i의 엔드포인트는 POST /contestants/{i}/answer 이며, 응답 내용과 지연 시간은
+    seed, 참가자, 질문, 같은 질문을 받은 횟수로 정해집니다.
+    """
+
+    def __init__(self, profiles: Sequence[ContestantProfile], answer_key: Dict[str, str], seed: int = 0,
+                 hang_seconds: float = HANG_SECONDS):
+        """
+        참가자 서버를 초기화합니다.
+
+        Args:
+            profiles: 참가자 설정 목록
+            answer_key: 질문 -> 정답
+            seed: 난수 시드
+            hang_seconds: 응답하지 않는 요청이 기다리는 시간(초)
+        """
+        self.profiles = list(profiles)
+        self.answer_key = answer_key
+        self._answers = sorted(set(answer_key.values()))
+        self.seed = seed
+        self.hang_seconds = hang_seconds
+        self.host = "127.0.0.1"
+        self.port = 0
+        self._seen: Dict[Tuple[int, str], int] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.counts = {"requests": 0, "correct": 0, "wrong": 0, "timeouts": 0, "malformed": 0, "errors": 0}
+
+    def endpoint(self, index: int) -> str:
+        """참가자 index의 API 엔드포인트 URL"""
+        return f"http://{self.host}:{self.port}/contestants/{index}/answer"
+
+    # ---------- 응답 규칙 ----------
+
+    def respond(self, index: int, request: Dict[str, Any]) -> Tuple[str, float, int, bytes]:
+        """
+        참가자 index가 질문에 어떻게 응답할지 정합니다.
+
+        Returns:
+            (결과 종류, 지연 시간(초), 상태 코드, 응답 본문) 튜플
+        """
+        profile = self.profiles[index]
+        question = str(request.get("question", ""))
+        key = (index, question)
+        occurrence = self._seen.get(key, 0)
+        self._seen[key] = occurrence + 1
+        digest = hashlib.sha256(f"{self.seed}:{index}:{question}:{occurrence}".encode("utf-8")).hexdigest()
+        rng = random.Random(digest)
+
+        latency = profile.latency_median * rng.lognormvariate(0.0, profile.latency_sigma)
+        draw = rng.random()
+        if draw < profile.timeout_rate:
+            return "timeouts", self.hang_seconds, 200, b'{"answer": ""}'
+        draw -= profile.timeout_rate
+        if draw < profile.error_rate:
+            return "errors", latency, 500, b'{"detail": "simulated error"}'
+        draw -= profile.error_rate
+        if draw < profile.malformed_rate:
+            return "malformed", latency, 200, rng.choice(MALFORMED_BODIES)
+
+        correct = self.answer_key.get(question, "")
+        level = str(request.get("difficulty", ""))
+        if rng.random() < profile.accuracy.get(level, 0.5) or not self._answers:
+            kind, answer = "correct", correct
+        else:
+            kind, answer = "wrong", rng.choice(self._answers)
+            if answer == correct:
+                answer = "모름"
+        return kind, latency, 200, json.dumps({"answer": answer}, ensure_ascii=False).encode("utf-8")
+
+    # ---------- HTTP ----------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """연결 하나에서 들어오는 요청을 처리합니다 (keep-alive 지원)."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, path = (lines[0].split(" ") + ["", ""])[:2]
+                headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+                body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+
+                status, payload, delay = 404, b'{"detail": "not found"}', 0.0
+                parts = path.strip("/").split("/")
+                if method == "POST" and len(parts) == 3 and parts[0] == "contestants" and parts[2] == "answer" \
+                        and parts[1].isdigit() and int(parts[1]) < len(self.profiles):
+                    try:
+                        request = json.loads(body)
+                    except ValueError:
+                        status, payload = 400, b'{"detail": "invalid json"}'
+                    else:
+                        kind, delay, status, payload = self.respond(int(parts[1]), request)
+                        self.counts["requests"] += 1
+                        self.counts[kind] += 1
+                if delay:
+                    await asyncio.sleep(delay)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            writer.close()
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """별도 스레드의 이벤트 루프에서 서버를 시작합니다 (port가 0이면 빈 포트 사용)."""
+        ready = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, host, port, backlog=4096)
+            )
+            self.host, self.port = host, self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self) -> None:
+        """서버를 멈춥니다."""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+class ExactMatchJudgeScorer(Scorer):
+    """LLM 채점 대신 Exact Match 결과를 그대로 쓰는 채점기 (LLM/스텁 서버 없이 부하 테스트할 때)"""
+
+    def llm_judge_score(self, user_answer: str, correct_answer: str, question: str,
+                        usage: Optional[UsageTracker] = None) -> Tuple[float, str]:
+        is_correct = self.exact_match_score(user_answer, correct_answer)
+        return (1.0 if is_correct else 0.0), ("CORRECT" if is_correct else "INCORRECT")
+
+
+class TimedProxy:
+    """객체의 메서드 호출 시간을 메서드별로 모으는 프록시 (저장소 경합 측정용)"""
+
+    def __init__(self, target: Any):
+        self._target = target
+        self._lock = threading.Lock()
+        self.timings: Dict[str, List[float]] = {}
+        # False를 반환한 호출 수 (리더보드 갱신이 락 재시도 끝에 실패한 경우)
+        self.failures: Dict[str, int] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            try:
+                result = attr(*args, **kwargs)
+                return result
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.timings.setdefault(name, []).append(elapsed)
+                    if result is False:
+                        self.failures[name] = self.failures.get(name, 0) + 1
+        return timed
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """메서드별 호출 수, 실패(False 반환) 수, 합계/평균/p95/최대 시간(초)"""
+        with self._lock:
+            return {name: {**_describe(values), "failed": self.failures.get(name, 0)}
+                    for name, values in sorted(self.timings.items())}
+
+
+def _describe(values: Sequence[float]) -> Dict[str, float]:
+    """호출 수와 합계/평균/p50/p95/최대 (초)"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"count": len(ordered), "total": round(sum(ordered), 3), "mean": round(sum(ordered) / len(ordered), 4),
+            "p50": round(pick(0.5), 4), "p95": round(pick(0.95), 4), "max": round(ordered[-1], 4)}
+
+
+def run_load_test(count: int, quiz_path: str, work_dir: str, profiles: Optional[List[ContestantProfile]] = None,
+                  seed: int = 0, questions: int = 0, adaptive: bool = False, timeout: int = 30,
+                  use_llm_judge: bool = False) -> Dict[str, Any]:
+    """
+    가짜 참가자 count명을 동시에 리더보드에 제출하고 끝날 때까지의 처리량/대기/저장소 경합을 측정합니다.
+
+    리더보드 CSV와 로그는 work_dir 아래에 새로 만들어 실제 데이터를 건드리지 않습니다.
+
+    Args:
+        count: 동시 제출 수
+        quiz_path: 퀴즈 CSV 경로
+        work_dir: 리더보드/로그를 둘 디렉토리 (실행 전에 비움)
+        profiles: 참가자 설정 (없으면 make_profiles(count, seed))
+        seed: 난수 시드
+        questions: 출제할 문제 수 (0이면 전체)
+        adaptive: 적응형 평가 여부
+        timeout: 문제 하나당 API 요청 타임아웃(초)
+        use_llm_judge: True면 Scorer의 LLM 채점 사용 (QUIZ_JUDGE_BASE_URL로 스텁 서버 지정)
+
+    Returns:
+        측정 결과 딕셔너리
+    """
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    quiz_df = pd.read_csv(quiz_path)
+    if questions:
+        quiz_df = quiz_df.head(questions)
+    run_quiz_path = os.path.join(work_dir, "quiz.csv")
+    quiz_df.to_csv(run_quiz_path, index=False)
+
+    profiles = profiles or make_profiles(count, seed)
+    fleet = ContestantFleet(profiles[:count], dict(zip(quiz_df["question"], quiz_df["answer"].astype(str))), seed,
+                            hang_seconds=timeout + 5)
+    fleet.start()
+
+    leaderboard_manager = TimedProxy(LeaderboardManager(os.path.join(work_dir, "leaderboard.csv")))
+    quiz_logger = TimedProxy(QuizLogger(os.path.join(work_dir, "logs")))
+    # 문제마다 찍히는 콘솔 로그가 측정을 방해하지 않도록 경고 이상만 출력
+    quiz_logger.logger.setLevel(logging.WARNING)
+    scorer = Scorer() if use_llm_judge else ExactMatchJudgeScorer()
+    runner = QuizRunner(QuizManager(run_quiz_path), leaderboard_manager, scorer, quiz_logger, timeout=timeout)
+
+    durations: List[float] = [0.0] * count
+    submit_delays: List[float] = [0.0] * count
+    threads = []
+    started = time.perf_counter()
+    try:
+        # 앱의 제출 흐름과 같이 제출 기록 추가 후 백그라운드 스레드에서 채점
+        for i in range(count):
+            name, endpoint = profiles[i].name, fleet.endpoint(i)
+            leaderboard_manager.add_new_submission(name, endpoint)
+            submit_delays[i] = time.perf_counter() - started
+
+            def work(i=i, name=name, endpoint=endpoint):
+                begin = time.perf_counter()
+                runner.process_quiz(name, endpoint, adaptive)
+                durations[i] = time.perf_counter() - begin
+
+            thread = threading.Thread(target=work, daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+    finally:
+        fleet.stop()
+
+    board = LeaderboardManager(os.path.join(work_dir, "leaderboard.csv")).get_leaderboard()
+    status_counts = board["status"].value_counts().to_dict() if not board.empty else {}
+    answered = fleet.counts["requests"]
+    return {
+        "submissions": count,
+        "questions": len(quiz_df),
+        "wall_seconds": round(wall, 3),
+        "status": status_counts,
+        "requests": dict(fleet.counts),
+        "questions_per_second": round(answered / wall, 1) if wall else 0.0,
+        "submission_seconds": _describe(durations),
+        "submit_queue_seconds": _describe(submit_delays),
+        "leaderboard_calls": leaderboard_manager.summary(),
+        "logger_calls": quiz_logger.summary(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="가짜 참가자 API 서버와 동시 제출 부하 테스트")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_profile_args(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--skill", type=float, nargs=2, default=(0.6, 1.1), metavar=("MIN", "MAX"),
+                       help="참가자 실력 배율 범위 (난이도별 기본 정답률에 곱함)")
+        p.add_argument("--latency-median", type=float, default=0.05, help="응답 지연 중앙값(초)")
+        p.add_argument("--latency-sigma", type=float, default=0.5, help="로그정규 지연 시간의 sigma")
+        p.add_argument("--timeout-rate", type=float, default=0.0, help="응답하지 않는 요청 비율")
+        p.add_argument("--malformed-rate", type=float, default=0.0, help="잘못된 형식 응답 비율")
+        p.add_argument("--error-rate", type=float, default=0.0, help="500 오류 비율")
+        p.add_argument("--quiz", default=os.path.join("data", "sorted_quiz_data.csv"), help="퀴즈 CSV 경로")
+
+    serve_parser = subparsers.add_parser("serve", help="가짜 참가자 API 서버만 실행")
+    serve_parser.add_argument("-n", "--contestants", type=int, default=10)
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8700)
+    add_profile_args(serve_parser)
+
+    run_parser = subparsers.add_parser("run", help="동시 제출 부하 테스트 실행")
+    run_parser.add_argument("-n", "--contestants", type=int, nargs="+", default=[10, 100, 1000],
+                            help="동시 제출 수 (여러 개면 차례로 실행)")
+    run_parser.add_argument("-q", "--questions", type=int, default=0, help="출제할 문제 수 (0이면 전체)")
+    run_parser.add_argument("--adaptive", action="store_true", help="적응형 평가로 실행")
+    run_parser.add_argument("--timeout", type=int, default=30, help="문제 하나당 API 요청 타임아웃(초)")
+    run_parser.add_argument("--llm-judge", action="store_true",
+                            help="LLM 채점 사용 (QUIZ_JUDGE_BASE_URL로 llm_stub_server.py 주소 지정)")
+    run_parser.add_argument("--work-dir", default=os.path.join("logs", "simulation"), help="리더보드/로그 작업 디렉토리")
+    run_parser.add_argument("-o", "--output", help="결과 JSON 저장 경로")
+    add_profile_args(run_parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sizes = args.contestants if args.command == "run" else [args.contestants]
+    profiles = make_profiles(max(sizes), args.seed, tuple(args.skill), args.latency_median, args.latency_sigma,
+                             args.timeout_rate, args.malformed_rate, args.error_rate)
+
+    if args.command == "serve":
+        quiz_df = pd.read_csv(args.quiz)
+        fleet = ContestantFleet(profiles, dict(zip(quiz_df["question"], quiz_df["answer"].astype(str))), args.seed)
+        fleet.start(args.host, args.port)
+        print(f"참가자 {len(profiles)}명: {fleet.endpoint(0)} ~ {fleet.endpoint(len(profiles) - 1)}")
+        try:
+            while True:
+                time.sleep(5)
+                print(fleet.counts)
+        except KeyboardInterrupt:
+            fleet.stop()
+        return
+
+    results = []
+    for size in sizes:
+        result = run_load_test(size, args.quiz, os.path.join(args.work_dir, f"n{size}"), profiles, args.seed,
+                               args.questions, args.adaptive, args.timeout, args.llm_judge)
+        results.append(result)
+        board = result["leaderboard_calls"]
+        print(f"[동시 제출 {size}] {result['wall_seconds']}초, 질문 {result['questions_per_second']}개/초, "
+              f"상태 {result['status']}, 제출별 소요 p50 {result['submission_seconds'].get('p50')}초 "
+              f"p95 {result['submission_seconds'].get('p95')}초, "
+              f"리더보드 갱신 p95 {board.get('update_question_progress', {}).get('p95')}초 "
+              f"(실패 {sum(call.get('failed', 0) for call in board.values())}회), "
+              f"로그 기록 p95 {result['logger_calls'].get('log_question_response', {}).get('p95')}초")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# 데이터 파일과 같은 디렉토리에 두는 매니페스트 파일 이름
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용의 sha256 해시를 청크 단위로 계산합니다."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path(directory: str) -> str:
+    return os.path.join(directory, MANIFEST_NAME)
+
+
+def load_manifest(directory: str) -> Dict[str, Any]:
+    """
+    디렉토리의 매니페스트를 읽습니다.
+
+    Returns:
+        매니페스트 딕셔너리 (없거나 읽을 수 없으면 빈 매니페스트)
+    """
+    try:
+        with open(manifest_path(directory), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        manifest = {}
+    manifest.setdefault("format_version", MANIFEST_FORMAT_VERSION)
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def save_manifest(directory: str, manifest: Dict[str, Any]) -> None:
+    """매니페스트를 임시 파일에 쓴 뒤 교체해, 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 합니다."""
+    manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    path = manifest_path(directory)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def file_entry(path: str, rows: int, columns: List[str], sha256: Optional[str] = None,
+               **extra: Any) -> Dict[str, Any]:
+    """
+    데이터 파일 하나의 매니페스트 항목을 만듭니다.
+
+    Args:
+        path: 데이터 파일 경로
+        rows: 데이터 행 수 (머리글 제외)
+        columns: 컬럼 이름 목록
+        sha256: 이미 계산한 해시 (없으면 파일을 읽어 계산)
+        extra: 함께 기록할 값 (예: 원본 분할 이름)
+    """
+    return {
+        "rows": int(rows),
+        "columns": list(columns),
+        "bytes": os.path.getsize(path),
+        "sha256": sha256 or file_digest(path),
+        **extra,
+    }
+
+
+def record_file(path: str, rows: int, columns: List[str], create: bool = True, **extra: Any) -> bool:
+    """
+    데이터 파일을 같은 디렉토리의 매니페스트에 기록합니다.
+
+    심볼릭 링크(예: data/quiz_data.csv)는 실제 파일 기준으로, 실제 파일이 있는 디렉토리의 매니페스트에 기록합니다.
+
+    Args:
+        path: 데이터 파일 경로
+        rows: 데이터 행 수
+        columns: 컬럼 이름 목록
+        create: False면 매니페스트에 이미 있는 파일만 갱신 (파일을 고쳐 쓴 도구가 기존 항목을 맞출 때)
+        extra: 함께 기록할 값
+
+    Returns:
+        기록했으면 True
+    """
+    directory, name = os.path.split(os.path.realpath(path))
+    manifest = load_manifest(directory)
+    if not create and name not in manifest["files"]:
+        return False
+    manifest["files"][name] = file_entry(path, rows, columns, **extra)
+    save_manifest(directory, manifest)
+    return True
+
+
+def verify_file(path: str, rows: Optional[int] = None, full: bool = False) -> Optional[str]:
+    """
+    데이터 파일이 매니페스트에 기록된 내용과 같은지 확인합니다.
+
+    기본 확인은 파일 크기(stat 한 번)와, rows를 주면 행 수 비교이므로 로드할 때마다 해도 부담이 없습니다.
+    full이면 sha256 해시까지 비교합니다. 매니페스트나 항목이 없으면 확인할 것이 없으므로 통과입니다.
+    심볼릭 링크는 실제 파일이 있는 디렉토리의 매니페스트로 확인합니다.
+
+    Args:
+        path: 데이터 파일 경로
+        rows: 읽어 들인 행 수
+        full: 해시까지 비교할지 여부
+
+    Returns:
+        문제가 없으면 None, 다르면 차이를 설명하는 문자열
+    """
+    directory, name = os.path.split(os.path.realpath(path))
+    if not os.path.exists(manifest_path(directory)):
+        return None
+    entry = load_manifest(directory)["files"].get(name)
+    if entry is None:
+        return None
+    size = os.path.getsize(path)
+    if size != entry.get("bytes"):
+        return f"파일 크기가 매니페스트와 다릅니다 ({size} != {entry.get('bytes')} bytes)"
+    if rows is not None and rows != entry.get("rows"):
+        return f"행 수가 매니페스트와 다릅니다 ({rows} != {entry.get('rows')})"
+    if full and file_digest(path) != entry.get("sha256"):
+        return "sha256 해시가 매니페스트와 다릅니다"
+    return None
@@ -0,0 +1,497 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+GAZETTEER_FORMAT_VERSION = 1
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "entity_gazetteer.json")
+
+_NON_WORD = re.compile(r"[\W_]+")
+_HANJA = re.compile(r"[一-鿿]")
+
+# 원문(三國志演義)의 인물 소개: "姓劉，名備，字玄德" / "曹仁字子孝" / "其姪荀攸，字公達"
+# 자를 바꾼 경우("字壽長，後改雲長")는 바꾼 자를 사용
+_ZH_FULL_RECORD = re.compile(r"姓([一-鿿]{1,2})，?名([一-鿿]{1,2})，?字([一-鿿]{2})(?:，?後改([一-鿿]{2}))?")
+_ZH_SHORT_RECORD = re.compile(r"([一-鿿]{2,3})，?字([一-鿿]{2})(?:，?後改([一-鿿]{2}))?")
+# 번역본의 인물 소개: "성은 노, 이름은 숙, 자는 자경" / "손소의 자는 공례"
+_KO_FULL_RECORD = re.compile(r"성은 ([가-힣]{1,2}), 이름은 ([가-힣]{1,2}), 자는 ([가-힣]{2})(?![가-힣])")
+_KO_SHORT_RECORD = re.compile(r"([가-힣]{2,3})의 자는 ([가-힣]{2})(?=[(이였로으며,. ])")
+# 번역본의 한자 병기: "서성(徐盛)"
+_KO_ANNOTATION = re.compile(r"([가-힣]{2,4})\(([一-鿿]{2,4})\)")
+_NON_HANJA = re.compile(r"[^一-鿿]")
+# 두 글자 성씨 (이름 뒤에 붙는 글자와 구별하기 위해 사용)
+_DOUBLE_SURNAMES = {"諸葛", "夏侯", "司馬", "公孫", "太史", "皇甫", "歐陽", "令狐", "淳于", "東方", "尉遲", "上官"}
+# 인물 소개가 없는 인물도 찾기 위한 삼국지 주요 성씨
+_COMMON_SURNAMES = set(
+    "劉關張趙馬黃魏曹孫袁呂董陸鍾姜周魯龐徐許荀郭賈程甘李王陳楊蔣費鄧韓丁于樂蔡蒯法孟糜簡伊秦吳朱潘凌何華"
+    "禰田高顏閻嚴胡虞步闞薛滿毛崔臧牛傅郝霍廖宗向譙羅范杜辛審逢沮盧孔左管樊桓邢應武全留羊鄒衛雷戴焦穆種耿"
+    "江柳任尹邵石卞唐宋侯文典祝沙邊喬鮑韋蘇曾成陶"
+)
+# 한자 읽기 표와 다르게 읽는 성씨 (樂進 → 악진)
+_SURNAME_READINGS = {"樂": "악", "單": "선", "種": "충"}
+# 인물 소개가 없는 이름 후보가 인물로 쓰였다고 볼 원문 문맥 ("張郃曰", "斬蔡陽")
+# 한글로 읽으면 번역본에도 흔한 일반 낱말(軍士 → 군사, 江東 → 강동)을 걸러내기 위해 사용
+_PERSON_BEFORE = ("斬", "大將", "部將", "副將", "遣", "擒", "差")
+_PERSON_AFTER = ("曰", "大怒", "大喜", "大驚", "出馬", "拍馬", "挺槍", "縱馬", "舞刀", "領命", "引兵", "領兵", "引軍")
+# 번역본에서 인물로 쓰였다고 볼 이름 뒤 표현 ("황호에게", "장각이 말하기를")
+_KO_PERSON = re.compile(r"(?<![가-힣])([가-힣]{2,3}?)(?:에게|장군|[이가은는] (?:말하|대답|크게|웃|물었))")
+# 이름(성 뒤)에 쓰이지 않는 글자: 허사가 붙어 잡힌 후보("許之", "趙子")와 일반 낱말(魏軍, 袁氏)을 제외
+_NON_NAME_CHARS = set("曰怒笑謂問答之為事於而也其乃子王皇軍兵士氏將營寨城州郡縣東官門巾右外略聲某故")
+# 성씨로 시작하고 인물 문맥에도 나오지만 인물이 아닌 낱말 (지명, 관직, 관용구, "關、張引兵"처럼 이름 사이에 걸친 것)
+_NOT_NAMES = {"關中", "許昌", "吳境", "文武", "武衛", "宗正", "典領", "武安", "馬報", "張筵", "張引", "何安", "何顏",
+              "羊群", "成河", "王受"}
+# 한 글자 이름에 쓰이지 않는 칭호 글자 ("主公", "魏公", "吳侯"; 3글자인 龐德公은 인정)
+_TITLE_CHARS = set("公主侯")
+# 이름 후보로 인정할 최소 등장 횟수 (원문, 번역본 각각)
+MIN_MENTIONS = 3
+# 같은 한글 이름의 인물이 여럿이면, 가장 많이 나오는 인물의 이 비율보다 적게 나오는 인물은 제외
+# (劉備/劉泌처럼 드문 동음이인 때문에 "유비"가 한 인물로 정해지지 않는 것을 막음)
+HOMOGRAPH_MIN_SHARE = 0.25
+
+# 이름 사전을 채점에 쓰기 전에 확인하는 주요 인물 표기: (답변, 기준 답, 같은 인물 여부)
+SPOT_CHECKS: Tuple[Tuple[str, str, bool], ...] = (
+    ("劉備", "유비", True), ("현덕", "유비", True), ("유현덕", "유비", True),
+    ("關羽", "관우", True), ("운장", "관우", True), ("수장", "관우", False),
+    ("張飛", "장비", True), ("익덕", "장비", True),
+    ("曹操", "조조", True), ("맹덕", "조조", True),
+    ("諸葛亮", "제갈량", True), ("공명", "제갈량", True), ("孔明", "제갈량", True),
+    ("趙雲", "조운", True), ("자룡", "조운", True),
+    ("孫權", "손권", True), ("周瑜", "주유", True), ("공근", "주유", True),
+    ("呂布", "여포", True), ("봉선", "여포", True),
+    ("司馬懿", "사마의", True), ("중달", "사마의", True),
+    ("姜維", "강유", True), ("백약", "강유", True),
+    ("魯肅", "노숙", True), ("자경", "노숙", True), ("중영", "동탁", True),
+    ("馬超", "마초", True), ("黃忠", "황충", True), ("魏延", "위연", True), ("陸遜", "육손", True),
+    ("袁紹", "원소", True), ("龐統", "방통", True), ("徐庶", "서서", True), ("夏侯惇", "하후돈", True),
+    ("공달", "순유", True), ("문약", "순욱", True), ("문약", "순유", False),
+    ("관우", "장비", False), ("유비", "조조", False), ("조비", "조조", False), ("강동", "손권", False),
+    # 인물이 아닌 낱말이 인물로 들어가면 한자/한글 표기만 같아도 정답이 됨
+    ("江東", "강동", False), ("軍師", "군사", False), ("高聲", "고성", False), ("關某", "관모", False),
+    ("關中", "관중", False), ("文武", "문무", False), ("何故", "하고", False), ("許昌", "허창", False),
+    ("武衛", "무위", False), ("宗正", "종정", False), ("典領", "전령", False),
+)
+
+
+def normalize_name(text: str) -> str:
+    """
+    이름 비교용으로 텍스트를 정규화합니다 (NFKC, 공백/문장 부호 제거, 소문자).
+
+    Args:
+        text: 이름 또는 답변 텍스트
+
+    Returns:
+        정규화된 텍스트
+    """
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", text or "")).lower()
+
+
+class EntityGazetteer:
+    """
+    삼국지 인물 이름 사전
+
+    인물마다 한글 이름, 한자 이름, 자(字)를 한글/한자로 가지고 있으며,
+    모든 표기를 정규화한 별칭 → 인물 번호 해시로 불러와 이름 표기를 O(1)로 찾습니다.
+    """
+
+    def __init__(self, entities: List[Dict[str, str]]):
+        """
+        이름 사전을 초기화합니다.
+
+        Args:
+            entities: {'name', 'hanja', 'courtesy', 'courtesy_hanja', 'aliases'} 딕셔너리 목록
+                (한글 이름 외에는 빈 값 가능, aliases는 "유현덕"/"劉玄德" 같은 [한글, 한자] 표기 목록)
+        """
+        self.entities = entities
+        aliases: Dict[str, set] = {}
+        # 한자 표기 → 같은 이름의 한글 표기
+        self._readings: Dict[str, str] = {}
+        for index, entity in enumerate(entities):
+            forms = [(entity.get("name", ""), entity.get("hanja", "")),
+                     (entity.get("courtesy", ""), entity.get("courtesy_hanja", ""))]
+            forms.extend(tuple(pair) for pair in entity.get("aliases", []))
+            for hangul, hanja_form in forms:
+                for alias in (hangul, hanja_form):
+                    if alias:
+                        aliases.setdefault(normalize_name(alias), set()).add(index)
+                if hangul and hanja_form:
+                    self._readings[normalize_name(hanja_form)] = hangul
+        self._aliases: Dict[str, FrozenSet[int]] = {alias: frozenset(ids) for alias, ids in aliases.items()}
+        self._max_alias_length = max((len(alias) for alias in self._aliases), default=0)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_GAZETTEER_PATH) -> "EntityGazetteer":
+        """
+        직렬화된 이름 사전을 불러옵니다.
+
+        Args:
+            path: 이름 사전 JSON 경로
+
+        Returns:
+            이름 사전
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != GAZETTEER_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 이름 사전 형식입니다: {data.get('format')}")
+        return cls(data["entities"])
+
+    def lookup(self, text: str) -> FrozenSet[int]:
+        """
+        텍스트 전체가 어떤 인물의 이름 표기인지 찾습니다.
+
+        Args:
+            text: 이름 텍스트
+
+        Returns:
+            해당하는 인물 번호 집합 (없으면 빈 집합, 같은 표기의 인물이 여럿이면 모두)
+        """
+        return self._aliases.get(normalize_name(text), frozenset())
+
+    def _mentions(self, normalized: str) -> Optional[List[Tuple[str, FrozenSet[int]]]]:
+        """정규화된 텍스트를 가장 긴 별칭부터 맞춰 나눕니다. 별칭으로 모두 덮을 수 없으면 None."""
+        mentions, position = [], 0
+        while position < len(normalized):
+            for length in range(min(self._max_alias_length, len(normalized) - position), 0, -1):
+                alias = normalized[position:position + length]
+                ids = self._aliases.get(alias)
+                if ids:
+                    mentions.append((alias, ids))
+                    position += length
+                    break
+            else:
+                return None
+        return mentions
+
+    def resolve(self, text: str) -> FrozenSet[int]:
+        """
+        답변이 가리키는 인물을 찾습니다.
+
+        "제갈량(諸葛亮)"처럼 같은 인물의 여러 표기를 이어 쓴 답변도 인식합니다.
+        텍스트에 이름이 아닌 부분이 있거나 서로 다른 인물이 섞여 있으면 빈 집합을 반환합니다.
+
+        Args:
+            text: 답변 텍스트
+
+        Returns:
+            해당하는 인물 번호 집합
+        """
+        normalized = normalize_name(text)
+        ids = self._aliases.get(normalized)
+        if ids is not None:
+            return ids
+        mentions = self._mentions(normalized) if normalized else None
+        if not mentions:
+            return frozenset()
+        common = frozenset.intersection(*(ids for _, ids in mentions))
+        return common
+
+    def same_entity(self, answer: str, reference: str) -> bool:
+        """
+        답변이 기준 답과 같은 인물을 가리키는지 확인합니다 (한자/한글, 이름/자 표기 차이 무시).
+
+        기준 답은 한 인물로만 해석되어야 합니다 (여러 인물의 자인 "공명" 같은 표기는 표기가 같을 때만 인정).
+
+        Args:
+            answer: 확인할 답변
+            reference: 기준 답 (정답)
+
+        Returns:
+            같은 인물이면 True
+        """
+        reference_ids = self.resolve(reference)
+        return len(reference_ids) == 1 and bool(reference_ids & self.resolve(answer))
+
+    def spot_check(self) -> List[Tuple[str, str, bool]]:
+        """
+        주요 인물 표기(SPOT_CHECKS)를 확인합니다.
+
+        Returns:
+            기대와 다르게 판정한 (답변, 기준 답, 기대 값) 목록 (비어 있으면 통과)
+        """
+        return [(answer, reference, expected) for answer, reference, expected in SPOT_CHECKS
+                if self.same_entity(answer, reference) != expected]
+
+    def to_hangul(self, text: str) -> Optional[str]:
+        """
+        이름만으로 이루어진 답변을 한글 표기로 바꿉니다.
+
+        "孔明" → "공명", "제갈량(諸葛亮)" → "제갈량"처럼 첫 번째 표기를 한글로 읽은 값을 반환합니다.
+        자(字)를 이름으로 바꾸지는 않습니다.
+
+        Args:
+            text: 답변 텍스트
+
+        Returns:
+            한글 표기 (이름만으로 이루어진 답변이 아니면 None)
+        """
+        normalized = normalize_name(text)
+        mentions = self._mentions(normalized) if normalized else None
+        if not mentions or not frozenset.intersection(*(ids for _, ids in mentions)):
+            return None
+        alias = mentions[0][0]
+        return self._readings.get(alias, alias) if _HANJA.search(alias) else alias
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """인물 수와 별칭 수"""
+        return {"entities": len(self.entities), "aliases": len(self._aliases)}
+
+
+# ---------- 이름 사전 생성 ----------
+
+def _read_chinese(path: str) -> str:
+    """원문을 읽어 줄바꿈과 들여쓰기를 없앱니다 (인물 소개가 줄 사이에 걸쳐 있는 경우가 많음)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return re.sub(r"[\s　]+", "", f.read())
+
+
+def _read_korean(corpus_dir: str) -> str:
+    texts = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+    return "\n".join(texts)
+
+
+def build_gazetteer(chinese_path: str, korean_dir: str, answer_paths: Sequence[str] = ()) -> Dict:
+    """
+    원문과 번역본에서 인물 이름 사전을 만듭니다.
+
+    원문의 인물 소개("姓劉，名備，字玄德", "曹仁字子孝")에서 한자 이름과 자를 뽑고, 인물 소개에 나온 성씨로
+    시작하는 자주 쓰인 2~3글자를 이름 후보로 더합니다. 한자는 한글로 읽어, 한글 이름이 번역본에도 자주 나오는
+    것만 남깁니다 (읽기가 틀렸거나 이름이 아닌 경우 대부분 제외). 인물 소개가 없는 후보는 원문이나 번역본에서 인물로
+    쓰인 문맥("張郃曰", "황호에게")이 있어야 하고, 같은 한글 이름의 드문 동음이인은 뺍니다.
+    번역본의 인물 소개("성은 노, 이름은 숙, 자는 자경")와 한자 병기("서성(徐盛)")로 빠진 표기를 채웁니다.
+    번역본에 없는 뒷부분(111회 이후) 인물은 퀴즈 CSV의 정답에 나오는 한글 이름으로 확인합니다.
+
+    한자 읽기에는 hanja 패키지가 필요합니다 (생성할 때만 사용).
+
+    Args:
+        chinese_path: 三國志演義 원문 경로 (pg23950.txt)
+        korean_dir: 번역본 장 텍스트 디렉토리 (jinho_3kingdoms)
+        answer_paths: 'answer' 컬럼을 가진 퀴즈 CSV 경로 목록
+
+    Returns:
+        직렬화할 이름 사전 딕셔너리
+    """
+    try:
+        import hanja
+    except ImportError as e:
+        raise RuntimeError("이름 사전을 만들려면 hanja 패키지가 필요합니다: pip install hanja") from e
+
+    def read(word: str) -> str:
+        reading = hanja.translate(word, "substitution")
+        # 성씨의 다른 읽기가 번역본에 나오면 그 읽기를 사용
+        alternate = _SURNAME_READINGS.get(word[0])
+        if alternate and len(word) >= 2 and korean_prefixes[alternate + reading[1:]] >= MIN_MENTIONS:
+            return alternate + reading[1:]
+        return reading
+
+    chinese = _read_chinese(chinese_path)
+    korean = _read_korean(korean_dir)
+    # 번역본 단어의 앞부분별 등장 횟수 (이름 뒤에 조사가 붙은 경우 포함)
+    korean_prefixes: Counter = Counter()
+    for word, count in Counter(re.findall(r"[가-힣]+", korean)).items():
+        for length in range(2, min(len(word), 5) + 1):
+            korean_prefixes[word[:length]] += count
+
+    answers = set()
+    for path in answer_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            answers.update(normalize_name(row.get("answer", "")) for row in csv.DictReader(f))
+
+    def in_korean(name: str) -> bool:
+        return korean_prefixes[name] >= MIN_MENTIONS or name in answers
+
+    # 원문 인물 소개 (한자 이름 → 자)
+    records: Dict[str, str] = {}
+    for surname, given, courtesy, renamed in _ZH_FULL_RECORD.findall(chinese):
+        records.setdefault(surname + given, renamed or courtesy)
+    # 성씨 후보: 원문 인물 소개("姓劉")의 성씨와 알려진 주요 성씨
+    double_surnames = set(_DOUBLE_SURNAMES)
+    single_surnames = {surname for surname, _, _, _ in _ZH_FULL_RECORD.findall(chinese)
+                       if surname not in double_surnames} | _COMMON_SURNAMES
+
+    def has_surname(hanja_name: str) -> bool:
+        return hanja_name[:2] in double_surnames or hanja_name[0] in single_surnames
+
+    for name, courtesy, renamed in _ZH_SHORT_RECORD.findall(chinese):
+        # "且說董卓字仲顈"처럼 앞 글자가 붙어 잡힌 경우, 번역본에 나오는 가장 긴 뒷부분을 이름으로 사용
+        for start in range(len(name) - 1):
+            if has_surname(name[start:]) and in_korean(read(name[start:])):
+                records.setdefault(name[start:], renamed or courtesy)
+                break
+
+    entities: Dict[str, Dict] = {}
+    for hanja_name, courtesy_hanja in records.items():
+        name = read(hanja_name)
+        if not in_korean(name):
+            continue
+        entities[hanja_name] = {"name": name, "hanja": hanja_name, "courtesy": read(courtesy_hanja),
+                                "courtesy_hanja": courtesy_hanja, "aliases": []}
+
+    # 인물로 쓰인 문맥의 등장 횟수 ("張郃曰"의 張郃, "斬蔡陽"의 蔡陽)
+    person_context: Counter = Counter()
+    for marker in _PERSON_AFTER:
+        for match in re.finditer(re.escape(marker), chinese):
+            for length in (2, 3):
+                person_context[chinese[max(0, match.start() - length):match.start()]] += 1
+    for marker in _PERSON_BEFORE:
+        for match in re.finditer(re.escape(marker), chinese):
+            for length in (2, 3):
+                person_context[chinese[match.end():match.end() + length]] += 1
+    annotated = {hanja_name for _, hanja_name in _KO_ANNOTATION.findall(korean)}
+    korean_context = Counter(_KO_PERSON.findall(korean))
+    # 이미 찾은 인물의 자와 "성 + 자" 표기 (孔明, 文長을 따로 인물로 두지 않음)
+    courtesy_forms = {entity["courtesy_hanja"] for entity in entities.values()}
+    courtesy_forms |= {(h[:2] if h[:2] in double_surnames else h[0]) + e["courtesy_hanja"] for h, e in entities.items()}
+
+    # 인물 소개가 없는 인물: 알려진 성씨로 시작하는 원문의 2~3글자 한자 중, 원문과 번역본에 모두 자주 나오고
+    # 원문이나 번역본에서 인물로 쓰였거나 번역본에 한자가 병기된 것
+    candidates: Counter = Counter()
+    for i in range(len(chinese) - 1):
+        surname = chinese[i:i + 2] if chinese[i:i + 2] in double_surnames else chinese[i]
+        if surname not in double_surnames and surname not in single_surnames:
+            continue
+        for length in (1, 2):
+            name = chinese[i:i + len(surname) + length]
+            if len(name) == len(surname) + length and not _NON_HANJA.search(name):
+                candidates[name] += 1
+    for hanja_name, count in candidates.items():
+        if (count < MIN_MENTIONS or hanja_name in entities or hanja_name in courtesy_forms
+                or hanja_name in _NOT_NAMES):
+            continue
+        given = hanja_name[2:] if hanja_name[:2] in double_surnames else hanja_name[1:]
+        # "徐徐"처럼 같은 글자가 겹친 낱말, 이름에 쓰이지 않는 글자나 칭호가 든 후보 제외
+        if given[0] == hanja_name[len(hanja_name) - len(given) - 1] or _NON_NAME_CHARS & set(given):
+            continue
+        if len(given) == 1 and given in _TITLE_CHARS:
+            continue
+        if not person_context[hanja_name] and hanja_name not in annotated and not korean_context[read(hanja_name)]:
+            continue
+        # "公孫恭"의 孫恭처럼 대부분 복성의 뒷부분으로 나오는 후보는 제외
+        if any(candidates[surname[0] + hanja_name] >= count * 0.8
+               for surname in double_surnames if surname[1] == hanja_name[0]):
+            continue
+        # "劉玄德"의 劉玄처럼 대부분 한 글자가 더 붙어 나오는 앞부분은 제외
+        if len(hanja_name) == 2 and any(candidates[hanja_name + chinese_char] >= count * 0.8
+                                        for chinese_char in set(re.findall(re.escape(hanja_name) + "([一-鿿])", chinese))):
+            continue
+        # "劉備軍"처럼 짧은 이름 뒤에 한 글자가 붙은 경우는 제외
+        if len(hanja_name) == 3 and hanja_name[:2] not in double_surnames and (
+                hanja_name[:2] in entities or candidates[hanja_name[:2]] >= count and in_korean(read(hanja_name[:2]))):
+            continue
+        name = read(hanja_name)
+        if in_korean(name):
+            entities[hanja_name] = {"name": name, "hanja": hanja_name, "courtesy": "",
+                                    "courtesy_hanja": "", "aliases": []}
+
+    # "성 + 자" 표기 (劉玄德/유현덕, 趙子龍/조자룡)는 따로 인물로 두지 않고 별칭으로 합침
+    for hanja_name, entity in list(entities.items()):
+        if not entity["courtesy_hanja"]:
+            continue
+        surname = hanja_name[:2] if hanja_name[:2] in double_surnames else hanja_name[0]
+        styled = surname + entity["courtesy_hanja"]
+        if styled in entities and not entities[styled]["courtesy"]:
+            del entities[styled]
+        if in_korean(read(styled)):
+            entity["aliases"].append([read(styled), styled])
+
+    # 같은 한글 이름의 드문 동음이인 제외 (등장 횟수가 가장 많은 인물의 HOMOGRAPH_MIN_SHARE 미만)
+    by_name: Dict[str, List[Dict]] = {}
+    for entity in entities.values():
+        by_name.setdefault(entity["name"], []).append(entity)
+    for name, group in by_name.items():
+        if len(group) == 1:
+            continue
+        mentions = {entity["hanja"]: chinese.count(entity["hanja"]) for entity in group}
+        top = max(mentions.values())
+        for entity in group:
+            if mentions[entity["hanja"]] < top * HOMOGRAPH_MIN_SHARE:
+                del entities[entity["hanja"]]
+        group[:] = [entity for entity in group if entity["hanja"] in entities]
+
+    # 번역본 인물 소개로 원문에서 찾지 못한 인물/자를 보충 (이름이 겹치지 않을 때만)
+    # 원문 자의 한자 읽기가 번역본에 없으면(仲顈 → 중경, 번역본은 중영) 번역본의 자를 사용
+    # 원문 인물 소개로 다른 인물의 자로 확인된 자는 쓰지 않음 (번역본 오역 "성은 순, 이름은 유, 자는 문약"의 문약은 荀彧의 자)
+    claimed = {entity["courtesy"]: entity["name"] for entity in entities.values() if entity["courtesy_hanja"]}
+    korean_records = [(surname + given, courtesy) for surname, given, courtesy in _KO_FULL_RECORD.findall(korean)]
+    korean_records += _KO_SHORT_RECORD.findall(korean)
+    for name, courtesy in korean_records:
+        if not in_korean(name) or claimed.get(courtesy, name) != name:
+            continue
+        known = by_name.get(name)
+        if known is None:
+            entity = {"name": name, "hanja": "", "courtesy": courtesy, "courtesy_hanja": "", "aliases": []}
+            entities[f"ko:{name}"] = entity
+            by_name[name] = [entity]
+        elif len(known) == 1 and (not known[0]["courtesy"] or not in_korean(known[0]["courtesy"])):
+            known[0]["courtesy"] = courtesy
+
+    # 번역본의 한자 병기로 한자 이름 보충
+    for name, hanja_name in _KO_ANNOTATION.findall(korean):
+        known = by_name.get(name)
+        if known is not None and len(known) == 1 and not known[0]["hanja"]:
+            known[0]["hanja"] = hanja_name
+
+    ordered = sorted(entities.values(), key=lambda e: (e["name"], e["hanja"]))
+    return {"format": GAZETTEER_FORMAT_VERSION, "entities": ordered}
+
+
+def write_gazetteer(path: str, data: Dict) -> None:
+    """
+    이름 사전을 JSON으로 저장합니다 (변경 내역을 보기 쉽도록 인물 하나당 한 줄).
+
+    Args:
+        path: 저장 경로
+        data: build_gazetteer() 결과
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    lines = [json.dumps(entity, ensure_ascii=False) for entity in data["entities"]]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'{{"format": {data["format"]}, "entities": [\n')
+        f.write(",\n".join(lines))
+        f.write("\n]}\n")
+
+
+def main() -> None:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    server_dir = os.path.join(base_dir, "3kingdoms_api_server")
+
+    parser = argparse.ArgumentParser(description="삼국지 인물 이름 사전 생성/조회")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="원문과 번역본에서 이름 사전 생성")
+    build_parser.add_argument("--chinese", default=os.path.join(server_dir, "pg23950.txt"), help="三國志演義 원문 경로")
+    build_parser.add_argument("--korean", default=os.path.join(server_dir, "jinho_3kingdoms"), help="번역본 장 디렉토리")
+    build_parser.add_argument("--answers", nargs="*",
+                              default=sorted(glob.glob(os.path.join(base_dir, "3qa_quiz_huggingface_manager", "*.csv"))),
+                              help="정답 확인에 사용할 퀴즈 CSV 목록")
+    build_parser.add_argument("-o", "--output", default=DEFAULT_GAZETTEER_PATH, help="이름 사전 저장 경로")
+    lookup_parser = sub.add_parser("lookup", help="이름 표기 조회")
+    lookup_parser.add_argument("names", nargs="+")
+    lookup_parser.add_argument("-g", "--gazetteer", default=DEFAULT_GAZETTEER_PATH, help="이름 사전 경로")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        data = build_gazetteer(args.chinese, args.korean, args.answers)
+        gazetteer = EntityGazetteer(data["entities"])
+        failures = gazetteer.spot_check()
+        if failures:
+            sys.exit(f"주요 인물 확인 실패로 저장하지 않습니다 (답변, 기준 답, 기대 값): {failures}")
+        write_gazetteer(args.output, data)
+        print(f"이름 사전 저장 완료: {args.output} ({gazetteer.stats})")
+    else:
+        gazetteer = EntityGazetteer.load(args.gazetteer)
+        for name in args.names:
+            ids = gazetteer.resolve(name)
+            print(f"{name}: 한글 표기 {gazetteer.to_hangul(name)}, 인물 {[gazetteer.entities[i] for i in sorted(ids)]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,34 @@
 import pandas as pd
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import logging
+import random
 import time
 import csv
 import fcntl
 
+from metrics import (LEADERBOARD_FAILURES, LEADERBOARD_RETRIES, LOCK_WAIT_SECONDS, LOCK_WAITERS,
+                     STAGE_SECONDS)
+
+# 리더보드 CSV 컬럼 (적응형 평가의 출제 문제 수와 신뢰구간, LLM 채점 토큰 사용량과 비용 포함)
+LEADERBOARD_COLUMNS = [
+    "name", "api_endpoint", "correct_answer_rate", 
+    "average_response_time", "submission_time", 
+    "completion_time", "current_question_index", 
+    "status", "llm_judge_result",
+    "questions_evaluated", "ci_lower", "ci_upper",
+    "judge_prompt_tokens", "judge_completion_tokens", "judge_cached_ratio", "judge_cost_usd"
+]
+
+# 다른 작업이 잡고 있는 파일 락을 기다리는 최대 시간(초)과 확인 간격(초)
+# 락을 못 잡은 시도를 재시도 횟수로 세면 동시에 쓰는 작업이 많을 때 0.5초 만에 포기해 갱신이 유실됨
+LOCK_TIMEOUT = float(os.getenv("QUIZ_LEADERBOARD_LOCK_TIMEOUT", "30"))
+LOCK_POLL_SECONDS = 0.01
+
+# 문자열을 기록하는 컬럼 (비어 있으면 float으로 읽혀 문자열을 넣을 수 없으므로 object로 읽음)
+TEXT_COLUMNS = ["name", "api_endpoint", "submission_time", "completion_time", "status", "llm_judge_result"]
+
 class LeaderboardManager:
     """리더보드 데이터를 관리하는 클래스"""
     
@@ -27,26 +49,23 @@ class LeaderboardManager:
         
         if not os.path.exists(self.leaderboard_path):
             # 명세서에 정의된 컬럼으로 빈 CSV 파일 생성
-            columns = [
-                "name", "api_endpoint", "correct_answer_rate", 
-                "average_response_time", "submission_time", 
-                "completion_time", "current_question_index", 
-                "status", "llm_judge_result"
-            ]
-            
-            df = pd.DataFrame(columns=columns)
+            df = pd.DataFrame(columns=LEADERBOARD_COLUMNS)
             df.to_csv(self.leaderboard_path, index=False)
             self.logger.info(f"새 리더보드 파일 생성: {self.leaderboard_path}")
     
     def _acquire_lock(self, file_obj):
-        """파일에 락을 설정합니다."""
-        try:
-            fcntl.flock(file_obj, fcntl.LOCK_EX | fcntl.LOCK_NB)
-            return True
-        except (IOError, OSError):
-            self.logger.warning("파일 락 획득 실패, 재시도 중...")
-            time.sleep(0.1)
-            return False
+        """파일에 락을 설정합니다. 다른 작업이 잡고 있으면 LOCK_TIMEOUT까지 기다립니다."""
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fcntl.flock(file_obj, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except (IOError, OSError):
+                if time.monotonic() >= deadline:
+                    self.logger.warning(f"파일 락 획득 실패 ({LOCK_TIMEOUT}초 대기), 재시도 중...")
+                    return False
+                # 여러 작업이 같은 간격으로 다시 시도하지 않도록 간격을 흔듦
+                time.sleep(LOCK_POLL_SECONDS * (0.5 + random.random()))
     
     def _release_lock(self, file_obj):
         """파일 락을 해제합니다."""
@@ -67,6 +86,10 @@ class LeaderboardManager:
         """
         max_retries = 5
         retry_count = 0
+        # 락 대기(재시도 포함) 시간과 대기 중인 작업 수를 지표로 기록
+        started = time.perf_counter()
+        LOCK_WAITERS.inc(lock="leaderboard")
+        waiting = True
         
         while retry_count < max_retries:
             try:
@@ -78,21 +101,29 @@ class LeaderboardManager:
                     # 락 획득 시도
                     if not self._acquire_lock(f):
                         retry_count += 1
+                        LEADERBOARD_RETRIES.inc()
                         continue
                     
                     try:
-                        # 현재 데이터 읽기
-                        df = pd.read_csv(self.leaderboard_path)
-                        
-                        # 업데이트 함수 실행
-                        updated_df = update_func(df)
-                        
-                        # 파일 처음으로 되돌리고 내용 지우기
-                        f.seek(0)
-                        f.truncate()
-                        
-                        # 업데이트된 데이터 쓰기
-                        updated_df.to_csv(f, index=False)
+                        if waiting:
+                            waiting = False
+                            LOCK_WAITERS.dec(lock="leaderboard")
+                            LOCK_WAIT_SECONDS.observe(time.perf_counter() - started, lock="leaderboard")
+
+                        with STAGE_SECONDS.time(stage="leaderboard_csv_rewrite"):
+                            # 현재 데이터 읽기
+                            df = pd.read_csv(self.leaderboard_path, dtype={c: object for c in TEXT_COLUMNS})
+                            
+                            # 업데이트 함수 실행
+                            updated_df = update_func(df)
+                            
+                            # 파일 처음으로 되돌리고 내용 지우기
+                            f.seek(0)
+                            f.truncate()
+                            
+                            # 업데이트된 데이터 쓰기 (락을 풀기 전에 디스크로 내보내야 다음 작업이 빈 파일을 읽지 않음)
+                            updated_df.to_csv(f, index=False)
+                            f.flush()
                         
                         return True
                     finally:
@@ -102,8 +133,13 @@ class LeaderboardManager:
             except (IOError, OSError, pd.errors.EmptyDataError) as e:
                 self.logger.error(f"CSV 업데이트 중 오류 발생: {e}")
                 retry_count += 1
+                LEADERBOARD_RETRIES.inc()
                 time.sleep(0.2)  # 재시도 전 잠시 대기
         
+        if waiting:
+            LOCK_WAITERS.dec(lock="leaderboard")
+            LOCK_WAIT_SECONDS.observe(time.perf_counter() - started, lock="leaderboard")
+        LEADERBOARD_FAILURES.inc()
         self.logger.error(f"최대 재시도 횟수({max_retries})를 초과했습니다.")
         return False
     
@@ -176,7 +212,7 @@ class LeaderboardManager:
     
     def update_completion(self, name: str, api_endpoint: str, 
                          correct_rate: float, avg_response_time: float,
-                         llm_result: str) -> bool:
+                         llm_result: str, extra: Optional[Dict[str, Any]] = None) -> bool:
         """
         채점 완료 후 결과를 업데이트합니다.
         
@@ -186,6 +222,7 @@ class LeaderboardManager:
             correct_rate: 정확도
             avg_response_time: 평균 응답 시간
             llm_result: LLM as judge 결과
+            extra: 함께 기록할 추가 컬럼 값 (예: questions_evaluated, ci_lower, ci_upper)
             
         Returns:
             업데이트 성공 여부
@@ -204,6 +241,8 @@ class LeaderboardManager:
                 df.loc[mask, 'completion_time'] = now
                 df.loc[mask, 'status'] = 'completed'
                 df.loc[mask, 'llm_judge_result'] = llm_result
+                for column, value in (extra or {}).items():
+                    df.loc[mask, column] = value
             else:
                 self.logger.warning(f"업데이트할 항목을 찾을 수 없음: {name}, {api_endpoint}")
             
@@ -244,6 +283,75 @@ class LeaderboardManager:
         
         return self._safe_update_csv(update_func)
     
+    def get_version(self) -> Tuple[int, int]:
+        """
+        리더보드 파일의 버전을 반환합니다. 파일 내용을 읽지 않고 stat 정보만 사용합니다.
+        
+        Returns:
+            (수정 시각(ns), 파일 크기) 튜플 (파일이 없으면 (0, 0))
+        """
+        try:
+            stat = os.stat(self.leaderboard_path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return 0, 0
+    
+    @staticmethod
+    def filter_completed(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        완료된 항목만 남깁니다.
+        
+        Args:
+            df: 리더보드 데이터프레임
+            
+        Returns:
+            status가 completed인 항목의 데이터프레임
+        """
+        return df[df["status"] == "completed"]
+    
+    @staticmethod
+    def best_per_name(df: pd.DataFrame, metric: str = "correct_answer_rate") -> pd.DataFrame:
+        """
+        이름별로 지정한 지표가 가장 높은 항목만 남깁니다.
+        
+        Args:
+            df: 리더보드 데이터프레임
+            metric: 비교할 지표 컬럼 (correct_answer_rate 또는 llm_judge_result)
+            
+        Returns:
+            이름별 최고 성능 항목의 데이터프레임
+        """
+        df = df.copy()
+        
+        # 수치형으로 변환
+        df["correct_answer_rate"] = pd.to_numeric(df["correct_answer_rate"], errors='coerce')
+        df["llm_judge_result"] = pd.to_numeric(df["llm_judge_result"], errors='coerce')
+        
+        scored = df.dropna(subset=[metric])
+        if scored.empty:
+            return scored
+        idx = scored.groupby('name')[metric].idxmax()
+        return scored.loc[idx]
+    
+    @staticmethod
+    def rank(df: pd.DataFrame, metric: str = "correct_answer_rate") -> pd.DataFrame:
+        """
+        지표가 높은 순(동점이면 평균 응답 시간이 짧은 순)으로 정렬하고 rank 컬럼을 붙입니다.
+        
+        Args:
+            df: 리더보드 데이터프레임
+            metric: 순위 기준 지표 컬럼
+            
+        Returns:
+            정렬된 데이터프레임
+        """
+        df = df.copy()
+        df[metric] = pd.to_numeric(df[metric], errors='coerce')
+        df["average_response_time"] = pd.to_numeric(df["average_response_time"], errors='coerce')
+        df = df.sort_values([metric, "average_response_time"], ascending=[False, True], na_position="last")
+        df.insert(0, "rank", range(1, len(df) + 1))
+        return df.reset_index(drop=True)
+    
     def get_leaderboard(self) -> pd.DataFrame:
         """
         현재 리더보드 데이터를 반환합니다.
@@ -255,16 +363,15 @@ class LeaderboardManager:
             # 파일이 없으면 생성
             self._ensure_leaderboard_exists()
             
-            # 데이터 읽기
-            df = pd.read_csv(self.leaderboard_path)
+            # 데이터 읽기 (공유 락으로 쓰기 도중의 파일을 읽지 않도록 함)
+            with open(self.leaderboard_path, 'r') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                try:
+                    df = pd.read_csv(f)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
             return df
         except Exception as e:
             self.logger.error(f"리더보드 데이터 로드 중 오류 발생: {e}")
             # 오류 발생 시 빈 데이터프레임 반환
-            columns = [
-                "name", "api_endpoint", "correct_answer_rate", 
-                "average_response_time", "submission_time", 
-                "completion_time", "current_question_index", 
-                "status", "llm_judge_result"
-            ]
-            return pd.DataFrame(columns=columns) 
\ No newline at end of file
+            return pd.DataFrame(columns=LEADERBOARD_COLUMNS) 
\ No newline at end of file
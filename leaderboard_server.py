@@ -0,0 +1,236 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from leaderboard_manager import LeaderboardManager
+
+# 경로별 스냅샷 종류
+VIEWS = {
+    "/leaderboard": "full",
+    "/leaderboard/ranked": "ranked",
+    "/leaderboard/best": "best",
+}
+
+# 순위/중복 제거 기준으로 허용하는 지표
+METRICS = ["correct_answer_rate", "llm_judge_result"]
+
+
+class Snapshot:
+    """미리 직렬화해 둔 JSON 응답 (원본, gzip 압축본, 표현별 ETag)"""
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        # 같은 내용이라도 gzip 본문은 바이트가 다르므로 ETag를 구분 ("abc" / "abc-gzip")
+        self.etag = f'"{etag}"'
+        self.gzip_etag = f'"{etag}-gzip"'
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Accept-Encoding 헤더가 gzip을 허용하는지 확인합니다 (q=0은 거부, gzip이 없으면 *를 따름).
+
+    Args:
+        accept_encoding: Accept-Encoding 헤더 값
+
+    Returns:
+        gzip 응답을 보내도 되면 True
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+class LeaderboardSnapshotCache:
+    """리더보드 파일이 바뀔 때만 JSON 스냅샷을 다시 만드는 클래스"""
+
+    def __init__(self, leaderboard_manager: LeaderboardManager, check_interval: float = 0.5):
+        """
+        스냅샷 캐시를 초기화합니다.
+
+        Args:
+            leaderboard_manager: 리더보드 관리자
+            check_interval: 파일 버전 확인 최소 간격(초). 이 간격 안의 요청은 stat 없이 현재 스냅샷을 사용
+        """
+        self.leaderboard_manager = leaderboard_manager
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._snapshots: Dict[Tuple[str, str], Snapshot] = {}
+
+    def _build(self, version: Tuple[int, int]) -> Dict[Tuple[str, str], Snapshot]:
+        """현재 리더보드로 모든 스냅샷을 만듭니다."""
+        df = self.leaderboard_manager.get_leaderboard()
+        completed = LeaderboardManager.filter_completed(df)
+        version_tag = f"{version[0]:x}-{version[1]:x}"
+        generated_at = datetime.now().isoformat(timespec="seconds")
+
+        frames = {("full", ""): df}
+        for metric in METRICS:
+            frames[("ranked", metric)] = LeaderboardManager.rank(completed, metric)
+            best = LeaderboardManager.best_per_name(completed, metric) if not completed.empty else completed
+            frames[("best", metric)] = LeaderboardManager.rank(best, metric)
+
+        snapshots = {}
+        for (view, metric), frame in frames.items():
+            payload = {
+                "version": version_tag,
+                "generated_at": generated_at,
+                "view": view,
+                "metric": metric or None,
+                "rows": json.loads(frame.to_json(orient="records", force_ascii=False)),
+            }
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            # ETag는 행 내용으로만 계산 (파일만 다시 저장되어 버전/생성 시각이 바뀌어도 같은 행이면 304 유지)
+            content = json.dumps([view, metric, payload["rows"]], ensure_ascii=False, separators=(",", ":"))
+            etag = hashlib.sha1(content.encode("utf-8")).hexdigest()[:20]
+            snapshots[(view, metric)] = Snapshot(body, etag)
+        return snapshots
+
+    def get(self, view: str, metric: str = "") -> Snapshot:
+        """
+        요청한 종류의 스냅샷을 반환합니다. 파일 버전이 바뀌었으면 먼저 다시 만듭니다.
+
+        Args:
+            view: 스냅샷 종류 (full, ranked, best)
+            metric: ranked/best의 기준 지표
+
+        Returns:
+            스냅샷
+        """
+        key = (view, "" if view == "full" else (metric or METRICS[0]))
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval or not self._snapshots:
+            with self._lock:
+                if now - self._checked_at >= self.check_interval or not self._snapshots:
+                    version = self.leaderboard_manager.get_version()
+                    if version != self._version or not self._snapshots:
+                        started = time.perf_counter()
+                        self._snapshots = self._build(version)
+                        self._version = version
+                        self.logger.info(f"리더보드 스냅샷 갱신: {version} ({time.perf_counter() - started:.3f}초)")
+                    self._checked_at = now
+        return self._snapshots[key]
+
+
+class LeaderboardRequestHandler(BaseHTTPRequestHandler):
+    """리더보드 스냅샷을 제공하는 읽기 전용 HTTP 핸들러"""
+
+    cache: LeaderboardSnapshotCache = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        view = VIEWS.get(url.path.rstrip("/") or "/")
+        if view is None:
+            self._send_json(404, {"error": "not found", "routes": list(VIEWS)})
+            return
+
+        metric = parse_qs(url.query).get("metric", [""])[0]
+        if metric and metric not in METRICS:
+            self._send_json(400, {"error": f"metric은 {METRICS} 중 하나여야 합니다"})
+            return
+
+        snapshot = self.cache.get(view, metric)
+        use_gzip = accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        etag = snapshot.gzip_etag if use_gzip else snapshot.etag
+
+        # 조건부 GET: 내용이 같으면 본문 없이 304 응답 (약한 비교라 W/ 접두어는 무시)
+        if_none_match = self.headers.get("If-None-Match", "")
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        body = snapshot.gzip_body if use_gzip else snapshot.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+
+def create_server(leaderboard_path: str, host: str = "0.0.0.0", port: int = 8502,
+                  check_interval: float = 0.5) -> ThreadingHTTPServer:
+    """
+    리더보드 스냅샷 서버를 생성합니다.
+
+    Args:
+        leaderboard_path: 리더보드 CSV 파일 경로
+        host: 바인딩 주소
+        port: 포트
+        check_interval: 파일 버전 확인 최소 간격(초)
+
+    Returns:
+        HTTP 서버 (serve_forever()로 실행)
+    """
+    cache = LeaderboardSnapshotCache(LeaderboardManager(leaderboard_path), check_interval)
+    handler = type("BoundLeaderboardRequestHandler", (LeaderboardRequestHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="리더보드 읽기 전용 JSON 스냅샷 서버")
+    parser.add_argument("--leaderboard", default=os.path.join("data", "leaderboard.csv"), help="리더보드 CSV 경로")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--check-interval", type=float, default=0.5, help="파일 변경 확인 최소 간격(초)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = create_server(args.leaderboard, args.host, args.port, args.check_interval)
+    logging.info(f"리더보드 스냅샷 서버 시작: http://{args.host}:{args.port}{list(VIEWS)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
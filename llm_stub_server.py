@@ -0,0 +1,374 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+# 채점(LLM as judge) 프롬프트에서 값을 꺼내는 패턴 (scoring.Scorer.llm_judge_score 형식)
+_JUDGE_FIELD = re.compile(r"^(QUESTION|STUDENT ANSWER|TRUE ANSWER):[ \t]*(.*)$", re.MULTILINE)
+# 답변 서버 배치 프롬프트의 번호 붙은 질문 ("[1] 질문: ...")
+_BATCH_ITEM = re.compile(r"^\[(\d+)\] ", re.MULTILINE)
+_QUESTION_PREFIX = "질문: "
+# 정답 비교 시 무시하는 문자 (공백, 문장 부호)
+_IGNORED = re.compile(r"[\s\.,!?'\"()\[\]{}·~\-]+")
+
+# 모르는 질문에 대한 답
+UNKNOWN_ANSWER = "모름"
+
+DEFAULT_ANSWER_FILES = [
+    os.path.join("3qa_quiz_huggingface_manager", f"{split}.csv")
+    for split in ("train", "validation", "test", "show")
+] + [os.path.join("data", "quiz_data.csv")]
+
+
+def _normalize(text: str) -> str:
+    """비교용으로 공백과 문장 부호를 지우고 소문자로 바꿉니다."""
+    return _IGNORED.sub("", text or "").lower()
+
+
+def _unit(*parts) -> float:
+    """주어진 값들로 정해지는 [0, 1) 사이의 수 (같은 입력이면 항상 같은 값)"""
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def load_answer_key(paths: Sequence[str]) -> Dict[str, str]:
+    """
+    question/answer 열이 있는 CSV 파일들에서 질문별 정답을 읽습니다.
+
+    Args:
+        paths: CSV 파일 경로 목록 (없는 파일은 건너뜀)
+
+    Returns:
+        정규화한 질문 -> 정답 딕셔너리
+    """
+    answer_key: Dict[str, str] = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                question, answer = row.get("question"), row.get("answer")
+                if question and answer:
+                    answer_key.setdefault(_normalize(question), answer.strip())
+    return answer_key
+
+
+class StubPolicy:
+    """
+    스텁 서버의 응답 내용, 지연 시간, 오류/속도 제한 응답을 정하는 규칙
+
+    응답 내용은 요청 내용만으로 정해지고, 지연 시간과 오류 여부는 seed, 요청 내용, 같은 요청이 들어온 횟수로 정해지므로
+    같은 요청 순서를 재생하면 같은 결과가 나옵니다 (재시도는 다른 결과를 받을 수 있음).
+    """
+
+    def __init__(self, answer_key: Optional[Dict[str, str]] = None, accuracy: float = 1.0,
+                 latency_median: float = 0.3, latency_sigma: float = 0.5, latency_max: float = 10.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, max_inflight: int = 0,
+                 retry_after: float = 1.0, seed: int = 0, cache_min_tokens: int = 1024):
+        """
+        응답 규칙을 초기화합니다.
+
+        Args:
+            answer_key: 정규화한 질문 -> 정답 (답변 요청에 사용)
+            accuracy: 정답을 아는 질문에 정답을 돌려주는 비율 (나머지는 다른 질문의 정답)
+            latency_median: 지연 시간 중앙값(초)
+            latency_sigma: 로그정규 분포의 sigma (0이면 항상 중앙값)
+            latency_max: 지연 시간 상한(초)
+            error_rate: 500 오류를 돌려주는 비율
+            rate_limit_rate: 429 속도 제한을 돌려주는 비율
+            max_inflight: 동시에 처리하는 최대 요청 수 (넘으면 429, 0이면 제한 없음)
+            retry_after: 429 응답의 Retry-After(초)
+            seed: 지연 시간/오류 결정용 시드
+            cache_min_tokens: 프롬프트 캐시를 적용하는 최소 앞부분 토큰 수 (0이면 캐시 흉내를 내지 않음)
+        """
+        self.answer_key = answer_key or {}
+        self._answers = sorted(set(self.answer_key.values()))
+        self.accuracy = accuracy
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.latency_max = latency_max
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_inflight = max_inflight
+        self.retry_after = retry_after
+        self.seed = seed
+        self.cache_min_tokens = cache_min_tokens
+        self._lock = threading.Lock()
+        self._prefixes: set = set()
+        self._seen: Dict[str, int] = {}
+        self._inflight = 0
+        self.counts = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "judge": 0, "answer": 0}
+
+    # ---------- 응답 내용 ----------
+
+    def grade(self, prompt: str) -> str:
+        """채점 프롬프트의 학생 답에 정답(공백/문장 부호 무시)이 들어 있으면 CORRECT, 아니면 INCORRECT"""
+        fields = {name: value for name, value in _JUDGE_FIELD.findall(prompt)}
+        student, truth = _normalize(fields.get("STUDENT ANSWER", "")), _normalize(fields.get("TRUE ANSWER", ""))
+        return "CORRECT" if truth and truth in student else "INCORRECT"
+
+    def answer(self, question: str) -> str:
+        """
+        질문에 대한 답을 정합니다.
+
+        정답을 아는 질문은 질문마다 정해진 확률(accuracy)로 정답을, 아니면 다른 질문의 정답을 돌려줍니다.
+        """
+        key = _normalize(question)
+        correct = self.answer_key.get(key)
+        if correct is None:
+            return UNKNOWN_ANSWER
+        if _unit(self.seed, "accuracy", key) < self.accuracy or len(self._answers) < 2:
+            return correct
+        wrong = self._answers[int(_unit(self.seed, "wrong", key) * len(self._answers))]
+        return wrong if wrong != correct else UNKNOWN_ANSWER
+
+    def complete(self, messages: List[Dict[str, str]]) -> Tuple[str, str]:
+        """
+        채팅 메시지에 대한 응답 텍스트를 만듭니다.
+
+        Returns:
+            (요청 종류, 응답 텍스트) 튜플. 종류는 judge 또는 answer
+        """
+        prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        if "STUDENT ANSWER:" in prompt and "TRUE ANSWER:" in prompt:
+            return "judge", self.grade(prompt)
+
+        # 답변 서버 배치 프롬프트: 번호마다 "번호. 답" 한 줄
+        items = _BATCH_ITEM.split(prompt)
+        if len(items) > 2:
+            lines = []
+            for number, body in zip(items[1::2], items[2::2]):
+                lines.append(f"{number}. {self.answer(body.rsplit(_QUESTION_PREFIX, 1)[-1].strip())}")
+            return "answer", "\n".join(lines)
+        return "answer", self.answer(prompt.rsplit(_QUESTION_PREFIX, 1)[-1].strip())
+
+    # ---------- 지연 시간/오류 ----------
+
+    def decide(self, body: bytes) -> Tuple[str, float]:
+        """
+        요청에 대한 결과 종류와 지연 시간을 정합니다.
+
+        Args:
+            body: 요청 본문
+
+        Returns:
+            (결과 종류, 지연 시간(초)) 튜플. 결과 종류는 ok, error, rate_limited
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            occurrence = self._seen.get(digest, 0)
+            self._seen[digest] = occurrence + 1
+        rng = random.Random(f"{self.seed}:{digest}:{occurrence}")
+
+        draw = rng.random()
+        if draw < self.rate_limit_rate:
+            outcome = "rate_limited"
+        elif draw < self.rate_limit_rate + self.error_rate:
+            outcome = "error"
+        else:
+            outcome = "ok"
+        delay = self.latency_median * math.exp(self.latency_sigma * rng.gauss(0.0, 1.0))
+        return outcome, min(delay, self.latency_max)
+
+    def cached_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """
+        제공자 쪽 프롬프트 캐시를 흉내 내 캐시에서 읽은 입력 토큰 수를 정합니다.
+
+        이전 요청과 메시지 단위로 똑같은 앞부분 중 가장 긴 것이 cache_min_tokens 이상이면
+        그 토큰 수를 128토큰 단위로 내림한 값을 캐시된 토큰으로 봅니다 (마지막 메시지는 제외).
+        """
+        if not self.cache_min_tokens:
+            return 0
+        digest = hashlib.sha1()
+        tokens = 0
+        prefixes = []
+        for message in messages[:-1]:
+            digest.update(json.dumps(message, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+            tokens += _estimate_tokens(message.get("content") or "")
+            prefixes.append((digest.hexdigest(), tokens))
+        cached = 0
+        with self._lock:
+            if len(self._prefixes) > 100000:
+                self._prefixes.clear()
+            for key, prefix_tokens in prefixes:
+                if key in self._prefixes and prefix_tokens >= self.cache_min_tokens:
+                    cached = prefix_tokens // 128 * 128
+                self._prefixes.add(key)
+        return cached
+
+    def enter(self) -> bool:
+        """처리 중인 요청 수를 늘립니다. 동시 처리 한도를 넘으면 False"""
+        with self._lock:
+            self.counts["requests"] += 1
+            if self.max_inflight and self._inflight >= self.max_inflight:
+                return False
+            self._inflight += 1
+            return True
+
+    def leave(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    @property
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self.counts, "inflight": self._inflight, "answer_key": len(self.answer_key)}
+
+
+def _estimate_tokens(text: str) -> int:
+    """토큰 수 근사값 (UTF-8 4바이트당 1토큰)"""
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """OpenAI chat completions API 형식을 흉내 내는 HTTP 핸들러"""
+
+    policy: StubPolicy = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        if path in ("/v1/models", "/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "local"}]})
+        elif path in ("", "/stats"):
+            self._send_json(200, self.policy.stats)
+        else:
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        if path not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+        try:
+            request = json.loads(body)
+            messages = request["messages"]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": {"message": "messages가 필요합니다", "type": "invalid_request_error"}})
+            return
+        if request.get("stream"):
+            self._send_json(400, {"error": {"message": "stream은 지원하지 않습니다", "type": "invalid_request_error"}})
+            return
+
+        policy = self.policy
+        if not policy.enter():
+            policy.count("rate_limited")
+            self._send_rate_limited("동시 처리 한도를 넘었습니다")
+            return
+        try:
+            outcome, delay = policy.decide(body)
+            time.sleep(delay)
+            if outcome == "rate_limited":
+                policy.count("rate_limited")
+                self._send_rate_limited("요청 한도를 넘었습니다")
+                return
+            if outcome == "error":
+                policy.count("errors")
+                self._send_json(500, {"error": {"message": "스텁 서버 오류", "type": "server_error"}})
+                return
+
+            kind, text = policy.complete(messages)
+            policy.count(kind)
+            policy.count("ok")
+            prompt_tokens = sum(_estimate_tokens(m.get("content") or "") for m in messages)
+            completion_tokens = _estimate_tokens(text)
+            self._send_json(200, {
+                "id": f"chatcmpl-stub-{hashlib.sha1(body).hexdigest()[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens,
+                          "prompt_tokens_details": {"cached_tokens": policy.cached_tokens(messages)}},
+            })
+        finally:
+            policy.leave()
+
+    def _send_rate_limited(self, message: str) -> None:
+        self._send_json(429, {"error": {"message": message, "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                        {"Retry-After": f"{self.policy.retry_after:g}"})
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+
+def create_server(policy: StubPolicy, host: str = "127.0.0.1", port: int = 8900) -> ThreadingHTTPServer:
+    """
+    OpenAI 호환 스텁 서버를 생성합니다.
+
+    Args:
+        policy: 응답 규칙
+        host: 바인딩 주소
+        port: 포트
+
+    Returns:
+        HTTP 서버 (serve_forever()로 실행)
+    """
+    handler = type("BoundStubRequestHandler", (StubRequestHandler,), {"policy": policy})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="오프라인 부하 테스트용 OpenAI 호환 스텁 서버 (chat completions)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--answers", nargs="*", default=DEFAULT_ANSWER_FILES,
+                        help="답변 요청에 쓸 question/answer CSV 파일들")
+    parser.add_argument("--accuracy", type=float, default=1.0, help="정답을 아는 질문에 정답을 돌려주는 비율")
+    parser.add_argument("--latency-median", type=float, default=0.3, help="지연 시간 중앙값(초)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="로그정규 지연 시간의 sigma (0이면 고정)")
+    parser.add_argument("--latency-max", type=float, default=10.0, help="지연 시간 상한(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 속도 제한 비율")
+    parser.add_argument("--max-inflight", type=int, default=0, help="동시 처리 한도 (넘으면 429, 0이면 제한 없음)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 응답의 Retry-After(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-min-tokens", type=int, default=1024,
+                        help="프롬프트 캐시를 흉내 내는 최소 앞부분 토큰 수 (0이면 사용하지 않음)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    policy = StubPolicy(load_answer_key(args.answers), args.accuracy, args.latency_median, args.latency_sigma,
+                        args.latency_max, args.error_rate, args.rate_limit_rate, args.max_inflight,
+                        args.retry_after, args.seed, args.cache_min_tokens)
+    server = create_server(policy, args.host, args.port)
+    logging.info(f"스텁 서버 시작: http://{args.host}:{args.port}/v1 (정답 {len(policy.answer_key)}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
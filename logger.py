@@ -1,11 +1,19 @@
 import logging
 import os
 import json
+import threading
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from analytics import QuizAnalytics
+from metrics import LOCK_WAIT_SECONDS, LOCK_WAITERS, STAGE_SECONDS
+
 class QuizLogger:
     """퀴즈 수행 로그를 관리하는 클래스"""
+
+    # 여러 채점 스레드가 상호작용 로그 파일을 동시에 읽고 다시 쓰지 않도록 하는 잠금
+    _file_lock = threading.RLock()
     
     def __init__(self, log_dir: str = "logs"):
         """
@@ -17,6 +25,8 @@ class QuizLogger:
         self.log_dir = log_dir
         os.makedirs(log_dir, exist_ok=True)
         self.setup_logging()
+        # 응답을 기록할 때마다 갱신하는 문제별/제출별 집계 (분석 화면이 로그 전체를 읽지 않도록)
+        self.analytics = QuizAnalytics(os.path.join(log_dir, "analytics.json"))
     
     def setup_logging(self) -> None:
         """로깅 설정을 구성합니다."""
@@ -48,7 +58,9 @@ class QuizLogger:
     def log_question_response(self, name: str, api_endpoint: str, 
                              question_index: int, question: str, 
                              user_answer: str, correct_answer: str,
-                             is_correct: bool, llm_score: float, response_time: float) -> None:
+                             is_correct: bool, llm_score: float, response_time: float,
+                             level: Optional[str] = None,
+                             judge_usage: Optional[Dict[str, Any]] = None) -> None:
         """
         질문과 응답을 로그에 기록합니다.
         
@@ -61,6 +73,8 @@ class QuizLogger:
             correct_answer: 정답
             is_correct: 정답 여부
             response_time: 응답 시간
+            level: 문제 난이도
+            judge_usage: 이 문제 LLM 채점의 토큰 사용량과 비용 (캐시에서 채점했으면 None)
         """
         # 로깅 메시지 생성
         log_message = (
@@ -81,11 +95,14 @@ class QuizLogger:
             "correct_answer": correct_answer,
             "is_correct": is_correct,
             "llm_score": llm_score,
-            "response_time": response_time
+            "response_time": response_time,
+            "level": level,
+            "judge_usage": judge_usage
         }
         
         # 로그 파일에 추가
         self._append_to_log_file(log_entry)
+        self.analytics.record(name, api_endpoint, question, level, is_correct, llm_score, response_time)
     
     def log_error(self, name: str, api_endpoint: str, error_msg: str) -> None:
         """
@@ -141,11 +158,20 @@ class QuizLogger:
         Args:
             log_entry: 추가할 로그 항목
         """
-        all_logs = self._read_log_file()
-        all_logs.append(log_entry)
-        
-        with open(self.interaction_log_path, "w", encoding="utf-8") as f:
-            json.dump(all_logs, f, ensure_ascii=False, indent=2)
+        # 락 대기 시간과 파일 전체를 다시 쓰는 시간을 따로 기록
+        started = time.perf_counter()
+        with LOCK_WAITERS.track(lock="interaction_log"):
+            self._file_lock.acquire()
+        try:
+            LOCK_WAIT_SECONDS.observe(time.perf_counter() - started, lock="interaction_log")
+            with STAGE_SECONDS.time(stage="interaction_log_rewrite"):
+                all_logs = self._read_log_file()
+                all_logs.append(log_entry)
+
+                with open(self.interaction_log_path, "w", encoding="utf-8") as f:
+                    json.dump(all_logs, f, ensure_ascii=False, indent=2)
+        finally:
+            self._file_lock.release()
     
     def _read_log_file(self) -> List[Dict[str, Any]]:
         """
@@ -155,7 +181,7 @@ class QuizLogger:
             모든 로그 항목 리스트
         """
         try:
-            with open(self.interaction_log_path, "r", encoding="utf-8") as f:
+            with self._file_lock, open(self.interaction_log_path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except (json.JSONDecodeError, FileNotFoundError):
             return [] 
\ No newline at end of file
@@ -0,0 +1,311 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 지연 시간 히스토그램 기본 구간(초): 락/파일 쓰기(ms 단위)부터 참가자 API 호출(수십 초)까지
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    """이름, 설명, 라벨 이름을 가진 지표 (라벨 값 조합별로 값을 따로 보관)"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: LabelValues, extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter(_Metric):
+    """계속 증가하는 값 (요청 수, 실패 수 등)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in sorted(self.values().items())]
+
+
+class Gauge(_Metric):
+    """오르내리는 현재 값 (진행 중인 제출 수, 락 대기 수 등)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """블록을 실행하는 동안 값을 1 올립니다."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}" for key, value in sorted(self.values().items())]
+
+
+class Histogram(_Metric):
+    """구간별 누적 개수로 분포를 기록하는 지표 (지연 시간)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 조합 -> [구간별 개수(+Inf 포함), 합계, 개수]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """블록 실행 시간을 기록합니다."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict[LabelValues, Tuple[List[int], float, int]]:
+        """라벨 값 조합별 (구간별 개수, 합계, 개수)"""
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+
+    def quantile(self, q: float, **labels: str) -> Optional[float]:
+        """
+        구간 안에서 선형 보간한 분위수 추정치를 반환합니다.
+
+        Args:
+            q: 분위 (0~1)
+
+        Returns:
+            추정값 (기록이 없으면 None, 마지막 구간을 넘으면 마지막 구간 경계)
+        """
+        entry = self.snapshot().get(self._key(labels))
+        if entry is None or entry[2] == 0:
+            return None
+        return _bucket_quantile(self.buckets, entry[0], q)
+
+    def summary(self, quantiles: Sequence[float] = (0.5, 0.95, 0.99)) -> List[Dict[str, object]]:
+        """라벨 값 조합별 개수, 평균, 분위수 추정치 (표로 보여 주기 위한 요약)"""
+        rows = []
+        for key, (counts, total, count) in sorted(self.snapshot().items()):
+            row: Dict[str, object] = dict(zip(self.labelnames, key))
+            row.update({"count": count, "mean": total / count if count else 0.0})
+            for q in quantiles:
+                row[f"p{round(q * 100):d}"] = _bucket_quantile(self.buckets, counts, q) if count else None
+            rows.append(row)
+        return rows
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                le_label = 'le="' + le + '"'
+                lines.append(f"{self.name}_bucket{self._format_labels(key, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+def _bucket_quantile(buckets: Sequence[float], counts: Sequence[int], q: float) -> float:
+    """구간별 개수에서 분위수를 선형 보간으로 추정합니다."""
+    total = sum(counts)
+    rank = q * total
+    cumulative = 0
+    lower = 0.0
+    for bound, bucket_count in zip(list(buckets) + [buckets[-1]], counts):
+        if bucket_count and cumulative + bucket_count >= rank:
+            return lower + (bound - lower) * (rank - cumulative) / bucket_count
+        cumulative += bucket_count
+        lower = bound
+    return buckets[-1]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """지표 모음 (같은 이름으로 다시 만들면 기존 지표를 반환)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"이미 다른 종류로 등록된 지표입니다: {name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식(0.0.4)으로 모든 지표를 출력합니다."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전체에서 함께 쓰는 기본 지표 모음
+REGISTRY = MetricsRegistry()
+
+# ---------- 채점 파이프라인 공용 지표 ----------
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "quiz_stage_seconds", "퀴즈 처리 단계별 소요 시간(초)", ["stage"])
+LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "quiz_lock_wait_seconds", "파일 락을 얻기까지 기다린 시간(초)", ["lock"])
+LOCK_WAITERS = REGISTRY.gauge(
+    "quiz_lock_waiters", "파일 락을 기다리는 작업 수", ["lock"])
+ACTIVE_SUBMISSIONS = REGISTRY.gauge(
+    "quiz_active_submissions", "채점 중인 제출 수")
+SUBMISSIONS = REGISTRY.counter(
+    "quiz_submissions_total", "끝난 제출 수 (결과별)", ["status"])
+QUESTIONS = REGISTRY.counter(
+    "quiz_questions_total", "채점한 문제 수")
+CONTESTANT_REQUESTS = REGISTRY.counter(
+    "quiz_contestant_requests_total", "참가자 API 요청 수 (결과별)", ["outcome"])
+JUDGE_REQUESTS = REGISTRY.counter(
+    "quiz_judge_requests_total", "LLM 채점 결과 수 (correct, incorrect, error)", ["result"])
+JUDGE_CACHE = REGISTRY.counter(
+    "quiz_judge_cache_total", "LLM 채점 캐시 조회 수 (hit, miss)", ["result"])
+JUDGE_RETRIES = REGISTRY.counter(
+    "quiz_judge_retry_events_total", "LLM 채점 재시도/헤지 이벤트 수 (retry, hedge, hedge_win, budget_exhausted)", ["event"])
+LEADERBOARD_RETRIES = REGISTRY.counter(
+    "quiz_leaderboard_update_retries_total", "리더보드 갱신 재시도 수")
+LEADERBOARD_FAILURES = REGISTRY.counter(
+    "quiz_leaderboard_update_failures_total", "재시도 끝에 실패한 리더보드 갱신 수")
+LLM_TOKENS = REGISTRY.counter(
+    "quiz_llm_tokens_total", "LLM 호출 토큰 수 (kind: prompt=캐시되지 않은 입력, cached=캐시된 입력, completion)",
+    ["component", "model", "kind"])
+LLM_COST = REGISTRY.counter(
+    "quiz_llm_cost_usd_total", "LLM 호출 비용 추정치(USD, token_usage.MODEL_PRICES 기준)", ["component", "model"])
+STARTUP_SECONDS = REGISTRY.gauge(
+    "quiz_startup_seconds", "앱 첫 실행의 시작 단계별 소요 시간(초)", ["phase"])
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """GET /metrics에 Prometheus 텍스트 형식으로 응답하는 핸들러"""
+
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") not in ("", "/metrics"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+
+def start_http_server(port: int, host: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    지표를 제공하는 HTTP 서버를 데몬 스레드로 시작합니다.
+
+    Args:
+        port: 포트
+        host: 바인딩 주소
+        registry: 출력할 지표 모음
+
+    Returns:
+        실행 중인 HTTP 서버
+    """
+    handler = type("BoundMetricsRequestHandler", (_MetricsRequestHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,414 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter as StackCounter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from metrics import STARTUP_SECONDS
+
+# 프로파일링 설정 (QUIZ_PROFILE: "" 끔, "cprofile" 결정적 프로파일, "sample" 샘플링 프로파일)
+PROFILE_MODE = os.getenv("QUIZ_PROFILE", "").strip().lower()
+PROFILE_DIR = os.getenv("QUIZ_PROFILE_DIR", os.path.join("logs", "profiles"))
+PROFILE_TOP_N = int(os.getenv("QUIZ_PROFILE_TOP_N", "25"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("QUIZ_PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+MODES = ("cprofile", "sample")
+DEFAULT_MODE = "cprofile"
+
+# cProfile은 프로세스에서 동시에 하나만 켤 수 있으므로(3.12+) 사용 중이면 샘플링으로 대신함
+_cprofile_lock = threading.Lock()
+
+# tracemalloc은 프로세스 전역이므로 마지막 세션이 끝날 때만 끔
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def _frame_label(filename: str, lineno: int, name: str) -> str:
+    """접힌 스택의 프레임 이름 (세미콜론은 flamegraph의 프레임 구분자라서 바꿈)"""
+    return f"{name} ({os.path.basename(filename)}:{lineno})".replace(";", ":")
+
+
+class _StackSampler(threading.Thread):
+    """대상 스레드의 호출 스택을 주기적으로 읽어 접힌 스택별 샘플 수를 세는 스레드"""
+
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(name="quiz-profile-sampler", daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.stacks: StackCounter = StackCounter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                code = frame.f_code
+                labels.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _collapse_pstats(stats: pstats.Stats, max_depth: int = 64, min_seconds: float = 1e-5) -> StackCounter:
+    """
+    cProfile 호출 그래프를 접힌 스택(마이크로초 단위)으로 근사합니다.
+
+    cProfile은 호출자-피호출자 간선만 기록하므로, 각 함수의 시간을 간선별 누적 시간 비율로 나눠 경로에 배분합니다.
+    경로 수가 폭발하지 않도록 배분된 누적 시간이 min_seconds보다 작은 경로는 버립니다.
+    """
+    raw = stats.stats  # {func: (cc, nc, tt, ct, {caller: (cc, nc, tt, ct)})}
+    callees: Dict[Any, List[Tuple[Any, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks: StackCounter = StackCounter()
+
+    def walk(func, share: float, path: Tuple[str, ...]) -> None:
+        _, _, tt, ct, _ = raw[func]
+        path = path + (_frame_label(*func),)
+        self_us = int(tt * share * 1_000_000)
+        if self_us > 0:
+            stacks[";".join(path)] += self_us
+        if len(path) >= max_depth or ct <= 0:
+            return
+        for callee, edge_ct in callees.get(func, []):
+            callee_ct = raw[callee][3]
+            label = _frame_label(*callee)
+            if label in path or callee_ct <= 0 or edge_ct <= 0:
+                continue  # 재귀 호출은 첫 진입 경로에만 반영
+            callee_share = share * min(edge_ct / callee_ct, 1.0)
+            if callee_ct * callee_share >= min_seconds:
+                walk(callee, callee_share, path)
+
+    roots = [func for func, entry in raw.items() if not entry[4]]
+    for root in roots:
+        walk(root, 1.0, ())
+    return stacks
+
+
+class ProfileSession:
+    """
+    현재 스레드의 실행 구간을 프로파일링하고 결과를 로그 디렉토리에 저장하는 컨텍스트 관리자
+
+    with 블록 안의 실행을 cProfile 또는 샘플링 방식으로 기록하고, tracemalloc으로 구간 전후의 메모리 할당 차이를 잽니다.
+    끝나면 <out_dir>/<시각>_<label>/ 아래에 요약(summary.txt), 메타데이터(meta.json),
+    flamegraph용 접힌 스택(profile.collapsed)과 cProfile 원본(profile.pstats, cprofile 모드)을 남깁니다.
+    tracemalloc은 프로세스 전역이라 동시에 실행 중인 다른 작업의 할당도 함께 집계됩니다.
+    """
+
+    def __init__(self, label: str, mode: str = DEFAULT_MODE, out_dir: str = PROFILE_DIR,
+                 top_n: int = PROFILE_TOP_N, sample_interval: float = PROFILE_SAMPLE_INTERVAL,
+                 trace_memory: bool = True):
+        """
+        프로파일링 세션을 초기화합니다.
+
+        Args:
+            label: 결과 디렉토리 이름에 붙일 이름 (예: 참가자 이름)
+            mode: "cprofile" 또는 "sample"
+            out_dir: 결과를 저장할 상위 디렉토리
+            top_n: 요약에 남길 상위 함수/할당 위치 수
+            sample_interval: 샘플링 모드의 스택 수집 간격(초)
+            trace_memory: tracemalloc 할당 통계 수집 여부
+        """
+        if mode not in MODES:
+            raise ValueError(f"지원하지 않는 프로파일링 모드입니다: {mode} (가능: {', '.join(MODES)})")
+        self.label = re.sub(r"[^\w.-]+", "_", label).strip("_") or "run"
+        self.mode = mode
+        self.out_dir = out_dir
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.trace_memory = trace_memory
+        self.path: Optional[str] = None
+        self.meta: Dict[str, Any] = {}
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started = 0.0
+        self._started_at = ""
+
+    def __enter__(self) -> "ProfileSession":
+        self._started_at = datetime.now().strftime("%Y%m%d-%H%M%S")
+        if self.trace_memory:
+            _start_tracemalloc()
+            self._snapshot = tracemalloc.take_snapshot()
+        if self.mode == "cprofile" and not _cprofile_lock.acquire(blocking=False):
+            self.mode = "sample"  # 다른 세션이 cProfile을 쓰는 중
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            self._sampler.start()
+        self._started = time.perf_counter()
+        if self._profiler is not None:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+            _cprofile_lock.release()
+        elapsed = time.perf_counter() - self._started
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        memory_lines: List[str] = []
+        peak = None
+        if self._snapshot is not None:
+            # 스냅샷을 만드는 tracemalloc 자신과 import 과정의 할당은 제외
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+                      tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+            diff = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(
+                self._snapshot.filter_traces(ignore), "lineno")
+            peak = tracemalloc.get_traced_memory()[1]
+            memory_lines = [str(stat) for stat in diff[:self.top_n]]
+            _stop_tracemalloc()
+
+        base = os.path.join(self.out_dir, f"{self._started_at}_{self.label}")
+        self.path, suffix = base, 1
+        while os.path.exists(self.path):  # 같은 이름이 같은 초에 끝난 경우
+            suffix += 1
+            self.path = f"{base}-{suffix}"
+        os.makedirs(self.path)
+        self.meta = {
+            "label": self.label,
+            "mode": self.mode,
+            "started_at": self._started_at,
+            "elapsed_seconds": round(elapsed, 3),
+            "thread": threading.current_thread().name,
+            "error": repr(exc) if exc is not None else None,
+        }
+
+        summary = io.StringIO()
+        if self._profiler is not None:
+            stats = pstats.Stats(self._profiler, stream=summary)
+            stats.dump_stats(os.path.join(self.path, "profile.pstats"))
+            stacks = _collapse_pstats(stats)
+            self.meta["collapsed_unit"] = "microseconds"
+            summary.write(f"== cProfile 상위 {self.top_n}개 (누적 시간 순) ==\n")
+            stats.sort_stats("cumulative").print_stats(self.top_n)
+        else:
+            stacks = self._sampler.stacks
+            self.meta.update({"collapsed_unit": "samples", "samples": self._sampler.samples,
+                              "sample_interval": self.sample_interval})
+            summary.write(f"== 샘플 {self._sampler.samples}개 중 상위 {self.top_n}개 함수 (자기 시간 기준) ==\n")
+            leaf_counts: StackCounter = StackCounter()
+            for stack, count in stacks.items():
+                leaf_counts[stack.rsplit(";", 1)[-1]] += count
+            total = max(self._sampler.samples, 1)
+            for frame, count in leaf_counts.most_common(self.top_n):
+                summary.write(f"{count:8d} {count / total:6.1%}  {frame}\n")
+
+        if self._snapshot is not None:
+            self.meta["tracemalloc_peak_bytes"] = peak
+            summary.write(f"\n== 메모리 할당 증가 상위 {self.top_n}개 (tracemalloc, 최대 {peak / 1024 / 1024:.1f} MiB) ==\n")
+            summary.write("\n".join(memory_lines) + "\n")
+
+        with open(os.path.join(self.path, "profile.collapsed"), "w", encoding="utf-8") as f:
+            for stack, weight in sorted(stacks.items()):
+                f.write(f"{stack} {weight}\n")
+        with open(os.path.join(self.path, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+
+
+def list_profiles(out_dir: str = PROFILE_DIR, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    저장된 프로파일 결과를 최신순으로 반환합니다.
+
+    Args:
+        out_dir: 결과가 저장된 상위 디렉토리
+        limit: 최대 개수
+
+    Returns:
+        meta.json 내용에 결과 경로(path)를 더한 딕셔너리 리스트
+    """
+    if not os.path.isdir(out_dir):
+        return []
+    results = []
+    for entry in sorted(os.listdir(out_dir), reverse=True):
+        meta_path = os.path.join(out_dir, entry, "meta.json")
+        if not os.path.exists(meta_path):
+            continue
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        results.append({**meta, "path": os.path.join(out_dir, entry)})
+        if len(results) >= limit:
+            break
+    return results
+
+
+# ---------- 시작 시간 ----------
+
+def _process_age() -> Optional[float]:
+    """프로세스가 시작된 뒤 지난 시간(초) (/proc이 없는 환경에서는 None)"""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # 프로세스 이름에 공백이 있을 수 있으므로 마지막 ')' 뒤에서 필드를 셈 (22번째 필드: 시작 시각)
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupTimer:
+    """
+    앱 첫 실행의 단계별 소요 시간을 기록하는 타이머
+
+    이 모듈을 import한 시점부터 mark()를 부를 때마다 직전 시점 이후 걸린 시간을 단계 이름으로 기록하고,
+    finish() 이후의 호출(Streamlit 재실행)은 무시합니다. 결과는 quiz_startup_seconds 지표로도 내보냅니다.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # 이 모듈을 import하기 전까지 걸린 시간 (인터프리터와 Streamlit 서버 시작)
+        self.before_script = _process_age()
+        self.phases: List[Tuple[str, float]] = []
+        self.finished = False
+        self._last = self.started
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> None:
+        """직전 시점부터 지금까지를 phase 단계로 기록합니다."""
+        with self._lock:
+            if self.finished:
+                return
+            now = time.perf_counter()
+            self.phases.append((phase, now - self._last))
+            STARTUP_SECONDS.set(now - self._last, phase=phase)
+            self._last = now
+
+    def finish(self, phase: str = "render") -> None:
+        """마지막 단계를 기록하고 측정을 끝냅니다."""
+        self.mark(phase)
+        with self._lock:
+            if not self.finished:
+                self.finished = True
+                STARTUP_SECONDS.set(self._last - self.started, phase="total")
+
+    def report(self) -> List[Dict[str, Any]]:
+        """단계별 소요 시간(초) 리스트 (프로세스 시작부터 잴 수 있으면 before_script 단계 포함)"""
+        rows = []
+        if self.before_script is not None:
+            rows.append({"phase": "before_script", "seconds": round(self.before_script, 4)})
+        rows += [{"phase": phase, "seconds": round(seconds, 4)} for phase, seconds in self.phases]
+        return rows
+
+
+STARTUP = StartupTimer()
+
+
+def import_time_report(modules: Sequence[str], top_n: int = 20, group: bool = True) -> List[Dict[str, Any]]:
+    """
+    새 인터프리터에서 modules를 import하며 python -X importtime 결과를 모아 느린 순으로 반환합니다.
+
+    Args:
+        modules: import할 모듈 이름 목록
+        top_n: 반환할 항목 수
+        group: True면 최상위 패키지별로 자기 시간(self)을 합쳐 보여 줌
+
+    Returns:
+        {"module", "self_ms", "cumulative_ms"} 딕셔너리 리스트 (자기 시간 순, 누적 시간은 하위 import 포함)
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f"import 실패: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else code}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_us, cumulative_us, name = int(self_us), int(cumulative_us), name[1:]  # 구분자 뒤 공백 하나 제외
+        except ValueError:
+            continue  # 머리글 줄
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, name.strip(), self_us, cumulative_us))
+
+    # importtime은 하위 import를 먼저 출력하므로 거꾸로 읽으면 부모가 먼저 나옴.
+    # 누적 시간은 부모가 같은 묶음이 아닌 줄(묶음의 바깥쪽 import)만 더해 중복을 피함
+    rows: Dict[str, Dict[str, Any]] = {}
+    parents: List[str] = []
+    for depth, name, self_us, cumulative_us in reversed(entries):
+        key = name.split(".")[0] if group else name
+        del parents[depth:]
+        row = rows.setdefault(key, {"module": key, "self_ms": 0.0, "cumulative_ms": 0.0})
+        row["self_ms"] += self_us / 1000
+        if key not in parents:
+            row["cumulative_ms"] += cumulative_us / 1000
+        parents.append(key)
+    ordered = sorted(rows.values(), key=lambda row: row["self_ms"], reverse=True)
+    return [{**row, "self_ms": round(row["self_ms"], 1), "cumulative_ms": round(row["cumulative_ms"], 1)}
+            for row in ordered[:top_n]]
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="프로파일링 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    importtime_parser = subparsers.add_parser("importtime", help="모듈 import 시간 분석 (-X importtime 요약)")
+    importtime_parser.add_argument("modules", nargs="*", default=list(APP_MODULES),
+                                   help="import할 모듈 (기본: 앱이 시작할 때 import하는 모듈)")
+    importtime_parser.add_argument("-n", "--top", type=int, default=20, help="출력할 항목 수")
+    importtime_parser.add_argument("--no-group", action="store_true", help="최상위 패키지별로 합치지 않고 모듈별로 출력")
+    args = parser.parse_args()
+
+    rows = import_time_report(args.modules, args.top, group=not args.no_group)
+    print(f"{'module':40s} {'self(ms)':>10s} {'cumulative(ms)':>15s}")
+    for row in rows:
+        print(f"{row['module']:40s} {row['self_ms']:>10.1f} {row['cumulative_ms']:>15.1f}")
+
+
+# 앱(app.py)이 시작할 때 import하는 모듈
+APP_MODULES = ("streamlit", "pandas", "quiz_manager", "scoring", "leaderboard_manager", "logger",
+               "quiz_runner", "metrics", "utils")
+
+
+if __name__ == "__main__":
+    main()
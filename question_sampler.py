@@ -0,0 +1,228 @@
+import argparse
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import dataset_manifest
+from calibration import item_information
+
+# 기본 입출력 경로
+DEFAULT_INPUT = os.path.join('data', 'quiz_data.csv')
+DEFAULT_OUTPUT = os.path.join('data', 'random_quiz_data.csv')
+
+# 정렬 키 임시 컬럼
+_KEY = '_sample_key'
+_ROW = '_row_number'
+
+
+def allocate_quotas(level_counts: pd.Series, per_level: Optional[int] = None,
+                    quotas: Optional[Dict[str, int]] = None,
+                    total: Optional[int] = None) -> Dict[str, int]:
+    """
+    난이도별 추출 문제 수를 계산합니다.
+
+    우선순위는 quotas(난이도별 지정) > total(전체 문제 수를 난이도 비율로 배분) > per_level(난이도별 동일 개수) 입니다.
+    어떤 경우든 해당 난이도의 문제 수를 넘지 않습니다.
+
+    Args:
+        level_counts: 난이도별 문제 수
+        per_level: 난이도별 추출 문제 수
+        quotas: 난이도별 추출 문제 수 딕셔너리 (없는 난이도는 0)
+        total: 비례 배분할 전체 추출 문제 수
+
+    Returns:
+        난이도별 추출 문제 수 딕셔너리
+    """
+    if quotas is not None:
+        return {level: min(int(quotas.get(level, 0)), int(count)) for level, count in level_counts.items()}
+
+    if total is not None:
+        # 최대 나머지 방식으로 비례 배분
+        total = min(int(total), int(level_counts.sum()))
+        exact = level_counts / level_counts.sum() * total
+        base = np.floor(exact).astype(int)
+        remainder = total - int(base.sum())
+        order = (exact - base).sort_values(ascending=False, kind='stable').index[:remainder]
+        base.loc[order] += 1
+        return {level: min(int(base[level]), int(count)) for level, count in level_counts.items()}
+
+    per_level = 10 if per_level is None else int(per_level)
+    return {level: min(per_level, int(count)) for level, count in level_counts.items()}
+
+
+def _sample_keys(df: pd.DataFrame, rng: np.random.Generator, strategy: str, ability: float) -> np.ndarray:
+    """
+    행별 정렬 키를 만듭니다. 키가 작은 행부터 추출됩니다.
+
+    'information' 전략은 보정된 문제(irt_difficulty, irt_discrimination)를 정보량이 큰 순으로 먼저 고르고,
+    보정되지 않은 문제는 그 뒤에 무작위 순서로 채웁니다.
+    """
+    keys = rng.random(len(df))
+    if strategy == 'random':
+        return keys
+    if strategy != 'information':
+        raise ValueError(f"알 수 없는 추출 전략: {strategy}")
+    if 'irt_difficulty' not in df.columns or 'irt_discrimination' not in df.columns:
+        return keys
+    info = item_information(df['irt_difficulty'].to_numpy(dtype=float),
+                            df['irt_discrimination'].to_numpy(dtype=float), ability)
+    return np.where(np.isnan(info), 1.0 + keys, -info)
+
+
+def _select(df: pd.DataFrame, quotas: Dict[str, int], level_column: str) -> pd.DataFrame:
+    """정렬 키가 작은 순으로 난이도별 할당량만큼 남깁니다. (groupby 한 번으로 처리)"""
+    rank = df.groupby(level_column, sort=False)[_KEY].rank(method='first')
+    limit = df[level_column].map(quotas).fillna(0)
+    return df[rank <= limit]
+
+
+def _finalize(df: pd.DataFrame, level_order: List[str], level_column: str) -> pd.DataFrame:
+    """난이도 등장 순서, 원본 행 순서로 정렬하고 임시 컬럼을 제거합니다."""
+    order = {level: i for i, level in enumerate(level_order)}
+    df = df.assign(_level_order=df[level_column].map(order))
+    df = df.sort_values(['_level_order', _ROW], kind='stable')
+    return df.drop(columns=['_level_order', _KEY, _ROW]).reset_index(drop=True)
+
+
+def stratified_sample(df: pd.DataFrame, per_level: Optional[int] = None,
+                      quotas: Optional[Dict[str, int]] = None, total: Optional[int] = None,
+                      random_state: Optional[int] = 42, level_column: str = 'level',
+                      strategy: str = 'random', ability: float = 0.0) -> pd.DataFrame:
+    """
+    난이도별 층화 추출을 수행합니다.
+
+    같은 random_state와 입력이면 항상 같은 결과를 반환하며, sample_csv의 스트리밍 결과와도 같습니다.
+
+    Args:
+        df: 퀴즈 데이터프레임
+        per_level: 난이도별 추출 문제 수 (기본 10)
+        quotas: 난이도별 추출 문제 수 딕셔너리
+        total: 난이도 비율로 배분할 전체 추출 문제 수
+        random_state: 난수 시드
+        level_column: 난이도 컬럼 이름
+        strategy: 'random'(무작위) 또는 'information'(보정된 문항 정보량 우선, calibration.py 참고)
+        ability: 'information' 전략에서 정보량을 계산할 능력 수준
+
+    Returns:
+        추출된 문제 데이터프레임
+    """
+    if level_column not in df.columns:
+        raise ValueError(f"퀴즈 데이터에 '{level_column}' 컬럼이 없습니다")
+
+    level_counts = df[level_column].value_counts(sort=False)
+    level_quotas = allocate_quotas(level_counts, per_level, quotas, total)
+
+    rng = np.random.default_rng(random_state)
+    keyed = df.assign(**{_KEY: _sample_keys(df, rng, strategy, ability), _ROW: np.arange(len(df))})
+    selected = _select(keyed, level_quotas, level_column)
+    return _finalize(selected, list(level_counts.index), level_column)
+
+
+def _count_levels(path: str, level_column: str, chunksize: int) -> pd.Series:
+    """난이도 컬럼만 읽어 난이도별 문제 수를 셉니다."""
+    counts: Dict[str, int] = {}
+    for chunk in pd.read_csv(path, usecols=[level_column], chunksize=chunksize):
+        for level, count in chunk[level_column].value_counts(sort=False).items():
+            counts[level] = counts.get(level, 0) + int(count)
+    return pd.Series(counts, dtype='int64')
+
+
+def sample_csv(path: str, per_level: Optional[int] = None,
+               quotas: Optional[Dict[str, int]] = None, total: Optional[int] = None,
+               random_state: Optional[int] = 42, level_column: str = 'level',
+               chunksize: Optional[int] = None, strategy: str = 'random',
+               ability: float = 0.0) -> pd.DataFrame:
+    """
+    CSV 파일에서 난이도별 층화 추출을 수행합니다.
+
+    chunksize를 지정하면 파일을 나누어 읽으면서 난이도별로 할당량만큼의 후보만 메모리에 유지합니다.
+
+    Args:
+        path: 퀴즈 CSV 파일 경로
+        per_level: 난이도별 추출 문제 수 (기본 10)
+        quotas: 난이도별 추출 문제 수 딕셔너리
+        total: 난이도 비율로 배분할 전체 추출 문제 수
+        random_state: 난수 시드
+        level_column: 난이도 컬럼 이름
+        chunksize: 한 번에 읽을 행 수 (None이면 한 번에 읽음)
+        strategy: 'random'(무작위) 또는 'information'(보정된 문항 정보량 우선)
+        ability: 'information' 전략에서 정보량을 계산할 능력 수준
+
+    Returns:
+        추출된 문제 데이터프레임
+    """
+    if chunksize is None:
+        return stratified_sample(pd.read_csv(path), per_level, quotas, total, random_state,
+                                 level_column, strategy, ability)
+
+    level_counts = _count_levels(path, level_column, chunksize)
+    level_quotas = allocate_quotas(level_counts, per_level, quotas, total)
+
+    # 청크마다 같은 난수열을 이어서 사용하므로 한 번에 읽은 결과와 동일
+    rng = np.random.default_rng(random_state)
+    kept = None
+    offset = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = chunk.assign(**{_KEY: _sample_keys(chunk, rng, strategy, ability),
+                                _ROW: np.arange(offset, offset + len(chunk))})
+        offset += len(chunk)
+        candidates = chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+        kept = _select(candidates, level_quotas, level_column)
+
+    if kept is None:
+        # 헤더만 있는 파일: 입력과 같은 컬럼의 빈 데이터프레임
+        return pd.read_csv(path, nrows=0)
+    return _finalize(kept, list(level_counts.index), level_column)
+
+
+def _parse_quotas(items: Iterable[str]) -> Dict[str, int]:
+    """'난이도=개수' 형식의 인자를 딕셔너리로 변환합니다."""
+    quotas = {}
+    for item in items:
+        level, _, count = item.rpartition('=')
+        if not level:
+            raise argparse.ArgumentTypeError(f"잘못된 할당량 형식: {item} (예: 'very hard=20')")
+        quotas[level] = int(count)
+    return quotas
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """퀴즈 CSV에서 난이도별 문제를 추출해 새 CSV로 저장하는 CLI 진입점"""
+    parser = argparse.ArgumentParser(description="난이도별 층화 무작위 추출로 평가용 퀴즈 세트를 생성합니다.")
+    parser.add_argument('-i', '--input', default=DEFAULT_INPUT, help="입력 퀴즈 CSV 경로")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="출력 CSV 경로 ('-'이면 표준 출력)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('-n', '--per-level', type=int, help="난이도별 추출 문제 수 (기본 10)")
+    group.add_argument('-t', '--total', type=int, help="난이도 비율로 배분할 전체 추출 문제 수")
+    group.add_argument('-q', '--quota', action='append', metavar='LEVEL=N', help="난이도별 추출 문제 수 (반복 지정)")
+    parser.add_argument('-s', '--seed', type=int, default=42, help="난수 시드")
+    parser.add_argument('--level-column', default='level', help="난이도 컬럼 이름")
+    parser.add_argument('--chunksize', type=int, help="스트리밍으로 읽을 청크 크기")
+    parser.add_argument('--strategy', choices=['random', 'information'], default='random',
+                        help="추출 전략 (information: 보정된 문항 정보량이 큰 문제 우선)")
+    parser.add_argument('--ability', type=float, default=0.0, help="information 전략의 기준 능력 수준")
+    args = parser.parse_args(argv)
+
+    quotas = _parse_quotas(args.quota) if args.quota else None
+    result_df = sample_csv(args.input, args.per_level, quotas, args.total, args.seed,
+                           args.level_column, args.chunksize, args.strategy, args.ability)
+
+    if args.output == '-':
+        result_df.to_csv(sys.stdout, index=False)
+        return 0
+
+    result_df.to_csv(args.output, index=False)
+    # 앱이 로드할 때 확인할 수 있도록 출력 파일을 매니페스트에 기록
+    dataset_manifest.record_file(args.output, len(result_df), list(result_df.columns), source=args.input)
+    print(f"Successfully selected questions and saved to {args.output}")
+    print("Questions selected per difficulty level:")
+    for level, count in result_df[args.level_column].value_counts(sort=False).items():
+        print(f"- {level}: {count} questions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,28 +1,62 @@
+import threading
 import pandas as pd
 from typing import Dict, List, Any, Optional
 
+import dataset_manifest
+
 class QuizManager:
     """퀴즈 데이터를 로드하고 관리하는 클래스"""
     
-    def __init__(self, quiz_data_path: str = "data/quiz_data.csv"):
+    def __init__(self, quiz_data_path: str = "data/quiz_data.csv", lazy: bool = False,
+                 verify_hash: bool = False):
         """
         퀴즈 관리자를 초기화합니다.
         
         Args:
             quiz_data_path: 퀴즈 데이터가 저장된 CSV 파일 경로
+            lazy: True면 퀴즈 데이터를 처음 사용할 때 로드 (앱 시작을 빠르게 할 때)
+            verify_hash: True면 로드할 때 매니페스트의 sha256 해시까지 비교 (기본은 크기와 행 수만)
         """
         self.quiz_data_path = quiz_data_path
-        self.quiz_data = None
-        self.load_quiz_data()
+        self.verify_hash = verify_hash
+        self.verification_error: Optional[str] = None
+        self._quiz_data: Optional[pd.DataFrame] = None
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        if not lazy:
+            self.load_quiz_data()
+
+    @property
+    def quiz_data(self) -> Optional[pd.DataFrame]:
+        """퀴즈 데이터 (아직 로드하지 않았으면 지금 로드)"""
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load_quiz_data()
+        return self._quiz_data
+
+    @quiz_data.setter
+    def quiz_data(self, value: Optional[pd.DataFrame]) -> None:
+        self._quiz_data = value
+        self._loaded = True
     
     def load_quiz_data(self) -> None:
-        """퀴즈 데이터를 CSV 파일에서 로드합니다."""
+        """
+        퀴즈 데이터를 CSV 파일에서 로드합니다.
+
+        같은 디렉토리의 매니페스트(manifest.json)에 이 파일이 기록되어 있으면 크기와 행 수를 비교해,
+        다르면 경고를 출력하고 verification_error에 남깁니다 (데이터는 그대로 사용).
+        """
         try:
             self.quiz_data = pd.read_csv(self.quiz_data_path)
             # 필요한 컬럼이 있는지 확인
             required_columns = ['question', 'answer']
             if not all(col in self.quiz_data.columns for col in required_columns):
                 raise ValueError(f"퀴즈 데이터에 필요한 컬럼이 없습니다: {required_columns}")
+            self.verification_error = dataset_manifest.verify_file(
+                self.quiz_data_path, rows=len(self.quiz_data), full=self.verify_hash)
+            if self.verification_error:
+                print(f"퀴즈 데이터 검증 경고 ({self.quiz_data_path}): {self.verification_error}")
         except Exception as e:
             print(f"퀴즈 데이터 로드 중 오류 발생: {e}")
             # 기본 빈 DataFrame 생성
@@ -48,7 +82,7 @@ class QuizManager:
         formatted_question = {
             "question": question_data.get('question', ''),
             "question_id": str(index),  # 인덱스를 question_id로 사용
-            "difficulty": question_data.get('difficulty', 'medium')  # 기본 난이도 medium
+            "difficulty": question_data.get('difficulty', question_data.get('level', 'medium'))  # 기본 난이도 medium
         }
         
         return formatted_question
@@ -83,6 +117,19 @@ class QuizManager:
             return 0
         return len(self.quiz_data)
     
+    def get_levels(self) -> List[str]:
+        """
+        문제 인덱스 순서대로 난이도 리스트를 반환합니다.
+        
+        Returns:
+            난이도 문자열 리스트 ('level' 컬럼이 없으면 모두 'medium')
+        """
+        if self.quiz_data is None:
+            return []
+        if 'level' not in self.quiz_data.columns:
+            return ['medium'] * len(self.quiz_data)
+        return self.quiz_data['level'].fillna('medium').astype(str).tolist()
+    
     def get_all_questions(self) -> List[Dict[str, Any]]:
         """
         모든 퀴즈 문제를 API 요청 형식에 맞게 포맷하여 리스트로 반환합니다.
@@ -99,7 +146,7 @@ class QuizManager:
             formatted_question = {
                 "question": question_data.get('question', ''),
                 "question_id": str(index),
-                "difficulty": question_data.get('difficulty', 'medium')
+                "difficulty": question_data.get('difficulty', question_data.get('level', 'medium'))
             }
             formatted_question['question_text'] = question_data.get('question', '')
             formatted_questions.append(formatted_question)
@@ -0,0 +1,210 @@
+from typing import Iterator, Optional
+
+from quiz_manager import QuizManager
+from api_client import APIClient
+from scoring import Scorer
+from leaderboard_manager import LeaderboardManager
+from logger import QuizLogger
+from adaptive_evaluator import AdaptiveEvaluator
+from metrics import ACTIVE_SUBMISSIONS, QUESTIONS, STAGE_SECONDS, SUBMISSIONS
+import profiling
+from token_usage import UsageTracker, usage_summary
+
+
+class QuizRunner:
+    """제출된 API 엔드포인트로 퀴즈를 보내고, 채점 결과를 로그와 리더보드에 기록하는 클래스"""
+
+    def __init__(self, quiz_manager: QuizManager, leaderboard_manager: LeaderboardManager,
+                 scorer: Scorer, logger: QuizLogger,
+                 ci_width_threshold: float = 0.10, min_per_level: int = 5, min_questions: int = 30,
+                 timeout: int = 30, profile_mode: str = profiling.PROFILE_MODE,
+                 profile_dir: str = profiling.PROFILE_DIR):
+        """
+        퀴즈 실행기를 초기화합니다.
+
+        Args:
+            quiz_manager: 퀴즈 관리자
+            leaderboard_manager: 리더보드 관리자
+            scorer: 채점기
+            logger: 퀴즈 로거
+            ci_width_threshold: 적응형 평가 종료 기준 신뢰구간 폭
+            min_per_level: 적응형 평가의 난이도별 최소 출제 수
+            min_questions: 적응형 평가의 최소 출제 수
+            timeout: 문제 하나당 API 요청 타임아웃(초)
+            profile_mode: 모든 제출에 적용할 프로파일링 모드 ("" 끔, "cprofile", "sample")
+            profile_dir: 프로파일 결과를 저장할 디렉토리
+        """
+        self.quiz_manager = quiz_manager
+        self.leaderboard_manager = leaderboard_manager
+        self.scorer = scorer
+        self.logger = logger
+        self.ci_width_threshold = ci_width_threshold
+        self.min_per_level = min_per_level
+        self.min_questions = min_questions
+        self.timeout = timeout
+        self.profile_mode = profile_mode
+        self.profile_dir = profile_dir
+
+    def process_quiz(self, name: str, api_endpoint: str, adaptive: bool = False,
+                     profile: Optional[bool] = None) -> None:
+        """
+        사용자 API 엔드포인트로 퀴즈를 전송하고 결과를 처리합니다.
+
+        adaptive가 True이면 난이도별 층화 추출로 문제를 출제하고,
+        정확도 신뢰구간이 충분히 좁아지면 남은 문제를 건너뛰고 종료합니다.
+        단계별(참가자 호출, 채점, 로그/리더보드 기록) 소요 시간은 metrics 모듈의 quiz_stage_seconds에 기록됩니다.
+        프로파일링이 켜져 있으면 이 제출의 처리 과정을 profiling.ProfileSession으로 기록합니다.
+
+        Args:
+            name: 사용자 이름
+            api_endpoint: API 엔드포인트
+            adaptive: 적응형 평가 여부
+            profile: 이 제출의 프로파일링 여부 (None이면 profile_mode 설정을 따름)
+        """
+        mode = self.profile_mode if profile is None else (
+            (self.profile_mode or profiling.DEFAULT_MODE) if profile else "")
+        if not mode:
+            self._run_tracked(name, api_endpoint, adaptive)
+            return
+
+        session = profiling.ProfileSession(name, mode=mode, out_dir=self.profile_dir)
+        with session:
+            self._run_tracked(name, api_endpoint, adaptive)
+        self.logger.logger.info(f"프로파일 저장: {session.path} ({name}, {api_endpoint})")
+
+    def _run_tracked(self, name: str, api_endpoint: str, adaptive: bool) -> None:
+        """제출 하나를 처리하며 진행 중 제출 수와 전체 소요 시간, 결과 상태를 지표에 기록합니다."""
+        with ACTIVE_SUBMISSIONS.track(), STAGE_SECONDS.time(stage="submission"):
+            status = self._process_quiz(name, api_endpoint, adaptive)
+        SUBMISSIONS.inc(status=status)
+
+    def _process_quiz(self, name: str, api_endpoint: str, adaptive: bool) -> str:
+        """퀴즈를 처리하고 결과 상태(completed, error)를 반환합니다."""
+        quiz_manager, leaderboard_manager = self.quiz_manager, self.leaderboard_manager
+        scorer, logger = self.scorer, self.logger
+        # API 클라이언트 초기화 (제출 하나 동안 엔드포인트 연결을 재사용)
+        api_client = APIClient(api_endpoint, timeout=self.timeout)
+        try:
+
+            # 총 문제 수 가져오기
+            total_questions = quiz_manager.get_total_questions()
+
+            # 적응형 평가기 초기화
+            evaluator: Optional[AdaptiveEvaluator] = None
+            if adaptive:
+                evaluator = AdaptiveEvaluator(
+                    quiz_manager.get_levels(),
+                    ci_width_threshold=self.ci_width_threshold,
+                    min_per_level=self.min_per_level,
+                    min_questions=self.min_questions,
+                )
+
+            def question_indices() -> Iterator[int]:
+                if evaluator is None:
+                    yield from range(total_questions)
+                    return
+                while not evaluator.should_stop():
+                    yield evaluator.next_question()
+
+            # 결과 저장 변수 (usage: 이 제출의 LLM 채점 토큰 사용량)
+            usage = UsageTracker()
+            exact_match_results = []
+            llm_judge_results = []
+            response_times = []
+
+            # 각 문제 처리
+            for step, i in enumerate(question_indices()):
+                # 현재 진행 상황 업데이트 (적응형 평가에서는 출제한 문제 수)
+                with STAGE_SECONDS.time(stage="progress_update"):
+                    leaderboard_manager.update_question_progress(name, api_endpoint, step)
+
+                # 문제 가져오기
+                question_data = quiz_manager.get_question(i)
+                correct_answer = quiz_manager.get_correct_answer(i)
+
+                # API로 문제 전송
+                with STAGE_SECONDS.time(stage="contestant_call"):
+                    response, response_time, success = api_client.send_question(question_data)
+
+                if not success:
+                    logger.log_error(name, api_endpoint, f"API 호출 실패: 문제 {i}")
+                    leaderboard_manager.update_error_status(name, api_endpoint, f"API 호출 실패: 문제 {i}")
+                    return "error"
+
+                # 응답 검증
+                if not api_client.validate_response(response):
+                    logger.log_error(name, api_endpoint, f"유효하지 않은 응답: 문제 {i}")
+                    leaderboard_manager.update_error_status(name, api_endpoint, f"유효하지 않은 응답: 문제 {i}")
+                    return "error"
+
+                # 사용자 답변 추출
+                user_answer = response.get("answer", "")
+
+                # Exact Match 채점
+                with STAGE_SECONDS.time(stage="exact_match"):
+                    is_correct = scorer.exact_match_score(user_answer, correct_answer)
+                exact_match_results.append(is_correct)
+
+                # LLM as Judge 채점
+                usage_before = usage.total()
+                with STAGE_SECONDS.time(stage="llm_judge"):
+                    llm_score, _ = scorer.llm_judge_score(user_answer, correct_answer, question_data.get("question", ""),
+                                                          usage=usage)
+                judge_usage = usage.total().minus(usage_before)
+                llm_judge_results.append(llm_score)
+
+                if evaluator is not None:
+                    evaluator.record(i, is_correct, llm_score)
+
+                # 응답 시간 기록
+                response_times.append(response_time)
+
+                # 로그 기록
+                with STAGE_SECONDS.time(stage="log_write"):
+                    logger.log_question_response(
+                        name, api_endpoint, i,
+                        question_data.get("question", ""),
+                        user_answer, correct_answer,
+                        is_correct, llm_score, response_time,
+                        level=question_data.get("difficulty"),
+                        judge_usage=usage_summary(scorer.model, judge_usage) if judge_usage.calls else None,
+                    )
+                QUESTIONS.inc()
+
+            # 최종 결과 계산
+            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+            total_usage = usage.total()
+            extra = {
+                "questions_evaluated": len(exact_match_results),
+                "judge_prompt_tokens": total_usage.prompt_tokens,
+                "judge_completion_tokens": total_usage.completion_tokens,
+                "judge_cached_ratio": round(total_usage.cached_ratio, 4),
+                "judge_cost_usd": round(usage.cost_usd(), 6),
+            }
+            logger.logger.info(f"LLM 채점 토큰 사용량 ({name}, {api_endpoint}): {usage.summary()}")
+            if evaluator is not None:
+                # 난이도별 비율로 가중한 추정치와 신뢰구간 기록
+                rate, lower, upper = evaluator.estimate()
+                correct_rate = rate * 100
+                llm_result = evaluator.llm_estimate()
+                extra.update({"ci_lower": lower * 100, "ci_upper": upper * 100})
+            else:
+                correct_rate = scorer.calculate_total_score(exact_match_results) * 100
+                llm_result = sum(llm_judge_results) / len(llm_judge_results) if llm_judge_results else 0
+
+            # 리더보드 업데이트
+            with STAGE_SECONDS.time(stage="completion_update"):
+                leaderboard_manager.update_completion(
+                    name, api_endpoint, correct_rate, avg_response_time, str(llm_result), extra
+                )
+            return "completed"
+
+        except Exception as e:
+            error_msg = f"처리 중 오류 발생: {str(e)}"
+            logger.log_error(name, api_endpoint, error_msg)
+            leaderboard_manager.update_error_status(name, api_endpoint, error_msg)
+            return "error"
+        finally:
+            api_client.close()
+            # 제출이 끝나면 집계를 바로 저장
+            logger.analytics.flush()
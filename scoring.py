@@ -1,24 +1,139 @@
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, TYPE_CHECKING
+from collections import OrderedDict
 import logging
-from openai import OpenAI
+import os
+import threading
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+from entity_gazetteer import DEFAULT_GAZETTEER_PATH, EntityGazetteer
+from metrics import JUDGE_CACHE, JUDGE_REQUESTS, JUDGE_RETRIES, LLM_COST, LLM_TOKENS, STAGE_SECONDS
+from token_usage import UsageTracker, cost_usd, usage_from_response
+from utils import RetryBudget, RetryPolicy
+
+# LLM 채점 설정 (환경 변수로 변경 가능, 오프라인 테스트는 llm_stub_server.py 주소를 지정)
+JUDGE_MODEL = os.getenv("QUIZ_JUDGE_MODEL", "gpt-4o-mini")
+JUDGE_BASE_URL = os.getenv("QUIZ_JUDGE_BASE_URL") or None
+JUDGE_API_KEY = os.getenv("QUIZ_JUDGE_API_KEY", os.getenv("OPENAI_API_KEY", ""))
+# 같은 (문제, 답변, 정답) 채점 결과를 재사용하는 캐시 크기 (0이면 사용 안 함)
+JUDGE_CACHE_SIZE = int(os.getenv("QUIZ_JUDGE_CACHE_SIZE", "10000"))
+# 채점 요청 하나의 시간 제한(초)
+JUDGE_TIMEOUT = float(os.getenv("QUIZ_JUDGE_TIMEOUT", "30"))
+# 일시적인 오류(연결 오류, 시간 초과, 429, 5xx)의 재시도: 최대 시도 횟수, 지수 백오프 첫/최대 대기 시간(초)
+JUDGE_MAX_ATTEMPTS = int(os.getenv("QUIZ_JUDGE_MAX_ATTEMPTS", "3"))
+JUDGE_RETRY_BASE_DELAY = float(os.getenv("QUIZ_JUDGE_RETRY_BASE_DELAY", "0.5"))
+JUDGE_RETRY_MAX_DELAY = float(os.getenv("QUIZ_JUDGE_RETRY_MAX_DELAY", "8"))
+# 재시도+헤지 요청 수 상한 (채점 요청 수 대비 비율)
+JUDGE_RETRY_BUDGET = float(os.getenv("QUIZ_JUDGE_RETRY_BUDGET", "0.2"))
+# 최근 채점 요청 소요 시간의 이 분위수를 넘기면 같은 요청을 하나 더 보냄 (0이면 헤지하지 않음)
+JUDGE_HEDGE_QUANTILE = float(os.getenv("QUIZ_JUDGE_HEDGE_QUANTILE", "0.95"))
+
+# 채점 지시문 (모든 채점 요청에서 바이트 단위로 같은 앞부분이 되도록 고정, 제공자 쪽 프롬프트 캐시 대상)
+JUDGE_SYSTEM_PROMPT = """You are a Teacher to grade your student's answer.
+
+Score the student answer as either CORRECT or INCORRECT.
+
+Example Format:
+QUESTION: question here
+STUDENT ANSWER: student's answer here
+TRUE ANSWER: true answer here
+GRADE: CORRECT or INCORRECT here
+
+Grade the student answers based ONLY on their factual accuracy. Ignore differences in punctuation and phrasing between the student answer and true answer.
+It is OK if the student answer contains more information than the true answer, as long as it does not contain any conflicting statements. Begin!"""
+
+
+def judge_retry_policy() -> RetryPolicy:
+    """환경 변수 설정으로 LLM 채점 요청의 재시도/헤지 정책을 만듭니다 (이벤트는 quiz_judge_retry_events_total에 기록)."""
+    return RetryPolicy(
+        max_attempts=JUDGE_MAX_ATTEMPTS,
+        base_delay=JUDGE_RETRY_BASE_DELAY,
+        max_delay=JUDGE_RETRY_MAX_DELAY,
+        budget=RetryBudget(ratio=JUDGE_RETRY_BUDGET),
+        hedge=JUDGE_HEDGE_QUANTILE > 0,
+        hedge_quantile=JUDGE_HEDGE_QUANTILE,
+        on_event=lambda event, attempt, error: JUDGE_RETRIES.inc(event=event),
+    )
 
 class Scorer:
     """퀴즈 응답을 채점하는 클래스"""
     
-    def __init__(self):
-        """채점 모듈을 초기화합니다."""
+    def __init__(self, gazetteer_path: Optional[str] = DEFAULT_GAZETTEER_PATH,
+                 base_url: Optional[str] = JUDGE_BASE_URL, api_key: str = JUDGE_API_KEY, model: str = JUDGE_MODEL,
+                 judge_cache_size: int = JUDGE_CACHE_SIZE, retry_policy: Optional[RetryPolicy] = None):
+        """
+        채점 모듈을 초기화합니다.
+
+        Args:
+            gazetteer_path: 인물 이름 사전 경로 (None이거나 파일이 없으면 이름 표기 비교를 하지 않음)
+            base_url: OpenAI 호환 API 주소 (None이면 OpenAI 기본 주소)
+            api_key: API 키 (base_url을 지정했고 비어 있으면 임의 값 사용)
+            model: 채점 모델 이름
+            judge_cache_size: LLM 채점 결과 캐시 크기 (0이면 캐시하지 않음)
+            retry_policy: LLM 채점 요청의 재시도/헤지 정책 (None이면 환경 변수 설정으로 생성)
+        """
         self.logger = logging.getLogger(__name__)
-        # OpenAI API 설정
-        self.openai_api_key = ""
-        self.openai_api_base = "http://192.168.233.143:8000/v1"
-        self.client = OpenAI(
-            api_key=self.openai_api_key,
-            #base_url=self.openai_api_base,
-        )
+        # 인물 이름 사전은 처음 이름 표기를 비교할 때 읽음 (리더보드만 보는 시작 경로에서 읽지 않도록)
+        self.gazetteer_path = gazetteer_path
+        self._gazetteer: Optional[EntityGazetteer] = None
+        self._gazetteer_loaded = False
+        # OpenAI API 설정 (openai 패키지 import와 클라이언트 생성은 처음 LLM 채점할 때)
+        self.openai_api_key = api_key
+        self.openai_api_base = base_url
+        self.model = model
+        self._client: Optional["OpenAI"] = None
+        self._lazy_lock = threading.Lock()
+        # 여러 참가자가 같은 답을 내는 경우가 많으므로 채점 결과를 LRU로 재사용 (채점 스레드 간 공유)
+        self.judge_cache_size = judge_cache_size
+        self._judge_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, str]]" = OrderedDict()
+        self._judge_cache_lock = threading.Lock()
+        self.retry_policy = retry_policy if retry_policy is not None else judge_retry_policy()
+        # 이 채점기로 호출한 모든 채점 요청의 모델별 토큰 사용량
+        self.usage = UsageTracker()
+
+    @property
+    def gazetteer(self) -> Optional[EntityGazetteer]:
+        """인물 이름 사전 (처음 사용할 때 읽음, 경로가 없거나 파일이 없거나 주요 인물 확인에 실패하면 None)"""
+        if not self._gazetteer_loaded:
+            with self._lazy_lock:
+                if not self._gazetteer_loaded:
+                    if self.gazetteer_path and os.path.exists(self.gazetteer_path):
+                        gazetteer = EntityGazetteer.load(self.gazetteer_path)
+                        failures = gazetteer.spot_check()
+                        if failures:
+                            self.logger.warning(f"인물 이름 사전이 주요 인물 확인에 실패해 사용하지 않습니다: {failures}")
+                        else:
+                            self._gazetteer = gazetteer
+                    self._gazetteer_loaded = True
+        return self._gazetteer
+
+    @property
+    def client(self) -> "OpenAI":
+        """LLM 채점용 OpenAI 클라이언트 (처음 사용할 때 openai 패키지를 import하고 생성)"""
+        if self._client is None:
+            with self._lazy_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        api_key=self.openai_api_key or ("local" if self.openai_api_base else ""),
+                        base_url=self.openai_api_base,
+                        timeout=JUDGE_TIMEOUT,
+                        # 재시도는 retry_policy가 담당 (클라이언트 자체 재시도와 겹치면 시도 횟수가 곱해짐)
+                        max_retries=0,
+                    )
+        return self._client
+
+    def warm_up(self) -> None:
+        """인물 이름 사전과 LLM 채점 클라이언트를 미리 준비합니다 (첫 채점 지연을 없앨 때)."""
+        _ = self.gazetteer
+        _ = self.client
     
     def exact_match_score(self, user_answer: str, correct_answer: str) -> bool:
         """
         정확한 일치 방식으로 응답을 채점합니다.
+
+        인물 이름 사전이 있으면 같은 인물의 다른 표기(한자/한글, 이름/자)도 정답으로 처리합니다.
         
         Args:
             user_answer: 사용자 응답
@@ -35,57 +150,89 @@ class Scorer:
         correct_answer = correct_answer.strip().lower()
         
         # 정확히 일치하는지 확인
-        return user_answer == correct_answer
+        if user_answer == correct_answer:
+            return True
+
+        # 같은 인물의 다른 표기인지 확인 (諸葛亮/제갈량/공명)
+        return self.gazetteer is not None and self.gazetteer.same_entity(user_answer, correct_answer)
     
-    def llm_judge_score(self, user_answer: str, correct_answer: str, question: str) -> Tuple[float, str]:
+    def llm_judge_score(self, user_answer: str, correct_answer: str, question: str,
+                        usage: Optional[UsageTracker] = None) -> Tuple[float, str]:
         """
         LLM as judge 방식으로 응답을 채점합니다.
+
+        같은 문제·답변·정답 조합의 채점 결과가 캐시에 있으면 모델을 호출하지 않습니다 (오류 결과는 캐시하지 않음).
+        모델 호출은 retry_policy에 따라 일시적인 오류면 다시 보내고, 오래 걸리면 같은 요청을 하나 더 보냅니다.
+        모든 호출의 토큰 사용량은 self.usage(모델별 누적)와, 주어지면 usage(예: 제출별)에 기록합니다.
         
         Args:
             user_answer: 사용자 응답
             correct_answer: 정답
             question: 문제 텍스트
+            usage: 이 채점의 토큰 사용량을 함께 기록할 집계
             
         Returns:
             (점수, 채점 근거) 튜플
         """
-        prompt = f"""Score the student answer as either CORRECT or INCORRECT.
-
-Example Format:
-QUESTION: question here
-STUDENT ANSWER: student's answer here
-TRUE ANSWER: true answer here
-GRADE: CORRECT or INCORRECT here
-
-Grade the student answers based ONLY on their factual accuracy. Ignore differences in punctuation and phrasing between the student answer and true answer.
-It is OK if the student answer contains more information than the true answer, as long as it does not contain any conflicting statements. Begin! 
+        cache_key = (question, (user_answer or "").strip(), (correct_answer or "").strip())
+        if self.judge_cache_size > 0:
+            with self._judge_cache_lock:
+                cached = self._judge_cache.get(cache_key)
+                if cached is not None:
+                    self._judge_cache.move_to_end(cache_key)
+            JUDGE_CACHE.inc(result="hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
 
-QUESTION: {question}
-STUDENT ANSWER: {user_answer}
-TRUE ANSWER: {correct_answer}
-GRADE:"""
+        # 고정 지시문은 시스템 메시지에 두고, 달라지는 부분만 사용자 메시지로 보냄
+        prompt = f"QUESTION: {question}\nSTUDENT ANSWER: {user_answer}\nTRUE ANSWER: {correct_answer}\nGRADE:"
 
         try:
-            chat_response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a Teacher to grade your student's answer."},
-                    {"role": "user", "content": prompt},
-                ]
-            )
-            
+            chat_response = self.retry_policy.call(self._judge_request, prompt, usage)
             judgement = chat_response.choices[0].message.content.strip()
             is_correct = False if "INCORRECT" in judgement else True
             
             # 점수 (1.0 = 정답, 0.0 = 오답)과 채점 근거 반환
             score = 1.0 if is_correct else 0.0
-            
+            JUDGE_REQUESTS.inc(result="correct" if is_correct else "incorrect")
+
+            if self.judge_cache_size > 0:
+                with self._judge_cache_lock:
+                    self._judge_cache[cache_key] = (score, judgement)
+                    if len(self._judge_cache) > self.judge_cache_size:
+                        self._judge_cache.popitem(last=False)
             return score, judgement
         except Exception as e:
+            JUDGE_REQUESTS.inc(result="error")
             self.logger.error(f"LLM 판단 중 오류 발생: {str(e)}")
             # 오류 발생 시 기본적으로 오답 처리 및 오류 메시지 반환
             return 0.0, f"Error during LLM judge: {str(e)}"
     
+    def _judge_request(self, prompt: str, usage: Optional[UsageTracker] = None):
+        """
+        채점 모델을 한 번 호출합니다.
+
+        소요 시간과 토큰 사용량은 재시도/헤지 요청마다 따로 기록하므로, 결과를 쓰지 않은 헤지 요청의 토큰도 집계됩니다.
+        """
+        with STAGE_SECONDS.time(stage="judge_api"):
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ]
+            )
+        call_usage = usage_from_response(response)
+        self.usage.record(self.model, call_usage)
+        if usage is not None:
+            usage.record(self.model, call_usage)
+        LLM_TOKENS.inc(call_usage.prompt_tokens - call_usage.cached_tokens, component="judge", model=self.model,
+                       kind="prompt")
+        LLM_TOKENS.inc(call_usage.cached_tokens, component="judge", model=self.model, kind="cached")
+        LLM_TOKENS.inc(call_usage.completion_tokens, component="judge", model=self.model, kind="completion")
+        LLM_COST.inc(cost_usd(self.model, call_usage), component="judge", model=self.model)
+        return response
+
     def calculate_total_score(self, results: List[bool]) -> float:
         """
         전체 정확도를 계산합니다.
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+# 모델별 100만 토큰당 가격(USD): (입력, 캐시된 입력, 출력)
+# QUIZ_MODEL_PRICES='{"모델": [입력, 캐시된 입력, 출력]}'로 추가/변경 (목록에 없는 모델은 비용 0으로 집계)
+DEFAULT_MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    **DEFAULT_MODEL_PRICES,
+    **{model: tuple(price) for model, price in json.loads(os.getenv("QUIZ_MODEL_PRICES") or "{}").items()},
+}
+
+
+class TokenUsage(NamedTuple):
+    """모델 호출의 토큰 사용량"""
+    calls: int = 0
+    prompt_tokens: int = 0       # 입력 토큰 (캐시된 토큰 포함)
+    cached_tokens: int = 0       # 제공자 쪽 프롬프트 캐시에서 읽은 입력 토큰
+    completion_tokens: int = 0
+
+    def plus(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(*(a + b for a, b in zip(self, other)))
+
+    def minus(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(*(a - b for a, b in zip(self, other)))
+
+    @property
+    def cached_ratio(self) -> float:
+        """입력 토큰 중 캐시에서 읽은 비율"""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+
+def usage_from_response(response: Any) -> TokenUsage:
+    """
+    chat completions 응답의 usage 항목을 읽습니다.
+
+    Returns:
+        호출 1회의 사용량 (usage가 없으면 토큰 수 0)
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return TokenUsage(calls=1)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    return TokenUsage(1, int(getattr(usage, "prompt_tokens", 0) or 0), int(cached or 0),
+                      int(getattr(usage, "completion_tokens", 0) or 0))
+
+
+def model_price(model: str) -> Optional[Tuple[float, float, float]]:
+    """모델 가격 (날짜가 붙은 이름은 가장 길게 일치하는 앞부분 기준, 없으면 None)"""
+    if model in MODEL_PRICES:
+        return MODEL_PRICES[model]
+    matches = [name for name in MODEL_PRICES if model.startswith(f"{name}-")]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def cost_usd(model: str, usage: TokenUsage) -> float:
+    """사용량의 비용(USD), 가격을 모르는 모델이면 0"""
+    price = model_price(model)
+    if price is None:
+        return 0.0
+    input_price, cached_price, output_price = price
+    uncached = usage.prompt_tokens - usage.cached_tokens
+    return (uncached * input_price + usage.cached_tokens * cached_price + usage.completion_tokens * output_price) / 1e6
+
+
+def usage_summary(model: str, usage: TokenUsage) -> Dict[str, Any]:
+    """로그/상태 응답용 사용량 딕셔너리"""
+    return {**usage._asdict(), "cached_ratio": round(usage.cached_ratio, 4),
+            "cost_usd": round(cost_usd(model, usage), 6)}
+
+
+class UsageTracker:
+    """모델별 토큰 사용량을 누적합니다 (여러 스레드에서 기록해도 됨)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_model: Dict[str, TokenUsage] = {}
+
+    def record(self, model: str, usage: TokenUsage) -> None:
+        with self._lock:
+            self._by_model[model] = self._by_model.get(model, TokenUsage()).plus(usage)
+
+    def by_model(self) -> Dict[str, TokenUsage]:
+        with self._lock:
+            return dict(self._by_model)
+
+    def total(self) -> TokenUsage:
+        total = TokenUsage()
+        for usage in self.by_model().values():
+            total = total.plus(usage)
+        return total
+
+    def cost_usd(self) -> float:
+        return sum(cost_usd(model, usage) for model, usage in self.by_model().items())
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """모델별 사용량과 비용"""
+        return {model: usage_summary(model, usage) for model, usage in sorted(self.by_model().items())}
@@ -1,39 +1,363 @@
+import asyncio
+import functools
+import random
+import threading
 import time
-from typing import Dict, Any, Callable, Optional, TypeVar, List
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import Dict, Any, Awaitable, Callable, Deque, Optional, TypeVar, List
 import pandas as pd
 import logging
 
 T = TypeVar('T')
 
+class RetryBudget:
+    """
+    재시도/헤지 요청 수를 원래 요청 수의 일정 비율로 제한하는 토큰 버킷
+
+    요청마다 ratio만큼 토큰이 쌓이고 재시도나 헤지 요청 하나에 토큰 1개를 씁니다.
+    상대 서버가 느려지거나 실패할 때 모든 요청이 재시도해 부하가 몇 배로 늘어나는 것을 막고,
+    요청이 적을 때도 재시도할 수 있도록 초당 min_per_second개씩은 따로 채웁니다.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, capacity: float = 10.0):
+        """
+        Args:
+            ratio: 요청 하나당 허용할 재시도 수 (0.2면 요청 5개에 재시도 1개)
+            min_per_second: 요청 수와 상관없이 초당 허용할 재시도 수
+            capacity: 쌓아 둘 수 있는 최대 토큰 수 (한꺼번에 몰리는 재시도 수 상한)
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        """원래 요청 하나를 기록합니다."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """재시도/헤지 요청 하나를 보내도 되면 토큰을 쓰고 True, 예산이 없으면 False"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class LatencyTracker:
+    """최근 성공한 호출 소요 시간의 분위수를 계산합니다 (헤지 요청 지연 시간 결정용)."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 분위수 (기록이 없으면 None)"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """HTTP 오류 응답의 Retry-After 헤더(초)를 읽습니다 (없거나 날짜 형식이면 None)."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    다시 보내면 성공할 수 있는 오류인지 판단합니다.
+
+    HTTP 상태 코드가 있으면 408/409/429/5xx만, 없으면 연결 오류와 시간 초과
+    (openai/requests/httpx 예외는 클래스 이름으로 판단)를 일시적인 오류로 봅니다.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any("Timeout" in cls.__name__ or "Connection" in cls.__name__ for cls in type(error).__mro__)
+
+
+class RetryPolicy:
+    """
+    지수 백오프와 지터로 재시도하고, 느린 요청에는 헤지(같은 요청을 하나 더) 요청을 보내는 정책
+
+    - 재시도: attempt번째 실패 후 min(max_delay, base_delay * 2^(attempt-1))까지의 임의 시간(full jitter)만큼 기다립니다.
+      오류에 Retry-After가 있으면 그보다 일찍 보내지 않습니다.
+    - 헤지: 요청이 최근 성공 호출 소요 시간의 hedge_quantile 분위수(기본 p95)를 넘기면 같은 요청을 하나 더 보내고
+      먼저 성공한 결과를 사용합니다. 기록이 min_samples개보다 적으면 헤지하지 않습니다.
+    - 재시도와 헤지는 모두 RetryBudget의 토큰을 쓰므로, 예산이 없으면 원래 요청만 보냅니다.
+    - call()의 원래 요청은 호출마다 따로 만든 스레드에서 바로 실행하므로 동시 호출 수가 제한되지 않고,
+      헤지 대기 시간은 요청이 실제로 시작된 시점부터 잽니다. 헤지 요청만 max_workers개 스레드에서 실행하며,
+      스레드가 모두 쓰이고 있으면(과부하) 헤지하지 않습니다.
+
+    동기 함수는 call(), 코루틴 함수는 acall()로 호출하며, 한 정책 객체를 여러 스레드/작업이 함께 써도 됩니다.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 jitter: float = 1.0, retry_on: Callable[[BaseException], bool] = is_transient_error,
+                 budget: Optional[RetryBudget] = None, hedge: bool = False, hedge_quantile: float = 0.95,
+                 min_samples: int = 20, min_hedge_delay: float = 0.05, max_workers: int = 32,
+                 on_event: Optional[Callable[[str, int, Optional[BaseException]], None]] = None):
+        """
+        Args:
+            max_attempts: 첫 시도를 포함한 최대 시도 횟수
+            base_delay: 첫 재시도 전 최대 대기 시간(초)
+            max_delay: 재시도 전 최대 대기 시간(초)
+            jitter: 대기 시간 중 임의로 줄일 비율 (1.0이면 0~전체, 0이면 지터 없음)
+            retry_on: 오류를 받아 재시도할지 정하는 함수
+            budget: 재시도/헤지 예산 (None이면 새로 만듦, 여러 정책이 같은 상대를 부르면 공유)
+            hedge: 헤지 요청 사용 여부
+            hedge_quantile: 헤지 요청을 보낼 소요 시간 분위수
+            min_samples: 헤지를 시작할 최소 소요 시간 기록 수
+            min_hedge_delay: 헤지 요청 전 최소 대기 시간(초)
+            max_workers: call()에서 동시에 실행할 수 있는 최대 헤지 요청 수
+            on_event: "retry", "hedge", "hedge_win", "budget_exhausted" 이벤트마다 (이벤트, 시도 번호, 오류)로 호출
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = retry_on
+        self.budget = budget if budget is not None else RetryBudget()
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.min_hedge_delay = min_hedge_delay
+        self.max_workers = max_workers
+        self.on_event = on_event
+        self.latency = LatencyTracker()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._hedges_inflight = 0
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """attempt번째 시도가 실패한 뒤 기다릴 시간(초)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay *= 1.0 - self.jitter * random.random()
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def hedge_delay(self) -> Optional[float]:
+        """헤지 요청을 보내기 전 기다릴 시간(초), 헤지하지 않으면 None"""
+        if not self.hedge or len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_hedge_delay, self.latency.quantile(self.hedge_quantile))
+
+    def _event(self, event: str, attempt: int, error: Optional[BaseException] = None) -> None:
+        if self.on_event is not None:
+            self.on_event(event, attempt, error)
+
+    def _should_retry(self, attempt: int, error: BaseException) -> bool:
+        if attempt >= self.max_attempts or not self.retry_on(error):
+            return False
+        if not self.budget.withdraw():
+            self._event("budget_exhausted", attempt, error)
+            return False
+        self._event("retry", attempt, error)
+        return True
+
+    # ---------- 동기 ----------
+
+    def _timed(self, func: Callable[..., T], args, kwargs) -> T:
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.latency.observe(time.perf_counter() - started)
+        return result
+
+    def _run_into(self, future: Future, func: Callable[..., T], args, kwargs) -> None:
+        try:
+            future.set_result(self._timed(func, args, kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _submit_hedge(self, func: Callable[..., T], args, kwargs) -> Optional[Future]:
+        """헤지 요청을 스레드 풀에 넣습니다. 빈 스레드가 없거나(대기열에 쌓지 않음) 예산이 없으면 None"""
+        with self._executor_lock:
+            if self._hedges_inflight >= self.max_workers or not self.budget.withdraw():
+                return None
+            self._hedges_inflight += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="retry-hedge")
+        future = self._executor.submit(self._timed, func, args, kwargs)
+        future.add_done_callback(self._hedge_done)
+        return future
+
+    def _hedge_done(self, _future: Future) -> None:
+        with self._executor_lock:
+            self._hedges_inflight -= 1
+
+    def _call_hedged(self, func: Callable[..., T], args, kwargs, attempt: int) -> T:
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(func, args, kwargs)
+        # 원래 요청은 공유 스레드 풀의 대기열을 거치지 않도록 전용 스레드에서 바로 시작
+        primary: Future = Future()
+        threading.Thread(target=self._run_into, args=(primary, func, args, kwargs),
+                         name="retry-primary", daemon=True).start()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        hedge = self._submit_hedge(func, args, kwargs)
+        if hedge is None:
+            return primary.result()
+        self._event("hedge", attempt)
+        errors = []
+        # 먼저 성공한 결과 사용 (동기 호출은 취소할 수 없으므로 늦은 요청은 끝날 때까지 스레드에서 실행)
+        for future in as_completed([primary, hedge]):
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            if future is hedge:
+                self._event("hedge_win", attempt)
+            return result
+        raise errors[0]
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        func(*args, **kwargs)를 정책에 따라 호출합니다.
+
+        Returns:
+            func의 반환 값 (재시도하지 않을 오류이거나 시도/예산을 다 쓰면 마지막 오류를 그대로 발생)
+        """
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self._call_hedged(func, args, kwargs, attempt)
+            except Exception as e:
+                if not self._should_retry(attempt, e):
+                    raise
+                time.sleep(self.backoff(attempt, e))
+
+    # ---------- 비동기 ----------
+
+    async def _atimed(self, func: Callable[..., Awaitable[T]], args, kwargs) -> T:
+        started = time.perf_counter()
+        result = await func(*args, **kwargs)
+        self.latency.observe(time.perf_counter() - started)
+        return result
+
+    async def _acall_hedged(self, func: Callable[..., Awaitable[T]], args, kwargs, attempt: int) -> T:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._atimed(func, args, kwargs)
+        primary = asyncio.ensure_future(self._atimed(func, args, kwargs))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done or not self.budget.withdraw():
+                return await primary
+            self._event("hedge", attempt)
+            hedge = asyncio.ensure_future(self._atimed(func, args, kwargs))
+            pending = {primary, hedge}
+            errors = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._event("hedge_win", attempt)
+                        return task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            # 늦은 요청은 취소
+            for task in pending:
+                task.cancel()
+
+    async def acall(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """코루틴 함수 func(*args, **kwargs)를 정책에 따라 호출합니다 (call()의 비동기 버전)."""
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._acall_hedged(func, args, kwargs, attempt)
+            except Exception as e:
+                if not self._should_retry(attempt, e):
+                    raise
+                await asyncio.sleep(self.backoff(attempt, e))
+
+
 def retry(func: Callable[..., T], max_retries: int = 3, 
-          retry_delay: float = 1.0) -> Callable[..., Optional[T]]:
+          retry_delay: float = 1.0, jitter: float = 1.0) -> Callable[..., Optional[T]]:
     """
     함수 실행을 재시도하는 데코레이터를 반환합니다.
+
+    대기 시간은 retry_delay부터 재시도마다 두 배로 늘리고(최대 retry_delay의 8배) 지터를 더하며,
+    코루틴 함수를 넘기면 asyncio.sleep으로 기다리는 코루틴 함수를 반환합니다.
+    재시도 횟수 제한은 함수마다 따로 두려면 RetryPolicy를 직접 사용하세요.
     
     Args:
         func: 재시도할 함수
-        max_retries: 최대 재시도 횟수
-        retry_delay: 재시도 간 대기 시간(초)
+        max_retries: 최대 시도 횟수
+        retry_delay: 첫 재시도 전 대기 시간(초)
+        jitter: 대기 시간 중 임의로 줄일 비율 (0이면 지터 없음)
         
     Returns:
-        재시도 로직이 포함된 래퍼 함수
+        재시도 로직이 포함된 래퍼 함수 (모든 시도가 실패하면 None 반환)
     """
-    def wrapper(*args, **kwargs):
-        attempts = 0
-        last_exception = None
-        
-        while attempts < max_retries:
+    def log_event(event: str, attempt: int, error: Optional[BaseException]) -> None:
+        if event == "retry":
+            logging.warning(f"Attempt {attempt}/{max_retries} failed for {func.__name__}: {str(error)}")
+
+    # 예외 종류와 상관없이 재시도하고, 예산으로 막지 않음 (기존 동작)
+    policy = RetryPolicy(max_attempts=max_retries, base_delay=retry_delay, max_delay=retry_delay * 8,
+                         jitter=jitter, retry_on=lambda e: True,
+                         budget=RetryBudget(ratio=float("inf"), capacity=float("inf")), on_event=log_event)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
             try:
-                return func(*args, **kwargs)
+                return await policy.acall(func, *args, **kwargs)
             except Exception as e:
-                attempts += 1
-                last_exception = e
-                logging.warning(f"Attempt {attempts}/{max_retries} failed for {func.__name__}: {str(e)}")
-                if attempts < max_retries:
-                    time.sleep(retry_delay)
-        
-        logging.error(f"All {max_retries} attempts failed for {func.__name__}: {str(last_exception)}")
-        return None
+                logging.error(f"All {max_retries} attempts failed for {func.__name__}: {str(e)}")
+                return None
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return policy.call(func, *args, **kwargs)
+        except Exception as e:
+            logging.error(f"All {max_retries} attempts failed for {func.__name__}: {str(e)}")
+            return None
         
     return wrapper
 
@@ -111,7 +435,8 @@ def safe_csv_update(df: pd.DataFrame, csv_path: str) -> bool:
         
         # 파일 시스템 동기화 (플러시)
         import os
-        os.fsync(open(temp_path, 'r+').fileno())
+        with open(temp_path, 'r+') as temp_file:
+            os.fsync(temp_file.fileno())
         
         # 기존 파일 백업 (기존 파일이 있는 경우)
         backup_path = f"{csv_path}.bak"